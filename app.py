@@ -1,6 +1,6 @@
 import os
 import logging
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, abort
 from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
 from flask_jwt_extended import JWTManager, create_access_token, get_jwt_identity, jwt_required
@@ -70,10 +70,16 @@ app.register_blueprint(admin_bp, url_prefix='/api/admin')
 
 # Import error handlers
 from utils.error_handlers import *
+from utils.idempotency import idempotent
 
 # Create all database tables
 with app.app_context():
     db.create_all()
+    
+    # Full-text search index for services (FTS5 on SQLite, tsvector on Postgres)
+    from utils.search_index import install_search_index
+    with db.engine.begin() as connection:
+        install_search_index(connection)
 
 # Health check endpoint
 @app.route('/api/health', methods=['GET'])
@@ -191,23 +197,24 @@ def logout():
 @app.route('/service/<int:service_id>')
 def service_detail(service_id):
     # Import here to avoid circular imports
-    from models.service import Service
-    from models.user import User
-    from models.feedback import Feedback
+    from services.service_service import ServiceService
+    from repositories.feedback_repository import FeedbackRepository
+    from repositories.rating_repository import RatingRepository
+    from models.enum_types import RatingSubject
     from datetime import date
     
-    service = Service.query.get_or_404(service_id)
-    provider = User.query.get_or_404(service.provider_id)
+    result = ServiceService.get_service_with_provider(service_id)
+    if not result:
+        abort(404)
+    service, provider = result
     
-    # Get reviews for this service
-    reviews = Feedback.query.filter_by(service_id=service_id).all()
+    # Rating stats come from the maintained aggregate, not the reviews
+    rating = RatingRepository().find(RatingSubject.SERVICE, service_id)
+    avg_rating = round(rating.average, 1) if rating and rating.rating_count else None
+    total_ratings = rating.rating_count if rating else 0
     
-    # Calculate average rating
-    avg_rating = None
-    total_ratings = len(reviews)
-    if reviews:
-        total_rating = sum(review.rating for review in reviews)
-        avg_rating = round(total_rating / len(reviews), 1)
+    # First page of reviews, newest first; the rest load from service_reviews
+    reviews = FeedbackRepository().find_by_service_id(service_id, limit=REVIEWS_PAGE_SIZE)
     
     # Get today's date for the booking form
     today_date = date.today().isoformat()
@@ -216,12 +223,37 @@ def service_detail(service_id):
         'service_detail.html',
         service=service,
         provider=provider,
-        reviews=reviews,
+        reviews=[review_to_dict(review) for review in reviews],
+        next_cursor=reviews.next_cursor,
         avg_rating=avg_rating,
         total_ratings=total_ratings,
+        rating_histogram=rating.get_histogram() if rating else None,
         today_date=today_date
     )
 
+REVIEWS_PAGE_SIZE = 10
+
+def review_to_dict(review):
+    """Serialize a review for the service detail page"""
+    review_dict = review.to_dict()
+    review_dict['user_name'] = f"{review.user.first_name} {review.user.last_name}" if review.user else None
+    review_dict['created_at'] = review.created_at.strftime('%Y-%m-%d') if review.created_at else None
+    return review_dict
+
+# More reviews for the service detail page
+@app.route('/service/<int:service_id>/reviews')
+def service_reviews(service_id):
+    from repositories.feedback_repository import FeedbackRepository
+    
+    try:
+        reviews = FeedbackRepository().find_by_service_id(
+            service_id, cursor=request.args.get('cursor'), limit=REVIEWS_PAGE_SIZE
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(reviews.to_dict('reviews', review_to_dict))
+
 # Book service route
 @app.route('/service/<int:service_id>/book', methods=['POST'])
 def book_service(service_id):
@@ -250,19 +282,14 @@ def book_service(service_id):
     booking_date = request.form.get('booking_date')
     notes = request.form.get('notes', '')
     
-    # For car pool services, handle seat booking
+    # For car/bike pool services, seats are held together with the booking
     quantity = 1
-    if service.service_type == 'CAR_POOL':
-        num_seats = int(request.form.get('num_seats', 1))
-        quantity = num_seats
-        
-        # Check if enough seats are available
-        if num_seats > service.available_seats:
-            flash(f'Only {service.available_seats} seats available.', 'danger')
+    is_pool = service.service_type in ('CAR_POOL', 'BIKE_POOL')
+    if is_pool:
+        quantity = int(request.form.get('num_seats', 1))
+        if quantity <= 0:
+            flash('Number of seats must be positive.', 'danger')
             return redirect(url_for('service_detail', service_id=service_id))
-        
-        # Update available seats
-        service.available_seats -= num_seats
     
     # Convert booking_date string to datetime if provided
     from datetime import datetime
@@ -324,6 +351,16 @@ def book_service(service_id):
     
     try:
         db.session.add(booking)
+        
+        if is_pool:
+            # Seats are held until the booking is paid or the hold expires
+            from repositories.car_pool_repository import CarPoolRepository
+            db.session.flush()
+            if not CarPoolRepository().place_hold(service_id, user_id, quantity, booking.id):
+                db.session.rollback()
+                flash(f'Only {service.available_seats} seats available.', 'danger')
+                return redirect(url_for('service_detail', service_id=service_id))
+        
         db.session.commit()
         
         # Create a wallet for the user if it doesn't exist
@@ -334,7 +371,11 @@ def book_service(service_id):
             db.session.add(wallet)
             db.session.commit()
         
-        flash('Service booked successfully! You can manage your bookings on the My Bookings page.', 'success')
+        if is_pool:
+            hold_minutes = app.config.get('SEAT_HOLD_TTL', 600) // 60
+            flash(f'Seats held for {hold_minutes} minutes. Complete payment on the My Bookings page to keep them.', 'success')
+        else:
+            flash('Service booked successfully! You can manage your bookings on the My Bookings page.', 'success')
         
         # Redirect to the my_bookings page instead of service detail
         return redirect(url_for('my_bookings'))
@@ -355,25 +396,20 @@ def add_review(service_id):
     
     # Import here to avoid circular imports
     from models.service import Service
-    from models.feedback import Feedback
+    from services.feedback_service import FeedbackService
     
-    service = Service.query.get_or_404(service_id)
+    Service.query.get_or_404(service_id)
     
     # Get form data
     rating = int(request.form.get('rating'))
     review_text = request.form.get('review')
     
-    # Create feedback
-    feedback = Feedback(
-        user_id=session['user_id'],
-        provider_id=service.provider_id,
-        service_id=service_id,
-        rating=rating,
-        review=review_text
-    )
-    
-    db.session.add(feedback)
-    db.session.commit()
+    # Create feedback (keeps the rating aggregates in sync)
+    try:
+        FeedbackService().add_feedback(session['user_id'], service_id, rating, review_text)
+    except ValueError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('service_detail', service_id=service_id))
     
     flash('Thank you for your review!', 'success')
     return redirect(url_for('service_detail', service_id=service_id))
@@ -401,11 +437,10 @@ def wallet_page():
 # Bookings API for frontend
 @app.route('/bookings', methods=['GET'])
 def get_bookings_ui():
-    """Get bookings for the current user with optional status filter"""
+    """Get a page of bookings for the current user with optional status filter"""
     # Import here to avoid circular imports
-    from models.booking import Booking
-    from models.service import Service
-    from models.user import User
+    from repositories.booking_repository import BookingRepository
+    from utils.pagination import get_page_args
     
     # Check if user is logged in
     if not session.get('user_id'):
@@ -415,28 +450,24 @@ def get_bookings_ui():
         user_id = session['user_id']
         user_role = session.get('user_role')
         status = request.args.get('status')
+        cursor, limit = get_page_args()
         
-        # Determine query based on user role
-        if user_role == 'POWER_USER':
-            # For service providers, get bookings for their services
-            query = (db.session.query(Booking)
-                .join(Service, Booking.service_id == Service.id)
-                .filter(Service.provider_id == user_id))
-        else:
-            # For regular users, get their bookings
-            query = Booking.query.filter_by(user_id=user_id)
-        
-        # Apply status filter if provided
-        if status:
-            query = query.filter(Booking.status == status)
-        
-        # Get bookings and sort by created_at descending
-        bookings = query.order_by(Booking.created_at.desc()).all()
+        # Get a page of bookings sorted by created_at descending, with each booked service
+        repository = BookingRepository()
+        try:
+            if user_role == 'POWER_USER':
+                # For service providers, get bookings for their services
+                page = repository.find_by_provider_id(user_id, status, cursor, limit, with_service=True)
+            else:
+                # For regular users, get their bookings
+                page = repository.find_by_user_id(user_id, status, cursor, limit, with_service=True)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
         # Format response
         result = []
-        for booking in bookings:
-            service = Service.query.get(booking.service_id)
+        for booking in page:
+            service = booking.service
             
             booking_data = {
                 'id': booking.id,
@@ -460,7 +491,7 @@ def get_bookings_ui():
                 
             result.append(booking_data)
         
-        return jsonify(result)
+        return jsonify({'bookings': result, 'next_cursor': page.next_cursor})
     except Exception as e:
         import logging
         logging.error(f"Error in get_bookings_ui: {str(e)}")
@@ -468,6 +499,7 @@ def get_bookings_ui():
 
 # Booking actions
 @app.route('/bookings/<int:booking_id>/payment', methods=['POST'])
+@idempotent
 def process_payment_ui(booking_id):
     """Process payment for a booking"""
     # Import here to avoid circular imports
@@ -489,6 +521,16 @@ def process_payment_ui(booking_id):
         if booking.user_id != user_id:
             return jsonify({"error": "Not your booking"}), 403
         
+        # Hand the payment to the payment workers if requested
+        if request.args.get('async', 'false').lower() == 'true':
+            from services.payment_queue_service import PaymentQueueService
+            success, result = PaymentQueueService.enqueue_payment(booking_id, user_id)
+            if not success:
+                return jsonify({"error": result}), 400
+            status_url = url_for('get_payment_job_ui', job_id=result.id)
+            response = jsonify({"message": "Payment queued", "job": result.to_dict(), "status_url": status_url})
+            return response, 202, {'Location': status_url}
+        
         # Process payment
         success, message = BookingService.process_payment(booking_id)
         
@@ -501,6 +543,22 @@ def process_payment_ui(booking_id):
         logging.error(f"Error in process_payment_ui: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/bookings/payment-jobs/<int:job_id>', methods=['GET'])
+def get_payment_job_ui(job_id):
+    """Get the status of a queued payment"""
+    # Import here to avoid circular imports
+    from services.payment_queue_service import PaymentQueueService
+    
+    # Check if user is logged in
+    if not session.get('user_id'):
+        return jsonify({"error": "Not authenticated"}), 401
+    
+    job = PaymentQueueService.get_job(job_id)
+    if not job or job.user_id != session['user_id']:
+        return jsonify({"error": "Payment job not found"}), 404
+    
+    return jsonify(job.to_dict()), 200
+
 @app.route('/bookings/<int:booking_id>/cancel', methods=['POST'])
 def cancel_booking_ui(booking_id):
     """Cancel a booking"""
@@ -671,6 +729,43 @@ def complete_booking_ui(booking_id):
         logging.error(f"Error in complete_booking_ui: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/bookings/bulk/<action>', methods=['POST'])
+def bulk_update_bookings_ui(action):
+    """Confirm, reject or complete several bookings at once (provider only)"""
+    # Import here to avoid circular imports
+    from services.booking_service import BookingService
+    
+    # Check if user is logged in
+    if not session.get('user_id'):
+        return jsonify({"error": "Not authenticated"}), 401
+    
+    try:
+        user_id = session['user_id']
+        user_role = session.get('user_role')
+        
+        if user_role != 'POWER_USER' and user_role != 'ADMIN':
+            return jsonify({"error": "Only service providers can update bookings"}), 403
+        
+        # Get request data
+        data = request.get_json()
+        booking_ids = data.get('booking_ids') if data else None
+        if not isinstance(booking_ids, list) or not all(isinstance(booking_id, int) for booking_id in booking_ids):
+            return jsonify({"error": "booking_ids must be a list of booking IDs"}), 400
+        
+        # Ownership and status are checked per booking by the update itself
+        success, result = BookingService.bulk_update_status(
+            booking_ids, action, user_id, is_admin=user_role == 'ADMIN', reason=data.get('reason')
+        )
+        
+        if success:
+            return jsonify({"results": result}), 200
+        else:
+            return jsonify({"error": result}), 400
+    except Exception as e:
+        import logging
+        logging.error(f"Error in bulk_update_bookings_ui: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 
 
 # Wallet API for UI
@@ -712,6 +807,7 @@ def get_wallet_transactions_ui():
     """Get transactions for the current user's wallet"""
     # Import here to avoid circular imports
     from services.wallet_service import WalletService
+    from utils.pagination import get_page_args
     
     # Check if user is logged in
     if not session.get('user_id'):
@@ -725,21 +821,56 @@ def get_wallet_transactions_ui():
         if not wallet:
             return jsonify({"error": "Wallet not found"}), 404
         
-        # Get limit from query parameters
-        limit = int(request.args.get('limit', 10))
+        # Get pagination parameters
+        cursor, limit = get_page_args()
         
         # Get transactions
-        transactions = WalletService.get_transactions(wallet.id, limit)
+        try:
+            transactions = WalletService.get_transactions(wallet.id, limit or 10, cursor)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        return jsonify({
-            "transactions": [tx.to_dict() for tx in transactions]
-        }), 200
+        return jsonify(transactions.to_dict('transactions')), 200
     except Exception as e:
         import logging
         logging.error(f"Error in get_wallet_transactions_ui: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/wallet/statement', methods=['GET'])
+def get_wallet_statement_ui():
+    """Get a statement for the current user's wallet"""
+    # Import here to avoid circular imports
+    from services.wallet_service import WalletService
+    from utils.pagination import get_page_args
+    from utils.validators import get_date_range_args
+    
+    # Check if user is logged in
+    if not session.get('user_id'):
+        return jsonify({"error": "Not authenticated"}), 401
+    
+    try:
+        user_id = session['user_id']
+        
+        # Get the wallet
+        wallet = WalletService.get_wallet(user_id)
+        if not wallet:
+            return jsonify({"error": "Wallet not found"}), 404
+        
+        try:
+            start, end = get_date_range_args()
+            cursor, limit = get_page_args()
+            statement = WalletService.get_statement(wallet.id, start, end, cursor, limit)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        return jsonify(statement), 200
+    except Exception as e:
+        import logging
+        logging.error(f"Error in get_wallet_statement_ui: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/wallet/add-funds', methods=['POST'])
+@idempotent
 def add_funds_ui():
     """Add funds to user's wallet"""
     # Import here to avoid circular imports
@@ -782,6 +913,7 @@ def add_funds_ui():
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/wallet/transfer', methods=['POST'])
+@idempotent
 def transfer_funds_ui():
     """Transfer funds to another user"""
     # Import here to avoid circular imports
@@ -835,9 +967,7 @@ def transfer_funds_ui():
 def get_services_ui():
     """Get services for UI display with filtering options"""
     # Import here to avoid circular imports
-    from models.service import Service
-    from models.user import User
-    from datetime import datetime
+    from services.service_service import ServiceService
     import logging
     
     try:
@@ -845,100 +975,22 @@ def get_services_ui():
         service_type = request.args.get('service_type')
         status = request.args.get('status', 'AVAILABLE')
         
-        # Build query
-        query = Service.query.filter_by(status=status)
-        
-        if service_type:
-            query = query.filter_by(service_type=service_type)
-        
-        # Get services
-        services = query.all()
+        # Subtype columns and providers are loaded in the same query
+        services = ServiceService.get_catalog(service_type=service_type, status=status)
         
         # Format response
         result = []
         for service in services:
             try:
-                provider = User.query.get(service.provider_id)
+                provider = service.provider
                 provider_name = f"{provider.first_name} {provider.last_name}" if provider else "Unknown"
                 
-                service_data = {
-                    'id': service.id,
-                    'name': service.name,
-                    'description': service.description,
-                    'service_type': service.service_type,
-                    'price': float(service.price),
-                    'status': service.status,
-                    'provider_id': service.provider_id,
+                # to_dict includes the service type specific fields
+                service_data = service.to_dict()
+                service_data.update({
                     'provider_name': provider_name,
                     'created_at': service.created_at.strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                # Add location from base class for all services
-                if hasattr(service, 'location') and service.location:
-                    service_data['location'] = service.location
-                
-                # Add service type specific fields based on what values are available
-                # We're not using getattr to avoid the deferred loader issues
-                if service.service_type == 'CAR_POOL':
-                    # Only add existing attributes to avoid accessing deferred loaders 
-                    # that don't have values set yet
-                    car_pool_fields = {}
-                    
-                    # Only include fields that actually exist on the service instance
-                    # to prevent deferred loader errors
-                    if hasattr(service, '__dict__'):
-                        service_dict = service.__dict__
-                        
-                        for field in ['source', 'destination', 'vehicle_type', 'vehicle_model', 'vehicle_number']:
-                            if field in service_dict:
-                                car_pool_fields[field] = service_dict[field]
-                        
-                        if 'departure_time' in service_dict:
-                            if isinstance(service_dict['departure_time'], datetime):
-                                car_pool_fields['departure_time'] = service_dict['departure_time'].strftime('%Y-%m-%d %H:%M:%S')
-                            else:
-                                car_pool_fields['departure_time'] = service_dict['departure_time']
-                        
-                        if 'available_seats' in service_dict:
-                            car_pool_fields['available_seats'] = service_dict['available_seats']
-                        
-                        if 'total_seats' in service_dict:
-                            car_pool_fields['total_seats'] = service_dict['total_seats']
-                    
-                    service_data.update(car_pool_fields)
-                elif service.service_type == 'GYM_FITNESS':
-                    gym_fields = {}
-                    
-                    if hasattr(service, '__dict__'):
-                        service_dict = service.__dict__
-                        
-                        for field in ['operating_hours', 'trainer_experience', 'category']:
-                            if field in service_dict:
-                                gym_fields[field] = service_dict[field]
-                    
-                    service_data.update(gym_fields)
-                elif service.service_type == 'HOUSEHOLD':
-                    household_fields = {}
-                    
-                    if hasattr(service, '__dict__'):
-                        service_dict = service.__dict__
-                        
-                        for field in ['category', 'estimated_time', 'experience', 'service_area']:
-                            if field in service_dict:
-                                household_fields[field] = service_dict[field]
-                    
-                    service_data.update(household_fields)
-                elif service.service_type == 'MECHANICAL':
-                    mechanical_fields = {}
-                    
-                    if hasattr(service, '__dict__'):
-                        service_dict = service.__dict__
-                        
-                        for field in ['specialization', 'vehicle_types', 'experience', 'workshop_location']:
-                            if field in service_dict:
-                                mechanical_fields[field] = service_dict[field]
-                    
-                    service_data.update(mechanical_fields)
+                })
                 
                 result.append(service_data)
             except Exception as e:
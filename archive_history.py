@@ -0,0 +1,17 @@
+from app import app
+from repositories.archive_repository import ArchiveRepository
+
+# Run monthly (e.g. from cron) so the live tables only hold recent history
+def archive_history():
+    with app.app_context():
+        print("Archiving old bookings and transactions...")
+        moved = ArchiveRepository().archive_closed_months(
+            app.config['ARCHIVE_AFTER_MONTHS'],
+            app.config['ARCHIVE_BATCH_SIZE']
+        )
+        for table_name, count in moved.items():
+            print(f"  Moved {count} rows from {table_name}")
+        print("Archive complete!")
+
+if __name__ == "__main__":
+    archive_history()
\ No newline at end of file
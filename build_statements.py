@@ -0,0 +1,14 @@
+from app import app
+from repositories.statement_repository import StatementRepository
+
+# Run daily (e.g. from cron) so statements read whole months from summaries
+def build_statements():
+    with app.app_context():
+        print("Building wallet statements...")
+        repository = StatementRepository()
+        filled = repository.backfill_running_balances()
+        months = repository.summarize_closed_months()
+        print(f"Filled in {filled} running balances and summarized {months} months!")
+
+if __name__ == "__main__":
+    build_statements()
\ No newline at end of file
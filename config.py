@@ -12,6 +12,43 @@ class Config:
         }
     }
     
+    # Number of commission sub-accounts payments are spread across
+    COMMISSION_SHARDS = int(os.environ.get('COMMISSION_SHARDS', 16))
+    
+    # Idempotency-Key responses are replayed for this long (seconds)
+    IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', 86400))
+    IDEMPOTENCY_CACHE_SIZE = 1024  # Completed responses kept in memory per process
+    
+    # How long car/bike pool seats are held for an unpaid booking (seconds)
+    SEAT_HOLD_TTL = int(os.environ.get('SEAT_HOLD_TTL', 600))
+    
+    # Background payment queue (payment_worker.py)
+    PAYMENT_WORKERS = int(os.environ.get('PAYMENT_WORKERS', 4))
+    PAYMENT_BATCH_SIZE = int(os.environ.get('PAYMENT_BATCH_SIZE', 20))
+    PAYMENT_POLL_INTERVAL = float(os.environ.get('PAYMENT_POLL_INTERVAL', 1.0))  # Seconds to wait when idle
+    PAYMENT_JOB_TIMEOUT = int(os.environ.get('PAYMENT_JOB_TIMEOUT', 300))  # Seconds before a stuck job is retried
+    
+    # Booking and wallet event delivery (dispatch_outbox.py)
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 100))
+    OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', 1.0))  # Seconds to wait when idle
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 5))  # Failed deliveries before giving up
+    OUTBOX_RETENTION = int(os.environ.get('OUTBOX_RETENTION', 604800))  # Seconds delivered events are kept
+    
+    # Retries for write transactions aborted by the database under contention
+    TRANSACTION_RETRIES = int(os.environ.get('TRANSACTION_RETRIES', 3))
+    TRANSACTION_RETRY_DELAY = float(os.environ.get('TRANSACTION_RETRY_DELAY', 0.05))  # Seconds, doubled per attempt
+    
+    # Streaming admin exports
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))  # Rows fetched from the database at a time
+    
+    # Moving finished bookings and old transactions to the archive tables (archive_history.py)
+    ARCHIVE_AFTER_MONTHS = int(os.environ.get('ARCHIVE_AFTER_MONTHS', 12))  # Closed months kept in the live tables
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 1000))  # Rows moved per transaction
+    
+    # Wallet balance reconciliation against the ledger (reconcile_wallets.py)
+    RECONCILE_WORKERS = int(os.environ.get('RECONCILE_WORKERS', 4))  # Processes checking wallet ranges
+    RECONCILE_RANGE_SIZE = int(os.environ.get('RECONCILE_RANGE_SIZE', 5000))  # Wallet IDs per task
+    
     # JWT
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'dev-jwt-secret')
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hour
@@ -1,7 +1,13 @@
-from flask import Blueprint, request, jsonify
+from datetime import timedelta
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required
+from models.enum_types import ReconciliationMode
 from services.admin_service import AdminService
+from services.reconciliation_service import ReconciliationService
 from utils.jwt_manager import admin_required
+from utils.exports import export_response, get_export_format
+from utils.pagination import get_page_args
+from utils.validators import get_date_range_args
 
 admin_bp = Blueprint('admin', __name__)
 admin_service = AdminService()
@@ -48,19 +54,35 @@ def get_all_services_admin():
         type: string
         required: false
         description: Filter by service status
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
     responses:
       200:
-        description: List of all services
+        description: Page of services
+      400:
+        description: Invalid cursor
       401:
         description: Unauthorized
       403:
         description: Forbidden - Admin access required
     """
     status = request.args.get('status')
+    cursor, limit = get_page_args()
     
     try:
-        services = admin_service.get_all_services(status)
-        return jsonify([service.to_dict() for service in services]), 200
+        services = admin_service.get_all_services(status, cursor, limit)
+        return jsonify(services.to_dict('services')), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -81,19 +103,35 @@ def get_all_bookings_admin():
         type: string
         required: false
         description: Filter by booking status
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
     responses:
       200:
-        description: List of all bookings
+        description: Page of bookings
+      400:
+        description: Invalid cursor
       401:
         description: Unauthorized
       403:
         description: Forbidden - Admin access required
     """
     status = request.args.get('status')
+    cursor, limit = get_page_args()
     
     try:
-        bookings = admin_service.get_all_bookings(status)
-        return jsonify([booking.to_dict() for booking in bookings]), 200
+        bookings = admin_service.get_all_bookings(status, cursor, limit)
+        return jsonify(bookings.to_dict('bookings')), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -114,29 +152,164 @@ def get_all_transactions_admin():
         type: string
         required: false
         description: Filter by transaction type
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page
       - name: limit
         in: query
         type: integer
         required: false
         default: 50
-        description: Limit the number of results
+        description: Page size (max 200)
     responses:
       200:
-        description: List of all transactions
+        description: Page of transactions
+      400:
+        description: Invalid cursor
       401:
         description: Unauthorized
       403:
         description: Forbidden - Admin access required
     """
     transaction_type = request.args.get('transaction_type')
-    limit = request.args.get('limit', 50, type=int)
+    cursor, limit = get_page_args()
     
     try:
-        transactions = admin_service.get_all_transactions(transaction_type, limit)
-        return jsonify([transaction.to_dict() for transaction in transactions]), 200
+        transactions = admin_service.get_all_transactions(transaction_type, cursor, limit)
+        return jsonify(transactions.to_dict('transactions')), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/bookings/export', methods=['GET'])
+@jwt_required()
+@admin_required
+def export_bookings_admin():
+    """
+    Export bookings as a streamed CSV or NDJSON download (Admin view)
+    ---
+    tags:
+      - Admin
+    security:
+      - JWT: []
+    parameters:
+      - name: format
+        in: query
+        type: string
+        enum: [csv, ndjson]
+        required: false
+        default: csv
+        description: File format (CSV with a header row, or one JSON object per line)
+      - name: start
+        in: query
+        type: string
+        format: date
+        required: false
+        description: First creation date to include (YYYY-MM-DD, defaults to the start of this month)
+      - name: end
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Last creation date to include (YYYY-MM-DD, defaults to today)
+      - name: status
+        in: query
+        type: string
+        required: false
+        description: Filter by booking status
+      - name: service_type
+        in: query
+        type: string
+        required: false
+        description: Filter by service type
+    responses:
+      200:
+        description: Bookings created in the date range, oldest first
+      400:
+        description: Invalid format or date range
+      401:
+        description: Unauthorized
+      403:
+        description: Forbidden - Admin access required
+    """
+    try:
+        export_format = get_export_format()
+        start, end = get_date_range_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    fields, rows = admin_service.export_bookings(
+        start, end,
+        status=request.args.get('status'),
+        service_type=request.args.get('service_type'),
+        batch_size=current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    )
+    filename = f"bookings-{start:%Y-%m-%d}-{end - timedelta(days=1):%Y-%m-%d}"
+    return export_response(fields, rows, export_format, filename)
+
+@admin_bp.route('/transactions/export', methods=['GET'])
+@jwt_required()
+@admin_required
+def export_transactions_admin():
+    """
+    Export wallet transactions as a streamed CSV or NDJSON download (Admin view)
+    ---
+    tags:
+      - Admin
+    security:
+      - JWT: []
+    parameters:
+      - name: format
+        in: query
+        type: string
+        enum: [csv, ndjson]
+        required: false
+        default: csv
+        description: File format (CSV with a header row, or one JSON object per line)
+      - name: start
+        in: query
+        type: string
+        format: date
+        required: false
+        description: First creation date to include (YYYY-MM-DD, defaults to the start of this month)
+      - name: end
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Last creation date to include (YYYY-MM-DD, defaults to today)
+      - name: transaction_type
+        in: query
+        type: string
+        required: false
+        description: Filter by transaction type
+    responses:
+      200:
+        description: Transactions created in the date range, oldest first
+      400:
+        description: Invalid format or date range
+      401:
+        description: Unauthorized
+      403:
+        description: Forbidden - Admin access required
+    """
+    try:
+        export_format = get_export_format()
+        start, end = get_date_range_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    fields, rows = admin_service.export_transactions(
+        start, end,
+        transaction_type=request.args.get('transaction_type'),
+        batch_size=current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    )
+    filename = f"transactions-{start:%Y-%m-%d}-{end - timedelta(days=1):%Y-%m-%d}"
+    return export_response(fields, rows, export_format, filename)
+
 @admin_bp.route('/services/<int:service_id>', methods=['PUT'])
 @jwt_required()
 @admin_required
@@ -274,3 +447,109 @@ def admin_update_user(user_id):
         return jsonify({'error': str(e)}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/reconciliation', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_reconciliation_report():
+    """
+    Get a wallet reconciliation run and the wallets that drifted in it
+    ---
+    tags:
+      - Admin
+    security:
+      - JWT: []
+    parameters:
+      - name: run_id
+        in: query
+        type: integer
+        required: false
+        description: Run to report on (defaults to the latest run)
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page of drifts
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+        description: Drifts per page (max 200)
+    responses:
+      200:
+        description: Run summary and a page of drifted wallets with their stored and ledger balances
+      400:
+        description: Invalid cursor
+      401:
+        description: Unauthorized
+      403:
+        description: Forbidden - Admin access required
+      404:
+        description: No reconciliation run found
+    """
+    run_id = request.args.get('run_id', type=int)
+    cursor, limit = get_page_args()
+    
+    try:
+        run, drifts = ReconciliationService.get_report(run_id, cursor, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not run:
+        return jsonify({'error': 'Reconciliation run not found'}), 404
+    return jsonify(dict(drifts.to_dict('drifts'), run=run.to_dict())), 200
+
+@admin_bp.route('/reconciliation', methods=['POST'])
+@jwt_required()
+@admin_required
+def run_reconciliation():
+    """
+    Reconcile wallet balances with the ledger now
+    ---
+    tags:
+      - Admin
+    security:
+      - JWT: []
+    parameters:
+      - name: body
+        in: body
+        required: false
+        schema:
+          type: object
+          properties:
+            mode:
+              type: string
+              enum: [INCREMENTAL]
+              default: INCREMENTAL
+              description: Check the wallets changed since the last completed run. Full runs check every wallet and are started with `python reconcile_wallets.py --full`
+    responses:
+      200:
+        description: Completed run summary and the first page of drifted wallets
+      400:
+        description: Invalid mode, a full run was requested, or no run has completed yet
+      401:
+        description: Unauthorized
+      403:
+        description: Forbidden - Admin access required
+    """
+    data = request.get_json(silent=True) or {}
+    mode = data.get('mode', ReconciliationMode.INCREMENTAL)
+    if mode == ReconciliationMode.FULL:
+        # A full run reads every wallet and could outlast the request; it runs from the CLI
+        return jsonify({'error': 'Full reconciliation runs from the command line: python reconcile_wallets.py --full'}), 400
+    if mode != ReconciliationMode.INCREMENTAL:
+        return jsonify({'error': 'mode must be INCREMENTAL'}), 400
+    
+    try:
+        # Without a completed run an incremental run would check every wallet
+        if ReconciliationService.get_checkpoint() is None:
+            return jsonify({'error': 'No completed reconciliation run yet; start with: python reconcile_wallets.py --full'}), 400
+        
+        # Checked in this process; reconcile_wallets.py runs the nightly check across a process pool
+        run = ReconciliationService.run(mode, workers=1)
+        run, drifts = ReconciliationService.get_report(run.id)
+        return jsonify(dict(drifts.to_dict('drifts'), run=run.to_dict())), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
@@ -1,12 +1,16 @@
-from flask import Blueprint, request, jsonify
+from datetime import datetime
+from flask import Blueprint, request, jsonify, url_for
 from flask_login import current_user
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import ValidationError
 
 from services.booking_service import BookingService
+from services.payment_queue_service import PaymentQueueService
 from services.service_service import ServiceService
 from models.booking import BookingStatus
 from utils.auth_utils import admin_required, service_provider_required
+from utils.idempotency import idempotent
+from utils.pagination import get_page_args
 
 booking_bp = Blueprint('booking', __name__)
 
@@ -26,28 +30,43 @@ def get_bookings():
         type: string
         required: false
         description: Filter by status
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
     responses:
       200:
-        description: List of bookings
+        description: Page of bookings
+      400:
+        description: Invalid cursor
       401:
         description: Unauthorized
     """
     # Get the current user id from the JWT token
     user_id = get_jwt_identity()
     status = request.args.get('status')
+    cursor, limit = get_page_args()
 
-    # Get all bookings for admin
-    if current_user.is_admin:
-        bookings = BookingService.get_all_bookings(status)
-        return jsonify([booking.to_dict() for booking in bookings]), 200
-    
-    # Get bookings - different endpoints for consumer vs provider
-    if current_user.is_service_provider:
-        bookings = BookingService.get_provider_bookings(user_id, status)
-    else:
-        bookings = BookingService.get_user_bookings(user_id, status)
+    try:
+        # Get all bookings for admin
+        if current_user.is_admin:
+            bookings = BookingService.get_all_bookings(status, cursor, limit)
+        # Get bookings - different endpoints for consumer vs provider
+        elif current_user.is_service_provider:
+            bookings = BookingService.get_provider_bookings(user_id, status, cursor, limit)
+        else:
+            bookings = BookingService.get_user_bookings(user_id, status, cursor, limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    return jsonify([booking.to_dict() for booking in bookings]), 200
+    return jsonify(bookings.to_dict('bookings')), 200
 
 @booking_bp.route('/<int:booking_id>', methods=['GET'])
 @jwt_required()
@@ -182,8 +201,81 @@ def create_booking():
     except Exception as e:
         return jsonify({"error": f"Error creating booking: {str(e)}"}), 500
 
+@booking_bp.route('/batch', methods=['POST'])
+@jwt_required()
+@idempotent
+def create_batch_bookings():
+    """
+    Book and pay for several services in one transaction
+    ---
+    tags:
+      - Bookings
+    security:
+      - JWT: []
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - items
+          properties:
+            items:
+              type: array
+              items:
+                type: object
+                required:
+                  - service_id
+                properties:
+                  service_id:
+                    type: integer
+                  quantity:
+                    type: integer
+                    default: 1
+                  notes:
+                    type: string
+                  start_time:
+                    type: string
+                    format: date-time
+                  end_time:
+                    type: string
+                    format: date-time
+    responses:
+      201:
+        description: All items booked and paid; per-item results
+      400:
+        description: Nothing was booked; per-item results give the reasons
+      401:
+        description: Unauthorized
+    """
+    # Get the current user id from the JWT token
+    user_id = get_jwt_identity()
+    
+    # Get request data
+    data = request.get_json()
+    if not data or not isinstance(data.get('items'), list) or not data['items']:
+        return jsonify({"error": "items must be a non-empty list"}), 400
+    
+    items = []
+    for index, raw_item in enumerate(data['items']):
+        if not isinstance(raw_item, dict) or 'service_id' not in raw_item:
+            return jsonify({"error": f"items[{index}].service_id is required"}), 400
+        item = dict(raw_item)
+        for field in ('start_time', 'end_time'):
+            if item.get(field):
+                try:
+                    item[field] = datetime.fromisoformat(item[field].replace('Z', '+00:00'))
+                except (ValueError, AttributeError):
+                    return jsonify({"error": f"items[{index}].{field} must be an ISO date-time"}), 400
+        items.append(item)
+    
+    success, results = BookingService.create_batch_bookings(user_id, items)
+    return jsonify({"success": success, "items": results}), 201 if success else 400
+
 @booking_bp.route('/<int:booking_id>/payment', methods=['POST'])
 @jwt_required()
+@idempotent
 def process_payment(booking_id):
     """
     Process payment for a booking
@@ -198,9 +290,16 @@ def process_payment(booking_id):
         type: integer
         required: true
         description: Booking ID
+      - name: async
+        in: query
+        type: boolean
+        required: false
+        description: Queue the payment and return a job to poll instead of waiting
     responses:
       200:
         description: Payment processed successfully
+      202:
+        description: Payment queued; poll the job's status_url
       400:
         description: Invalid input data or insufficient funds
       401:
@@ -226,6 +325,15 @@ def process_payment(booking_id):
     if booking.status != BookingStatus.PENDING:
         return jsonify({"error": f"Booking is already {booking.status}"}), 400
     
+    # Hand the payment to the payment workers if requested
+    if request.args.get('async', 'false').lower() == 'true':
+        success, result = PaymentQueueService.enqueue_payment(booking_id, user_id)
+        if not success:
+            return jsonify({"error": result}), 400
+        status_url = url_for('booking.get_payment_job', job_id=result.id)
+        response = jsonify({"message": "Payment queued", "job": result.to_dict(), "status_url": status_url})
+        return response, 202, {'Location': status_url}
+    
     # Process payment
     success, message = BookingService.process_payment(booking_id)
     
@@ -234,6 +342,39 @@ def process_payment(booking_id):
     else:
         return jsonify({"error": message}), 400
 
+@booking_bp.route('/payment-jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_payment_job(job_id):
+    """
+    Get the status of a queued payment
+    ---
+    tags:
+      - Bookings
+    security:
+      - JWT: []
+    parameters:
+      - name: job_id
+        in: path
+        type: integer
+        required: true
+        description: Payment job ID
+    responses:
+      200:
+        description: Payment job status (QUEUED, PROCESSING, SUCCEEDED or FAILED)
+      401:
+        description: Unauthorized
+      404:
+        description: Payment job not found
+    """
+    # Get the current user id from the JWT token
+    user_id = get_jwt_identity()
+    
+    job = PaymentQueueService.get_job(job_id)
+    if not job or job.user_id != user_id:
+        return jsonify({"error": "Payment job not found"}), 404
+    
+    return jsonify(job.to_dict()), 200
+
 @booking_bp.route('/<int:booking_id>/cancel', methods=['POST'])
 @jwt_required()
 def cancel_booking(booking_id):
@@ -400,4 +541,63 @@ def reject_booking(booking_id):
     if success:
         return jsonify({"message": message}), 200
     else:
-        return jsonify({"error": message}), 400
\ No newline at end of file
+        return jsonify({"error": message}), 400
+
+@booking_bp.route('/bulk/<action>', methods=['POST'])
+@jwt_required()
+@service_provider_required
+def bulk_update_bookings(action):
+    """
+    Confirm, reject or complete several bookings at once (provider only)
+    ---
+    tags:
+      - Bookings
+    security:
+      - JWT: []
+    parameters:
+      - name: action
+        in: path
+        type: string
+        required: true
+        enum: [confirm, reject, complete]
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - booking_ids
+          properties:
+            booking_ids:
+              type: array
+              items:
+                type: integer
+            reason:
+              type: string
+              description: Rejection reason (reject only)
+    responses:
+      200:
+        description: Per-booking results
+      400:
+        description: Invalid input data or action
+      401:
+        description: Unauthorized
+    """
+    # Get the current user id from the JWT token
+    user_id = get_jwt_identity()
+    
+    # Get request data
+    data = request.get_json()
+    booking_ids = data.get('booking_ids') if data else None
+    if not isinstance(booking_ids, list) or not all(isinstance(booking_id, int) for booking_id in booking_ids):
+        return jsonify({"error": "booking_ids must be a list of booking IDs"}), 400
+    
+    # Ownership and status are checked per booking by the update itself
+    success, result = BookingService.bulk_update_status(
+        booking_ids, action, user_id, is_admin=current_user.is_admin, reason=data.get('reason')
+    )
+    
+    if success:
+        return jsonify({"results": result}), 200
+    else:
+        return jsonify({"error": result}), 400
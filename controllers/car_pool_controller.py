@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.car_pool_service import CarPoolService
 from utils.jwt_manager import service_provider_required
 from models.car_pool import VehicleType
+from utils.pagination import get_page_args
 
 car_pool_bp = Blueprint('car_pool', __name__)
 car_pool_service = CarPoolService()
@@ -39,6 +40,11 @@ def get_car_pool_services():
         type: string
         required: false
         description: Filter by departure date (YYYY-MM-DD)
+      - name: include_full
+        in: query
+        type: boolean
+        required: false
+        description: Also list fully booked rides, which can be waitlisted
     responses:
       200:
         description: List of car/bike pool services
@@ -49,13 +55,15 @@ def get_car_pool_services():
     source = request.args.get('source')
     destination = request.args.get('destination')
     date = request.args.get('date')
+    include_full = request.args.get('include_full', 'false').lower() == 'true'
     
     try:
         services = car_pool_service.get_car_pool_services(
             vehicle_type=vehicle_type,
             source=source,
             destination=destination,
-            date=date
+            date=date,
+            include_full=include_full
         )
         return jsonify([service.to_dict() for service in services]), 200
     except Exception as e:
@@ -290,3 +298,130 @@ def book_car_pool_service(service_id):
         return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@car_pool_bp.route('/<int:service_id>/waitlist', methods=['POST'])
+@jwt_required()
+def join_waitlist(service_id):
+    """
+    Join the waitlist for a fully booked car/bike pool service
+    ---
+    tags:
+      - Car Pool
+    security:
+      - JWT: []
+    parameters:
+      - name: service_id
+        in: path
+        type: integer
+        required: true
+        description: Service ID
+      - name: body
+        in: body
+        required: false
+        schema:
+          type: object
+          properties:
+            num_seats:
+              type: integer
+              minimum: 1
+    responses:
+      201:
+        description: Joined the waitlist
+      400:
+        description: Invalid input data, seats available, or already waiting
+      401:
+        description: Unauthorized
+    """
+    identity = get_jwt_identity()
+    user_id = identity['user_id']
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        num_seats = int(data.get('num_seats', 1))
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Invalid number of seats'}), 400
+    
+    try:
+        entry = car_pool_service.join_waitlist(user_id=user_id, service_id=service_id, num_seats=num_seats)
+        return jsonify({'message': 'Joined the waitlist', 'entry': entry.to_dict()}), 201
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@car_pool_bp.route('/<int:service_id>/waitlist', methods=['DELETE'])
+@jwt_required()
+def leave_waitlist(service_id):
+    """
+    Leave the waitlist for a car/bike pool service
+    ---
+    tags:
+      - Car Pool
+    security:
+      - JWT: []
+    parameters:
+      - name: service_id
+        in: path
+        type: integer
+        required: true
+        description: Service ID
+    responses:
+      200:
+        description: Left the waitlist
+      400:
+        description: Not on the waitlist
+      401:
+        description: Unauthorized
+    """
+    identity = get_jwt_identity()
+    user_id = identity['user_id']
+    
+    try:
+        car_pool_service.leave_waitlist(user_id=user_id, service_id=service_id)
+        return jsonify({'message': 'Left the waitlist'}), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@car_pool_bp.route('/waitlist', methods=['GET'])
+@jwt_required()
+def get_my_waitlist():
+    """
+    Get current user's waitlist entries
+    ---
+    tags:
+      - Car Pool
+    security:
+      - JWT: []
+    parameters:
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
+    responses:
+      200:
+        description: Page of waitlist entries, with the booking for promoted entries
+      400:
+        description: Invalid cursor
+      401:
+        description: Unauthorized
+    """
+    identity = get_jwt_identity()
+    user_id = identity['user_id']
+    cursor, limit = get_page_args()
+    
+    try:
+        entries = car_pool_service.get_user_waitlist(user_id, cursor, limit)
+        return jsonify(entries.to_dict('entries')), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.feedback_service import FeedbackService
+from utils.pagination import decode_cursor, get_page_args
 
 feedback_bp = Blueprint('feedback', __name__)
 feedback_service = FeedbackService()
@@ -91,17 +92,39 @@ def get_service_feedback(service_id):
         type: integer
         required: true
         description: Service ID
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
     responses:
       200:
-        description: List of feedback for the service
+        description: Page of feedback for the service
+      400:
+        description: Invalid cursor
       401:
         description: Unauthorized
       404:
         description: Service not found
     """
+    cursor, limit = get_page_args()
+    
+    # Check the cursor first, since a missing service is also reported as a ValueError
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
     try:
-        feedbacks = feedback_service.get_service_feedback(service_id)
-        return jsonify([feedback.to_dict() for feedback in feedbacks]), 200
+        feedbacks = feedback_service.get_service_feedback(service_id, cursor, limit)
+        return jsonify(feedbacks.to_dict('feedback')), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 404
     except Exception as e:
@@ -123,17 +146,39 @@ def get_provider_feedback(provider_id):
         type: integer
         required: true
         description: Provider ID
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
     responses:
       200:
-        description: List of feedback for the provider
+        description: Page of feedback for the provider
+      400:
+        description: Invalid cursor
       401:
         description: Unauthorized
       404:
         description: Provider not found
     """
+    cursor, limit = get_page_args()
+    
+    # Check the cursor first, since a missing provider is also reported as a ValueError
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
     try:
-        feedbacks = feedback_service.get_provider_feedback(provider_id)
-        return jsonify([feedback.to_dict() for feedback in feedbacks]), 200
+        feedbacks = feedback_service.get_provider_feedback(provider_id, cursor, limit)
+        return jsonify(feedbacks.to_dict('feedback')), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 404
     except Exception as e:
@@ -149,18 +194,35 @@ def get_user_feedback():
       - Feedback
     security:
       - JWT: []
+    parameters:
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
     responses:
       200:
-        description: List of feedback given by the user
+        description: Page of feedback given by the user
+      400:
+        description: Invalid cursor
       401:
         description: Unauthorized
     """
     identity = get_jwt_identity()
     user_id = identity['user_id']
+    cursor, limit = get_page_args()
     
     try:
-        feedbacks = feedback_service.get_user_feedback(user_id)
-        return jsonify([feedback.to_dict() for feedback in feedbacks]), 200
+        feedbacks = feedback_service.get_user_feedback(user_id, cursor, limit)
+        return jsonify(feedbacks.to_dict('feedback')), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -209,6 +271,7 @@ def update_feedback(feedback_id):
     data = request.get_json()
     
     # Validate rating if provided
+    rating = None
     if 'rating' in data:
         try:
             rating = int(data['rating'])
@@ -221,7 +284,7 @@ def update_feedback(feedback_id):
         feedback = feedback_service.update_feedback(
             feedback_id=feedback_id,
             user_id=user_id,
-            rating=data.get('rating'),
+            rating=rating,
             review=data.get('review')
         )
         
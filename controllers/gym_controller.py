@@ -2,7 +2,9 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.gym_service import GymService
 from utils.jwt_manager import service_provider_required
+from utils.idempotency import idempotent
 from models.gym import SubscriptionPlan
+from utils.pagination import get_page_args
 
 gym_bp = Blueprint('gym', __name__)
 gym_service = GymService()
@@ -33,23 +35,40 @@ def get_gym_services():
         type: boolean
         required: false
         description: Filter by dietician availability
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor from the previous page
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size
     responses:
       200:
         description: List of gym services
+      400:
+        description: Invalid cursor
       401:
         description: Unauthorized
     """
     facility_type = request.args.get('facility_type')
     trainers_available = request.args.get('trainers_available', type=bool)
     dietician_available = request.args.get('dietician_available', type=bool)
+    cursor, limit = get_page_args()
     
     try:
         services = gym_service.get_gym_services(
             facility_type=facility_type,
             trainers_available=trainers_available,
-            dietician_available=dietician_available
+            dietician_available=dietician_available,
+            cursor=cursor,
+            limit=limit
         )
-        return jsonify([service.to_dict() for service in services]), 200
+        return jsonify(services.to_dict('services')), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -235,6 +254,7 @@ def update_gym_service(service_id):
 
 @gym_bp.route('/<int:service_id>/subscribe', methods=['POST'])
 @jwt_required()
+@idempotent
 def subscribe_to_gym(service_id):
     """
     Subscribe to a gym service
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.service_service import ServiceService
 from utils.jwt_manager import admin_required, service_provider_required
 from models.service import ServiceType, ServiceStatus
+from utils.pagination import get_page_args
 
 service_bp = Blueprint('service', __name__)
 service_service = ServiceService()
@@ -53,6 +54,76 @@ def get_all_services():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@service_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_services():
+    """
+    Search services by name and description
+    ---
+    tags:
+      - Services
+    security:
+      - JWT: []
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: Search terms (each term matches as a word prefix)
+      - name: service_type
+        in: query
+        type: string
+        required: false
+        description: Filter by service type
+      - name: status
+        in: query
+        type: string
+        required: false
+        description: Filter by status (deleted services are excluded by default)
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor from the previous page
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size
+    responses:
+      200:
+        description: Matching services, best match first, with highlighted fragments
+      400:
+        description: Missing search terms or invalid cursor
+      401:
+        description: Unauthorized
+    """
+    search_term = request.args.get('q', '').strip()
+    if not search_term:
+        return jsonify({'error': 'Search term is required'}), 400
+    
+    service_type = request.args.get('service_type')
+    status = request.args.get('status')
+    cursor, limit = get_page_args()
+    
+    def serialize(row):
+        service, rank, name_highlight, description_highlight = row
+        result = service.to_dict()
+        result['rank'] = rank
+        result['highlights'] = {
+            'name': name_highlight,
+            'description': description_highlight
+        }
+        return result
+    
+    try:
+        results = service_service.search_services(search_term, service_type, status, cursor, limit)
+        return jsonify(results.to_dict('services', serialize)), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @service_bp.route('/<int:service_id>', methods=['GET'])
 @jwt_required()
 def get_service(service_id):
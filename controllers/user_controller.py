@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.user_service import UserService
 from utils.jwt_manager import admin_required, service_provider_required
+from utils.pagination import get_page_args
 
 user_bp = Blueprint('user', __name__)
 user_service = UserService()
@@ -28,9 +29,22 @@ def get_all_users():
         type: string
         required: false
         description: Filter by user status (ACTIVE, PENDING, INACTIVE)
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
     responses:
       200:
-        description: List of users
+        description: Page of users
+      400:
+        description: Invalid cursor
       401:
         description: Unauthorized
       403:
@@ -38,10 +52,13 @@ def get_all_users():
     """
     role = request.args.get('role')
     status = request.args.get('status')
+    cursor, limit = get_page_args()
     
     try:
-        users = user_service.get_all_users(role=role, status=status)
-        return jsonify([user.to_dict() for user in users]), 200
+        users = user_service.get_all_users(role=role, status=status, cursor=cursor, limit=limit)
+        return jsonify(users.to_dict('users')), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -109,18 +126,36 @@ def get_service_providers():
         type: string
         required: false
         description: Filter by status (default is ACTIVE)
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
     responses:
       200:
-        description: List of service providers
+        description: Page of service providers
+      400:
+        description: Invalid cursor
       401:
         description: Unauthorized
     """
     service_type = request.args.get('service_type')
     status = request.args.get('status', 'ACTIVE')
+    cursor, limit = get_page_args()
     
     try:
-        providers = user_service.get_service_providers(service_type=service_type, status=status)
-        return jsonify([provider.to_dict() for provider in providers]), 200
+        providers = user_service.get_service_providers(
+            service_type=service_type, status=status, cursor=cursor, limit=limit
+        )
+        return jsonify(providers.to_dict('providers')), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -135,17 +170,35 @@ def get_pending_providers():
       - Users
     security:
       - JWT: []
+    parameters:
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
     responses:
       200:
-        description: List of pending service providers
+        description: Page of pending service providers
+      400:
+        description: Invalid cursor
       401:
         description: Unauthorized
       403:
         description: Forbidden - Admin access required
     """
+    cursor, limit = get_page_args()
+    
     try:
-        providers = user_service.get_service_providers(status='PENDING')
-        return jsonify([provider.to_dict() for provider in providers]), 200
+        providers = user_service.get_service_providers(status='PENDING', cursor=cursor, limit=limit)
+        return jsonify(providers.to_dict('providers')), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -218,3 +271,70 @@ def deactivate_provider(provider_id):
         return jsonify({'error': str(e)}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/notifications', methods=['GET'])
+@jwt_required()
+def get_notifications():
+    """
+    Get current user's notifications
+    ---
+    tags:
+      - Users
+    security:
+      - JWT: []
+    parameters:
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
+    responses:
+      200:
+        description: Page of notifications, newest first
+      400:
+        description: Invalid cursor
+      401:
+        description: Unauthorized
+    """
+    identity = get_jwt_identity()
+    user_id = identity['user_id']
+    cursor, limit = get_page_args()
+    
+    try:
+        notifications = user_service.get_notifications(user_id, cursor, limit)
+        return jsonify(notifications.to_dict('notifications')), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@user_bp.route('/notifications/read', methods=['POST'])
+@jwt_required()
+def mark_notifications_read():
+    """
+    Mark all of the current user's notifications as read
+    ---
+    tags:
+      - Users
+    security:
+      - JWT: []
+    responses:
+      200:
+        description: Notifications marked as read
+      401:
+        description: Unauthorized
+    """
+    identity = get_jwt_identity()
+    user_id = identity['user_id']
+    
+    try:
+        count = user_service.mark_notifications_read(user_id)
+        return jsonify({'message': f'{count} notifications marked as read'}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
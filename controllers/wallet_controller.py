@@ -6,6 +6,9 @@ from marshmallow import ValidationError
 from services.wallet_service import WalletService
 from models.user import UserRole
 from utils.auth_utils import admin_required
+from utils.idempotency import idempotent
+from utils.pagination import get_page_args
+from utils.validators import get_date_range_args
 
 wallet_bp = Blueprint('wallet', __name__)
 
@@ -57,15 +60,22 @@ def get_transactions():
     security:
       - JWT: []
     parameters:
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page
       - name: limit
         in: query
         type: integer
         required: false
         default: 10
-        description: Maximum number of transactions to return
+        description: Page size (max 200)
     responses:
       200:
-        description: List of transactions
+        description: Page of transactions
+      400:
+        description: Invalid cursor
       401:
         description: Unauthorized
       404:
@@ -79,18 +89,81 @@ def get_transactions():
     if not wallet:
         return jsonify({"error": "Wallet not found"}), 404
     
-    # Get limit from query parameters
-    limit = int(request.args.get('limit', 10))
+    # Get pagination parameters
+    cursor, limit = get_page_args()
     
     # Get transactions
-    transactions = WalletService.get_transactions(wallet.id, limit)
+    try:
+        transactions = WalletService.get_transactions(wallet.id, limit or 10, cursor)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    return jsonify({
-        "transactions": [tx.to_dict() for tx in transactions]
-    }), 200
+    return jsonify(transactions.to_dict('transactions')), 200
+
+@wallet_bp.route('/statement', methods=['GET'])
+@jwt_required()
+def get_statement():
+    """
+    Get a wallet statement for a date range
+    ---
+    tags:
+      - Wallet
+    security:
+      - JWT: []
+    parameters:
+      - name: start
+        in: query
+        type: string
+        format: date
+        required: false
+        description: First day of the statement (YYYY-MM-DD, defaults to the start of this month)
+      - name: end
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Last day of the statement (YYYY-MM-DD, defaults to today)
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Cursor returned as next_cursor by the previous page of lines
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+        description: Statement lines per page (max 200)
+    responses:
+      200:
+        description: Opening and closing balances, totals by type, monthly summaries and lines with running balances
+      400:
+        description: Invalid date range or cursor
+      401:
+        description: Unauthorized
+      404:
+        description: Wallet not found
+    """
+    # Get the current user id from the JWT token
+    user_id = get_jwt_identity()
+    
+    # Get the wallet
+    wallet = WalletService.get_wallet(user_id)
+    if not wallet:
+        return jsonify({"error": "Wallet not found"}), 404
+    
+    try:
+        start, end = get_date_range_args()
+        cursor, limit = get_page_args()
+        statement = WalletService.get_statement(wallet.id, start, end, cursor, limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(statement), 200
 
 @wallet_bp.route('/add-funds', methods=['POST'])
 @jwt_required()
+@idempotent
 def add_funds():
     """
     Add funds to user wallet
@@ -152,6 +225,7 @@ def add_funds():
 
 @wallet_bp.route('/transfer', methods=['POST'])
 @jwt_required()
+@idempotent
 def transfer_funds():
     """
     Transfer funds to another user
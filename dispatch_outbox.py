@@ -0,0 +1,35 @@
+import time
+import threading
+from app import app, db
+from services.outbox_service import OutboxService
+import services.event_handlers  # Registers the event handlers
+
+# Run one long-lived dispatcher next to the web workers; events are delivered in order
+def dispatch_outbox(stop_event=None):
+    stop_event = stop_event or threading.Event()
+    poll_interval = app.config.get('OUTBOX_POLL_INTERVAL', 1.0)
+    last_purge = 0
+    print("Dispatching outbox events...")
+    
+    with app.app_context():
+        try:
+            while not stop_event.is_set():
+                try:
+                    if OutboxService.dispatch_batch():
+                        continue
+                    # Clean up delivered events at most once an hour while idle
+                    if time.monotonic() - last_purge > 3600:
+                        OutboxService.purge_dispatched()
+                        last_purge = time.monotonic()
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.error(f"Outbox dispatcher error: {str(e)}")
+                finally:
+                    db.session.remove()
+                stop_event.wait(poll_interval)
+        except KeyboardInterrupt:
+            print("Stopping outbox dispatcher...")
+    print("Outbox dispatcher stopped!")
+
+if __name__ == "__main__":
+    dispatch_outbox()
\ No newline at end of file
@@ -0,0 +1,90 @@
+from app import db
+from models.booking import Booking
+from models.transaction import Transaction
+
+class TransactionArchive(db.Model):
+    """
+    A transaction moved out of the live table by the archive job
+    
+    Columns mirror Transaction and rows keep their original IDs. On
+    PostgreSQL the table is partitioned by month of created_at, so the
+    primary key includes it.
+    """
+    __tablename__ = 'transactions_archive'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    created_at = db.Column(db.DateTime, primary_key=True)
+    wallet_id = db.Column(db.Integer, nullable=False)
+    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    transaction_type = db.Column(db.String(20), nullable=False)
+    description = db.Column(db.String(255), nullable=True)
+    reference_id = db.Column(db.String(50), nullable=True)
+    
+    # Same list indexes as the live table
+    __table_args__ = (
+        db.Index('ix_transactions_archive_wallet_created', 'wallet_id', 'created_at'),
+        db.Index('ix_transactions_archive_type_created', 'transaction_type', 'created_at'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+    
+    # Serialized exactly like live rows
+    to_dict = Transaction.to_dict
+
+class BookingArchive(db.Model):
+    """
+    A finished booking moved out of the live table by the archive job
+    
+    Columns mirror Booking and rows keep their original IDs. On PostgreSQL
+    the table is partitioned by month of created_at, so the primary key
+    includes it.
+    """
+    __tablename__ = 'bookings_archive'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    created_at = db.Column(db.DateTime, primary_key=True)
+    service_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    booking_time = db.Column(db.DateTime, nullable=True)
+    status = db.Column(db.String(20), nullable=False)
+    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    quantity = db.Column(db.Integer, nullable=True)
+    start_time = db.Column(db.DateTime, nullable=True)
+    end_time = db.Column(db.DateTime, nullable=True)
+    notes = db.Column(db.Text, nullable=True)
+    transaction_id = db.Column(db.Integer, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    
+    # Same list indexes as the live table
+    __table_args__ = (
+        db.Index('ix_bookings_archive_user_created', 'user_id', 'created_at'),
+        db.Index('ix_bookings_archive_service_created', 'service_id', 'created_at'),
+        db.Index('ix_bookings_archive_status_created', 'status', 'created_at'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+    
+    # Read-only, since archived bookings never change
+    service = db.relationship('Service', primaryjoin='Service.id == foreign(BookingArchive.service_id)', viewonly=True, lazy=True)
+    
+    # Serialized exactly like live rows
+    to_dict = Booking.to_dict
+
+class ArchiveCutoff(db.Model):
+    """
+    How far the archive job has got for one live table
+    
+    Every archived row was created before archived_before, so a read that
+    only needs newer rows can skip the archive table.
+    """
+    __tablename__ = 'archive_cutoffs'
+    
+    table_name = db.Column(db.String(50), primary_key=True)
+    archived_before = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    
+    def to_dict(self):
+        return {
+            'table_name': self.table_name,
+            'archived_before': self.archived_before.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
@@ -2,6 +2,14 @@ from datetime import datetime
 from app import db
 from models.enum_types import BookingStatus
 
+# Booking lifecycle: action -> (statuses it is allowed from, status it moves to)
+BOOKING_TRANSITIONS = {
+    'confirm': ((BookingStatus.PENDING,), BookingStatus.CONFIRMED),
+    'reject': ((BookingStatus.PENDING,), BookingStatus.REJECTED),
+    'complete': ((BookingStatus.CONFIRMED,), BookingStatus.COMPLETED),
+    'cancel': ((BookingStatus.PENDING, BookingStatus.CONFIRMED), BookingStatus.CANCELLED)
+}
+
 class Booking(db.Model):
     __tablename__ = 'bookings'
     
@@ -18,6 +26,14 @@ class Booking(db.Model):
     transaction_id = db.Column(db.Integer, db.ForeignKey('transactions.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # Bumped on every status change
+    
+    # Indexes for the user, provider (via service) and admin booking lists
+    __table_args__ = (
+        db.Index('ix_bookings_user_created', 'user_id', 'created_at'),
+        db.Index('ix_bookings_service_created', 'service_id', 'created_at'),
+        db.Index('ix_bookings_status_created', 'status', 'created_at'),
+    )
     
     # Relationships
     user = db.relationship('User', backref=db.backref('bookings', lazy=True))
@@ -36,29 +52,31 @@ class Booking(db.Model):
         self.start_time = start_time
         self.end_time = end_time
     
+    def can(self, action):
+        """Check whether the booking's current status allows an action"""
+        return action in BOOKING_TRANSITIONS and self.status in BOOKING_TRANSITIONS[action][0]
+    
+    def _move(self, action):
+        """Apply a transition to this object only; BookingStateMachine persists it safely"""
+        if not self.can(action):
+            raise ValueError(f"Cannot {action} booking with status {self.status}")
+        self.status = BOOKING_TRANSITIONS[action][1]
+    
     def cancel(self):
         """Cancel a booking"""
-        if self.status not in [BookingStatus.PENDING, BookingStatus.CONFIRMED]:
-            raise ValueError(f"Cannot cancel booking with status {self.status}")
-        self.status = BookingStatus.CANCELLED
+        self._move('cancel')
     
     def confirm(self):
         """Confirm a booking"""
-        if self.status != BookingStatus.PENDING:
-            raise ValueError(f"Cannot confirm booking with status {self.status}")
-        self.status = BookingStatus.CONFIRMED
+        self._move('confirm')
     
     def complete(self):
         """Mark a booking as completed"""
-        if self.status != BookingStatus.CONFIRMED:
-            raise ValueError(f"Cannot complete booking with status {self.status}")
-        self.status = BookingStatus.COMPLETED
+        self._move('complete')
     
     def reject(self):
         """Reject a booking"""
-        if self.status != BookingStatus.PENDING:
-            raise ValueError(f"Cannot reject booking with status {self.status}")
-        self.status = BookingStatus.REJECTED
+        self._move('reject')
     
     def to_dict(self):
         return {
@@ -73,6 +91,7 @@ class Booking(db.Model):
             'end_time': self.end_time.isoformat() if self.end_time else None,
             'notes': self.notes,
             'transaction_id': self.transaction_id,
+            'version': self.version,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
\ No newline at end of file
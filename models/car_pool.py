@@ -1,7 +1,10 @@
 from app import db
+from sqlalchemy.orm import validates
 from models.service import Service
-from models.enum_types import ServiceType, VehicleType
+from models.enum_types import ServiceType, VehicleType, SeatHoldStatus
+from datetime import datetime
 import json
+import re
 
 class CarPoolService(Service):
     __tablename__ = 'car_pool_services'
@@ -16,6 +19,16 @@ class CarPoolService(Service):
     vehicle_model = db.Column(db.String(100), nullable=True)
     vehicle_number = db.Column(db.String(20), nullable=True)
     
+    # Normalized place names for indexed ride search, kept in sync by the validators below
+    source_key = db.Column(db.String(255), nullable=True)
+    destination_key = db.Column(db.String(255), nullable=True)
+    
+    __table_args__ = (
+        db.Index('ix_car_pool_departure_seats', 'departure_time', 'available_seats'),
+        db.Index('ix_car_pool_source_departure', 'source_key', 'departure_time'),
+        db.Index('ix_car_pool_destination_departure', 'destination_key', 'departure_time'),
+    )
+    
     __mapper_args__ = {
         'polymorphic_identity': ServiceType.CAR_POOL
     }
@@ -38,6 +51,16 @@ class CarPoolService(Service):
         self.vehicle_model = vehicle_model
         self.vehicle_number = vehicle_number
     
+    @staticmethod
+    def normalize_place(place):
+        """Normalize a place name for storage and lookup (case, punctuation, spacing)"""
+        return ' '.join(re.findall(r'\w+', (place or '').lower()))[:255]
+    
+    @validates('source', 'destination')
+    def _sync_place_key(self, key, value):
+        setattr(self, f'{key}_key', self.normalize_place(value))
+        return value
+    
     def book_seat(self, num_seats=1):
         """Book a seat in the car/bike pool"""
         if num_seats <= 0:
@@ -67,6 +90,7 @@ class CarPoolService(Service):
             'departure_time': self.departure_time.isoformat() if self.departure_time else None,
             'total_seats': self.total_seats,
             'available_seats': self.available_seats,
+            'is_fully_booked': self.is_fully_booked(),
             'vehicle_model': self.vehicle_model,
             'vehicle_number': self.vehicle_number
         }
@@ -94,3 +118,40 @@ class BikePoolService(CarPoolService):
         )
         # Override service_type
         self.service_type = ServiceType.BIKE_POOL
+
+class SeatHold(db.Model):
+    """
+    Seats set aside for a pending car/bike pool booking until it is paid
+    
+    The held seats are already taken off the ride's available_seats, so
+    availability reads need no join. Holds that pass expires_at without
+    being converted are returned to the ride by the sweeper.
+    """
+    __tablename__ = 'seat_holds'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('services.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'), nullable=True)
+    seats = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=SeatHoldStatus.ACTIVE)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # The sweeper scans active holds by expiry; payment and cancellation look up by booking
+    __table_args__ = (
+        db.Index('ix_seat_holds_status_expires', 'status', 'expires_at'),
+        db.Index('ix_seat_holds_booking_id', 'booking_id'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'service_id': self.service_id,
+            'user_id': self.user_id,
+            'booking_id': self.booking_id,
+            'seats': self.seats,
+            'status': self.status,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
\ No newline at end of file
@@ -38,4 +38,62 @@ class UserRole:
     
 class VehicleType:
     CAR = 'CAR'
-    BIKE = 'BIKE'
\ No newline at end of file
+    BIKE = 'BIKE'
+
+class RatingSubject:
+    SERVICE = 'SERVICE'
+    PROVIDER = 'PROVIDER'
+
+class LedgerAccountType:
+    WALLET = 'WALLET'
+    COMMISSION = 'COMMISSION'  # Commission shard sub-accounts
+    EXTERNAL = 'EXTERNAL'      # Money entering or leaving the platform
+
+class JournalEntryType:
+    OPENING_BALANCE = 'OPENING_BALANCE'
+    DEPOSIT = 'DEPOSIT'
+    TRANSFER = 'TRANSFER'
+    PAYMENT = 'PAYMENT'
+    REFUND = 'REFUND'
+    ADJUSTMENT = 'ADJUSTMENT'
+    COMMISSION_ROLLUP = 'COMMISSION_ROLLUP'
+
+class SeatHoldStatus:
+    ACTIVE = 'ACTIVE'        # Seats held while the user completes checkout
+    CONVERTED = 'CONVERTED'  # Paid; the seats now belong to the booking
+    RELEASED = 'RELEASED'    # Booking cancelled or rejected before payment
+    EXPIRED = 'EXPIRED'      # Released by the sweeper after the TTL passed
+
+class WaitlistStatus:
+    WAITING = 'WAITING'
+    PROMOTED = 'PROMOTED'    # A PENDING booking with a seat hold was created
+    CANCELLED = 'CANCELLED'  # Left the waitlist
+
+class PaymentJobStatus:
+    QUEUED = 'QUEUED'
+    PROCESSING = 'PROCESSING'
+    SUCCEEDED = 'SUCCEEDED'
+    FAILED = 'FAILED'
+
+class OutboxStatus:
+    PENDING = 'PENDING'        # Waiting to be delivered to the handlers
+    DISPATCHED = 'DISPATCHED'  # Every handler has run
+    FAILED = 'FAILED'          # Gave up after OUTBOX_MAX_ATTEMPTS
+
+class OutboxEventType:
+    BOOKING_CONFIRMED = 'booking.confirmed'
+    BOOKING_REJECTED = 'booking.rejected'
+    BOOKING_COMPLETED = 'booking.completed'
+    BOOKING_CANCELLED = 'booking.cancelled'
+    WALLET_FUNDS_ADDED = 'wallet.funds_added'
+    WALLET_TRANSFER = 'wallet.transfer'
+    WALLET_ADJUSTED = 'wallet.adjusted'
+
+class ReconciliationMode:
+    FULL = 'FULL'                # Every wallet
+    INCREMENTAL = 'INCREMENTAL'  # Wallets changed since the last completed run
+
+class ReconciliationStatus:
+    RUNNING = 'RUNNING'
+    COMPLETED = 'COMPLETED'
+    FAILED = 'FAILED'
\ No newline at end of file
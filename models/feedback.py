@@ -1,5 +1,6 @@
 from datetime import datetime
 from app import db
+from models.enum_types import RatingSubject
 
 class Feedback(db.Model):
     __tablename__ = 'feedbacks'
@@ -12,6 +13,13 @@ class Feedback(db.Model):
     review = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Indexes for the per-service, per-provider and per-user feedback lists
+    __table_args__ = (
+        db.Index('ix_feedbacks_service_created', 'service_id', 'created_at'),
+        db.Index('ix_feedbacks_provider_created', 'provider_id', 'created_at'),
+        db.Index('ix_feedbacks_user_service', 'user_id', 'service_id'),
+    )
+    
     def __init__(self, user_id, provider_id, service_id, rating, review=None):
         self.user_id = user_id
         self.provider_id = provider_id
@@ -22,9 +30,10 @@ class Feedback(db.Model):
     @staticmethod
     def get_average_rating(provider_id):
         """Get the average rating for a provider"""
-        from sqlalchemy import func
-        result = db.session.query(func.avg(Feedback.rating)).filter_by(provider_id=provider_id).scalar()
-        return float(result) if result else 0
+        aggregate = RatingAggregate.query.filter_by(
+            subject_type=RatingSubject.PROVIDER, subject_id=provider_id
+        ).first()
+        return aggregate.average if aggregate else 0
     
     def to_dict(self):
         return {
@@ -36,3 +45,49 @@ class Feedback(db.Model):
             'review': self.review,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+class RatingAggregate(db.Model):
+    """
+    Running rating totals for one service or provider
+    
+    Maintained alongside every feedback write so rating lookups read a
+    single row instead of scanning the feedback table.
+    """
+    __tablename__ = 'rating_aggregates'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    subject_type = db.Column(db.String(20), nullable=False)  # RatingSubject
+    subject_id = db.Column(db.Integer, nullable=False)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Histogram: number of ratings with each star value
+    stars_1 = db.Column(db.Integer, nullable=False, default=0)
+    stars_2 = db.Column(db.Integer, nullable=False, default=0)
+    stars_3 = db.Column(db.Integer, nullable=False, default=0)
+    stars_4 = db.Column(db.Integer, nullable=False, default=0)
+    stars_5 = db.Column(db.Integer, nullable=False, default=0)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('subject_type', 'subject_id', name='uq_rating_aggregates_subject'),
+    )
+    
+    @property
+    def average(self):
+        """Average rating, or 0 when there are no ratings"""
+        return self.rating_sum / self.rating_count if self.rating_count else 0
+    
+    def get_histogram(self):
+        """Get the number of ratings per star value as a dictionary"""
+        return {stars: getattr(self, f'stars_{stars}') for stars in range(1, 6)}
+    
+    def to_dict(self):
+        return {
+            'subject_type': self.subject_type,
+            'subject_id': self.subject_id,
+            'count': self.rating_count,
+            'average': round(self.average, 2),
+            'histogram': self.get_histogram()
+        }
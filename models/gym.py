@@ -20,6 +20,10 @@ class GymService(Service):
     # Subscription plans as JSON: {"MONTHLY": 2000, "QUARTERLY": 5500, "ANNUAL": 20000}
     subscription_plans = db.Column(db.String(255), nullable=False)
     
+    # Normalized copy of facility_types so it can be filtered in SQL
+    facilities = db.relationship('GymFacility', backref='gym_service', lazy=True,
+                                 cascade='all, delete-orphan')
+    
     __mapper_args__ = {
         'polymorphic_identity': ServiceType.GYM_FITNESS
     }
@@ -35,7 +39,7 @@ class GymService(Service):
             price=0  # Base price, actual price depends on subscription plan
         )
         self.gym_name = gym_name
-        self.facility_types = json.dumps(facility_types) if isinstance(facility_types, list) else facility_types
+        self.set_facility_types(facility_types)
         self.operating_hours = json.dumps(operating_hours) if isinstance(operating_hours, dict) else operating_hours
         self.subscription_plans = json.dumps(subscription_plans) if isinstance(subscription_plans, dict) else subscription_plans
         self.trainers_available = trainers_available
@@ -45,6 +49,20 @@ class GymService(Service):
         """Get the facility types as a list"""
         return json.loads(self.facility_types)
     
+    def set_facility_types(self, facility_types):
+        """Set the facility types from a list or JSON string, keeping the facilities index in sync"""
+        if isinstance(facility_types, str):
+            self.facility_types = facility_types
+            facility_types = json.loads(facility_types)
+        else:
+            self.facility_types = json.dumps(facility_types)
+        
+        normalized = {GymFacility.normalize(ft) for ft in facility_types if isinstance(ft, str) and ft.strip()}
+        self.facilities = [f for f in self.facilities if f.facility_type in normalized]
+        existing = {f.facility_type for f in self.facilities}
+        for facility_type in sorted(normalized - existing):
+            self.facilities.append(GymFacility(facility_type=facility_type))
+    
     def get_operating_hours(self):
         """Get the operating hours as a dictionary"""
         return json.loads(self.operating_hours)
@@ -72,6 +90,18 @@ class GymService(Service):
         }
         return {**base_dict, **gym_dict}
 
+class GymFacility(db.Model):
+    __tablename__ = 'gym_facilities'
+    
+    # Primary key leads with facility_type so filtering by type is an index range scan
+    facility_type = db.Column(db.String(50), primary_key=True)
+    gym_service_id = db.Column(db.Integer, db.ForeignKey('gym_services.id', ondelete='CASCADE'), primary_key=True)
+    
+    @staticmethod
+    def normalize(facility_type):
+        """Normalize a facility type for storage and lookup"""
+        return facility_type.strip().lower()[:50]
+
 class GymSubscription(db.Model):
     __tablename__ = 'gym_subscriptions'
     
@@ -86,6 +116,12 @@ class GymSubscription(db.Model):
     dietician_assigned = db.Column(db.String(100), nullable=True)
     is_active = db.Column(db.Boolean, default=True)
     
+    # Indexes for active-subscription lookups by user and by gym
+    __table_args__ = (
+        db.Index('ix_gym_subscriptions_user_end', 'user_id', 'end_date'),
+        db.Index('ix_gym_subscriptions_gym_end', 'gym_service_id', 'end_date'),
+    )
+    
     # Relationships
     user = db.relationship('User', backref='gym_subscriptions')
     gym_service = db.relationship('GymService', backref='subscriptions')
@@ -0,0 +1,37 @@
+import json
+from datetime import datetime
+from app import db
+
+class IdempotencyRecord(db.Model):
+    """
+    Stored response for a request sent with an Idempotency-Key header
+    
+    A record with no status code is a claim held by a request that is
+    still running; once it finishes, the response is saved so retries
+    with the same key replay it instead of repeating the operation.
+    """
+    __tablename__ = 'idempotency_keys'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String(255), nullable=False)  # Caller, method and path
+    key = db.Column(db.String(255), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    mimetype = db.Column(db.String(100), nullable=True)
+    response_headers = db.Column(db.Text, nullable=True)  # JSON object of headers to replay
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    
+    __table_args__ = (
+        db.UniqueConstraint('scope', 'key', name='uq_idempotency_keys_scope_key'),
+        db.Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+    
+    @property
+    def is_complete(self):
+        return self.status_code is not None
+    
+    @property
+    def headers(self):
+        return json.loads(self.response_headers) if self.response_headers else {}
@@ -0,0 +1,127 @@
+import json
+from datetime import datetime
+from app import db
+from models.enum_types import LedgerAccountType, JournalEntryType
+
+class JournalEntry(db.Model):
+    """
+    One balanced money movement (payment, refund, deposit, ...)
+    
+    Journal entries and their postings are append-only: corrections are
+    made with a new, reversing entry rather than by editing rows.
+    """
+    __tablename__ = 'journal_entries'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    entry_type = db.Column(db.String(30), nullable=False)  # JournalEntryType
+    reference_id = db.Column(db.String(50), nullable=True)  # For linking to bookings or other entities
+    description = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    postings = db.relationship('LedgerPosting', backref='entry', lazy=True)
+    
+    __table_args__ = (
+        db.Index('ix_journal_entries_reference_id', 'reference_id'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'entry_type': self.entry_type,
+            'reference_id': self.reference_id,
+            'description': self.description,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'postings': [posting.to_dict() for posting in self.postings]
+        }
+
+class LedgerPosting(db.Model):
+    """
+    A signed amount on one account: positive credits, negative debits
+    
+    The postings of a journal entry always sum to zero. Wallet postings
+    also record the wallet's running balance after the posting.
+    """
+    __tablename__ = 'ledger_postings'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    entry_id = db.Column(db.Integer, db.ForeignKey('journal_entries.id'), nullable=False)
+    account_type = db.Column(db.String(20), nullable=False)  # LedgerAccountType
+    account_id = db.Column(db.Integer, nullable=False)  # Wallet ID, shard number, or 0 for EXTERNAL
+    amount = db.Column(db.Numeric(12, 2), nullable=False)
+    balance_after = db.Column(db.Numeric(12, 2), nullable=True)  # Running balance (wallet accounts only)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Indexes for per-account history, balance deltas after a snapshot,
+    # and statement date ranges
+    __table_args__ = (
+        db.Index('ix_ledger_postings_account', 'account_type', 'account_id', 'id'),
+        db.Index('ix_ledger_postings_account_created', 'account_type', 'account_id', 'created_at'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'entry_id': self.entry_id,
+            'account_type': self.account_type,
+            'account_id': self.account_id,
+            'amount': float(self.amount),
+            'balance_after': float(self.balance_after) if self.balance_after is not None else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class BalanceSnapshot(db.Model):
+    """
+    An account's balance as of a given posting
+    
+    The current balance is the latest snapshot plus the postings after it.
+    """
+    __tablename__ = 'balance_snapshots'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    account_type = db.Column(db.String(20), nullable=False)
+    account_id = db.Column(db.Integer, nullable=False)
+    balance = db.Column(db.Numeric(12, 2), nullable=False)
+    last_posting_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_balance_snapshots_account', 'account_type', 'account_id', 'last_posting_id'),
+    )
+
+class WalletStatementMonth(db.Model):
+    """
+    One wallet's precomputed totals for a closed calendar month
+    
+    Rows are written by the statement job once a month is over, so a
+    statement for a long date range reads one row per month instead of
+    every posting.
+    """
+    __tablename__ = 'wallet_statement_months'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id'), nullable=False)
+    month = db.Column(db.Date, nullable=False)  # First day of the month
+    opening_balance = db.Column(db.Numeric(12, 2), nullable=False)
+    closing_balance = db.Column(db.Numeric(12, 2), nullable=False)
+    credits = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    debits = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    posting_count = db.Column(db.Integer, nullable=False, default=0)
+    breakdown = db.Column(db.Text, nullable=False)  # JSON: entry type -> credits, debits, count
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('wallet_id', 'month', name='uq_wallet_statement_months_wallet_month'),
+        db.Index('ix_wallet_statement_months_month', 'month'),
+    )
+    
+    def to_dict(self):
+        return {
+            'month': self.month.strftime('%Y-%m'),
+            'opening_balance': float(self.opening_balance),
+            'closing_balance': float(self.closing_balance),
+            'credits': float(self.credits),
+            'debits': float(self.debits),
+            'posting_count': self.posting_count,
+            'by_type': json.loads(self.breakdown)
+        }
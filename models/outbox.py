@@ -0,0 +1,48 @@
+import json
+from datetime import datetime
+from app import db
+from models.enum_types import OutboxStatus
+
+class OutboxEvent(db.Model):
+    """
+    A domain event recorded in the same transaction as the change it describes
+    
+    The outbox dispatcher delivers pending events to the registered
+    handlers in ID order.
+    """
+    __tablename__ = 'outbox_events'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    aggregate_type = db.Column(db.String(20), nullable=False)  # 'booking' or 'wallet'
+    aggregate_id = db.Column(db.Integer, nullable=False)
+    event_type = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    status = db.Column(db.String(20), nullable=False, default=OutboxStatus.PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    dispatched_at = db.Column(db.DateTime, nullable=True)
+    
+    # The dispatcher reads pending events in ID order
+    __table_args__ = (
+        db.Index('ix_outbox_events_status_id', 'status', 'id'),
+    )
+    
+    @property
+    def data(self):
+        """The decoded event payload"""
+        return json.loads(self.payload)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'aggregate_type': self.aggregate_type,
+            'aggregate_id': self.aggregate_id,
+            'event_type': self.event_type,
+            'payload': self.data,
+            'status': self.status,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'dispatched_at': self.dispatched_at.isoformat() if self.dispatched_at else None
+        }
@@ -0,0 +1,37 @@
+from datetime import datetime
+from app import db
+from models.enum_types import PaymentJobStatus
+
+class PaymentJob(db.Model):
+    """
+    A booking payment waiting for, or processed by, the payment workers
+    """
+    __tablename__ = 'payment_jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=PaymentJobStatus.QUEUED)
+    message = db.Column(db.String(255), nullable=True)  # Result of the payment
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    locked_by = db.Column(db.String(100), nullable=True)  # Worker processing the job
+    locked_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    
+    # Workers dequeue by status in ID order; enqueue checks for an open job per booking
+    __table_args__ = (
+        db.Index('ix_payment_jobs_status_id', 'status', 'id'),
+        db.Index('ix_payment_jobs_booking_id', 'booking_id'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'booking_id': self.booking_id,
+            'status': self.status,
+            'message': self.message,
+            'attempts': self.attempts,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
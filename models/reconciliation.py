@@ -0,0 +1,71 @@
+from datetime import datetime
+from app import db
+from models.enum_types import ReconciliationStatus
+
+class ReconciliationRun(db.Model):
+    """
+    One pass comparing wallet balances with the ledger
+    
+    A completed run is the checkpoint for the next incremental run, which
+    only checks wallets updated or posted to since this run started.
+    """
+    __tablename__ = 'reconciliation_runs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    mode = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=ReconciliationStatus.RUNNING)
+    checkpoint_run_id = db.Column(db.Integer, nullable=True)  # Completed run an incremental run continued from
+    high_water_posting_id = db.Column(db.Integer, nullable=False, default=0)  # Latest posting when the run started
+    wallets_checked = db.Column(db.Integer, nullable=False, default=0)
+    drifted_wallets = db.Column(db.Integer, nullable=False, default=0)
+    total_drift = db.Column(db.Numeric(14, 2), nullable=False, default=0)  # Sum of absolute differences
+    error = db.Column(db.String(255), nullable=True)
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    # The latest completed run is the checkpoint
+    __table_args__ = (
+        db.Index('ix_reconciliation_runs_status_id', 'status', 'id'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'mode': self.mode,
+            'status': self.status,
+            'checkpoint_run_id': self.checkpoint_run_id,
+            'high_water_posting_id': self.high_water_posting_id,
+            'wallets_checked': self.wallets_checked,
+            'drifted_wallets': self.drifted_wallets,
+            'total_drift': float(self.total_drift or 0),
+            'error': self.error,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+class WalletDrift(db.Model):
+    """A wallet whose stored balance differed from its ledger balance in a run"""
+    __tablename__ = 'wallet_drifts'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('reconciliation_runs.id'), nullable=False)
+    wallet_id = db.Column(db.Integer, nullable=False)
+    wallet_balance = db.Column(db.Numeric(12, 2), nullable=False)
+    ledger_balance = db.Column(db.Numeric(12, 2), nullable=False)
+    difference = db.Column(db.Numeric(12, 2), nullable=False)  # wallet_balance - ledger_balance
+    detected_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_wallet_drifts_run_wallet', 'run_id', 'wallet_id'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'run_id': self.run_id,
+            'wallet_id': self.wallet_id,
+            'wallet_balance': float(self.wallet_balance),
+            'ledger_balance': float(self.ledger_balance),
+            'difference': float(self.difference),
+            'detected_at': self.detected_at.isoformat() if self.detected_at else None
+        }
@@ -19,6 +19,12 @@ class Service(db.Model):
     location = db.Column(db.String(255), nullable=True)
     availability = db.Column(db.String(255), nullable=True)  # JSON string for complex availability
     
+    # Indexes for catalog filtering and provider service lists
+    __table_args__ = (
+        db.Index('ix_services_status_type', 'status', 'service_type'),
+        db.Index('ix_services_provider_status', 'provider_id', 'status'),
+    )
+    
     # Polymorphic relationship
     __mapper_args__ = {
         'polymorphic_on': service_type,
@@ -13,6 +13,13 @@ class Transaction(db.Model):
     reference_id = db.Column(db.String(50), nullable=True)  # For linking to services or other entities
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Indexes for wallet history, admin lists by type, and reference lookups
+    __table_args__ = (
+        db.Index('ix_transactions_wallet_created', 'wallet_id', 'created_at'),
+        db.Index('ix_transactions_type_created', 'transaction_type', 'created_at'),
+        db.Index('ix_transactions_reference_id', 'reference_id'),
+    )
+    
     def __init__(self, wallet_id, amount, transaction_type, description=None, reference_id=None):
         self.wallet_id = wallet_id
         self.amount = amount
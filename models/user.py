@@ -31,6 +31,11 @@ class User(db.Model):
     service_type = db.Column(db.String(50), nullable=True)  # For service providers
     description = db.Column(db.Text, nullable=True)
     
+    # Index for provider lists and admin dashboard counts
+    __table_args__ = (
+        db.Index('ix_users_role_status', 'role', 'status'),
+    )
+    
     # Relationships
     wallet = db.relationship('Wallet', backref='user', uselist=False, lazy=True)
     feedbacks_given = db.relationship('Feedback', foreign_keys='Feedback.user_id', backref='user', lazy=True)
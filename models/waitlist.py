@@ -0,0 +1,42 @@
+from datetime import datetime
+from app import db
+from models.enum_types import WaitlistStatus
+
+class WaitlistEntry(db.Model):
+    """
+    A user queued for seats on a fully booked ride
+    
+    Entries are promoted in priority order (highest first), and in order
+    of joining within the same priority.
+    """
+    __tablename__ = 'waitlist_entries'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('services.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    seats = db.Column(db.Integer, nullable=False, default=1)
+    priority = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False, default=WaitlistStatus.WAITING)
+    booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    promoted_at = db.Column(db.DateTime, nullable=True)
+    
+    # The queue index: the head of a service's queue is the first entry in this order
+    # (highest priority first, then first come), so promotion reads it without sorting
+    __table_args__ = (
+        db.Index('ix_waitlist_queue_head', 'service_id', 'status', db.text('priority DESC'), 'id'),
+        db.Index('ix_waitlist_user_created', 'user_id', 'created_at'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'service_id': self.service_id,
+            'user_id': self.user_id,
+            'seats': self.seats,
+            'priority': self.priority,
+            'status': self.status,
+            'booking_id': self.booking_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'promoted_at': self.promoted_at.isoformat() if self.promoted_at else None
+        }
@@ -11,6 +11,11 @@ class Wallet(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Incremental reconciliation finds recently changed wallets
+    __table_args__ = (
+        db.Index('ix_wallets_updated_at', 'updated_at'),
+    )
+    
     # Relationships
     transactions = db.relationship('Transaction', backref='wallet', lazy=True)
     
@@ -18,6 +23,11 @@ class Wallet(db.Model):
         self.user_id = user_id
         self.balance = initial_balance
     
+    @property
+    def reported_balance(self):
+        """Balance including commission not yet rolled up (set by WalletService for the admin wallet)"""
+        return self.balance + getattr(self, 'pending_commission', 0)
+    
     def deposit(self, amount):
         """Add money to wallet"""
         if amount <= 0:
@@ -45,7 +55,22 @@ class Wallet(db.Model):
         return {
             'id': self.id,
             'user_id': self.user_id,
-            'balance': float(self.balance),
+            'balance': float(self.reported_balance),
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+class CommissionShard(db.Model):
+    """
+    One of several sub-accounts that platform commission is booked into
+    
+    Spreading commission credits across shards keeps concurrent payments
+    from queueing on the admin wallet row. Shard balances are periodically
+    rolled up into the admin wallet; until then they count towards it.
+    Refunds may take a shard below zero.
+    """
+    __tablename__ = 'commission_shards'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Shard number
+    balance = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
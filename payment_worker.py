@@ -0,0 +1,47 @@
+import socket
+import threading
+from app import app, db
+from services.payment_queue_service import PaymentQueueService
+
+def run_worker(worker_id, stop_event):
+    """Process queued payments until stopped, waiting briefly when the queue is empty"""
+    with app.app_context():
+        while not stop_event.is_set():
+            try:
+                processed = PaymentQueueService.process_batch(worker_id)
+                if not processed:
+                    PaymentQueueService.requeue_stale_jobs()
+                    stop_event.wait(app.config.get('PAYMENT_POLL_INTERVAL', 1.0))
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error(f"Payment worker {worker_id} error: {str(e)}")
+                stop_event.wait(app.config.get('PAYMENT_POLL_INTERVAL', 1.0))
+            finally:
+                db.session.remove()
+
+# Run as a long-lived process next to the web workers
+def payment_worker():
+    worker_count = app.config.get('PAYMENT_WORKERS', 4)
+    print(f"Starting {worker_count} payment workers...")
+    
+    stop_event = threading.Event()
+    threads = [
+        threading.Thread(target=run_worker, args=(f"{socket.gethostname()}-{index}", stop_event), daemon=True)
+        for index in range(worker_count)
+    ]
+    for thread in threads:
+        thread.start()
+    
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1)
+    except KeyboardInterrupt:
+        print("Stopping payment workers...")
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+    print("Payment workers stopped!")
+
+if __name__ == "__main__":
+    payment_worker()
\ No newline at end of file
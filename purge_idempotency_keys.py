@@ -0,0 +1,12 @@
+from app import app
+from repositories.idempotency_repository import IdempotencyRepository
+
+# Run periodically (e.g. from cron) to drop stored responses past their TTL
+def purge_idempotency_keys():
+    with app.app_context():
+        print("Purging expired idempotency keys...")
+        count = IdempotencyRepository().purge_expired()
+        print(f"Deleted {count} expired keys!")
+
+if __name__ == "__main__":
+    purge_idempotency_keys()
\ No newline at end of file
@@ -0,0 +1,11 @@
+from app import app
+from repositories.rating_repository import RatingRepository
+
+def rebuild_ratings():
+    with app.app_context():
+        print("Rebuilding rating aggregates...")
+        count = RatingRepository().rebuild()
+        print(f"Rebuilt {count} rating aggregates!")
+
+if __name__ == "__main__":
+    rebuild_ratings()
\ No newline at end of file
@@ -0,0 +1,23 @@
+import sys
+from app import app
+from models.enum_types import ReconciliationMode
+from services.reconciliation_service import ReconciliationService
+
+# Run nightly with --full (e.g. from cron), and more often without it to check recent changes
+def reconcile_wallets(mode):
+    with app.app_context():
+        print(f"Reconciling wallet balances ({mode.lower()})...")
+        run = ReconciliationService.run(mode)
+        print(f"Checked {run.wallets_checked} wallets, {run.drifted_wallets} drifted by {run.total_drift} in total")
+        
+        cursor = None
+        while run.drifted_wallets:
+            _, drifts = ReconciliationService.get_report(run.id, cursor, 200)
+            for drift in drifts:
+                print(f"  Wallet {drift.wallet_id}: balance {drift.wallet_balance}, ledger {drift.ledger_balance} ({drift.difference:+})")
+            cursor = drifts.next_cursor
+            if not cursor:
+                break
+
+if __name__ == "__main__":
+    reconcile_wallets(ReconciliationMode.FULL if '--full' in sys.argv[1:] else ReconciliationMode.INCREMENTAL)
\ No newline at end of file
@@ -0,0 +1,13 @@
+from app import app
+from repositories.car_pool_repository import CarPoolRepository
+
+# Run frequently (e.g. every minute from cron) to free seats from abandoned checkouts
+# and offer them to the waitlist
+def release_seat_holds():
+    with app.app_context():
+        print("Releasing expired seat holds...")
+        count = CarPoolRepository().release_expired_holds()
+        print(f"Released {count} seats!")
+
+if __name__ == "__main__":
+    release_seat_holds()
\ No newline at end of file
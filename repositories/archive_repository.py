@@ -0,0 +1,123 @@
+from datetime import datetime
+from models.archive import ArchiveCutoff, BookingArchive, TransactionArchive
+from models.booking import Booking
+from models.transaction import Transaction
+from models.enum_types import BookingStatus
+from repositories.statement_repository import month_start, next_month
+from app import db
+from sqlalchemy import delete, exists, func, insert, select, text
+
+# Bookings in these statuses never change again, so they can be archived
+FINISHED_BOOKING_STATUSES = (BookingStatus.COMPLETED, BookingStatus.CANCELLED, BookingStatus.REJECTED)
+
+def months_before(month, count):
+    """Get the first day of the month `count` months before a month start"""
+    index = month.year * 12 + month.month - 1 - count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+class ArchiveRepository:
+    def archived_before(self, table_name):
+        """
+        Get the archive cutoff for a live table
+        
+        Returns:
+            Datetime every archived row was created before, or None if
+            nothing has been archived
+        """
+        cutoff = db.session.get(ArchiveCutoff, table_name)
+        return cutoff.archived_before if cutoff else None
+    
+    def find_cutoffs(self):
+        """Get the archive cutoff of every table that has been archived"""
+        return ArchiveCutoff.query.order_by(ArchiveCutoff.table_name).all()
+    
+    def archive_closed_months(self, keep_months, batch_size=1000, now=None):
+        """
+        Move bookings and transactions from months that closed more than
+        keep_months ago into the archive tables
+        
+        Bookings go first, since a live booking keeps its payment
+        transaction in the live table.
+        
+        Returns:
+            Dictionary of table name to number of rows moved
+        """
+        before = months_before(month_start(now or datetime.utcnow()), keep_months)
+        return {
+            Booking.__tablename__: self._archive(
+                Booking, BookingArchive, before, batch_size,
+                Booking.status.in_(FINISHED_BOOKING_STATUSES)
+            ),
+            Transaction.__tablename__: self._archive(Transaction, TransactionArchive, before, batch_size)
+        }
+    
+    def _archive(self, model, archive_model, before, batch_size, *conditions):
+        """
+        Move rows created before a cutoff into an archive table, committing
+        after each batch
+        
+        Rows that a live row still points at by foreign key stay where they
+        are. Each batch is copied and deleted in one transaction.
+        
+        Returns:
+            Number of rows moved
+        """
+        # Raise the cutoff first, so no reader skips the archive for a row already in it
+        self._raise_cutoff(model.__tablename__, before)
+        db.session.commit()
+        
+        conditions = [model.created_at < before, *conditions, *self._unreferenced(model)]
+        first = db.session.query(func.min(model.created_at)).filter(*conditions).scalar()
+        if first is None:
+            return 0
+        self._create_partitions(archive_model, month_start(first), before)
+        
+        columns = [column.name for column in archive_model.__table__.columns]
+        source = [model.__table__.c[name] for name in columns]
+        moved = 0
+        while True:
+            ids = [row_id for (row_id,) in db.session.query(model.id).filter(
+                *conditions
+            ).order_by(model.id).limit(batch_size).with_for_update().all()]
+            if not ids:
+                break
+            
+            db.session.execute(insert(archive_model).from_select(columns, select(*source).where(model.id.in_(ids))))
+            db.session.execute(delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False))
+            db.session.commit()
+            moved += len(ids)
+        return moved
+    
+    def _unreferenced(self, model):
+        """Conditions excluding rows that a live row points at by foreign key"""
+        conditions = []
+        for table in db.metadata.sorted_tables:
+            for foreign_key in table.foreign_keys:
+                if foreign_key.column.table is model.__table__:
+                    conditions.append(~exists().where(foreign_key.parent == foreign_key.column))
+        return conditions
+    
+    def _raise_cutoff(self, table_name, before):
+        """Record that rows created before a cutoff may be archived (does not commit)"""
+        cutoff = db.session.get(ArchiveCutoff, table_name)
+        if cutoff is None:
+            cutoff = ArchiveCutoff(table_name=table_name, archived_before=before)
+            db.session.add(cutoff)
+        elif before > cutoff.archived_before:
+            cutoff.archived_before = before
+        cutoff.updated_at = datetime.utcnow()
+    
+    def _create_partitions(self, archive_model, first_month, before):
+        """Create the monthly PostgreSQL partitions in [first_month, before) that are missing"""
+        if db.session.get_bind().dialect.name != 'postgresql':
+            return
+        
+        table_name = archive_model.__tablename__
+        month = first_month
+        while month < before:
+            db.session.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {table_name}_{month:%Y_%m} PARTITION OF {table_name} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{next_month(month):%Y-%m-%d}')"
+            ))
+            month = next_month(month)
+        db.session.commit()
@@ -1,6 +1,12 @@
+import heapq
+from models.archive import BookingArchive
 from models.booking import Booking
+from models.service import Service
 from models.enum_types import BookingStatus
+from repositories.archive_repository import ArchiveRepository
+from utils.pagination import paginate_with_archive
 from app import db
+from sqlalchemy.orm import joinedload
 
 class BookingRepository:
     def create(self, booking):
@@ -82,63 +88,143 @@ class BookingRepository:
         """
         return Booking.query.get(booking_id)
     
-    def find_by_user_id(self, user_id, status=None):
+    def find_by_user_id(self, user_id, status=None, cursor=None, limit=None, with_service=False):
         """
-        Find bookings for a user
+        Find bookings for a user, newest first, including archived ones
         
         Args:
             user_id: ID of the user
             status: Filter by booking status (optional)
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
+            with_service: Load each booking's service in the same query
             
         Returns:
-            List of booking objects
+            Page of Booking (or BookingArchive) objects
         """
-        query = Booking.query.filter_by(user_id=user_id)
-        
-        if status:
-            query = query.filter_by(status=status)
+        def build_query(model):
+            query = model.query.filter(model.user_id == user_id)
+            
+            if status:
+                query = query.filter(model.status == status)
+            if with_service:
+                query = query.options(joinedload(model.service))
+            
+            return query
         
-        return query.order_by(Booking.booking_time.desc()).all()
+        return self._paginate(build_query, cursor, limit)
     
-    def find_by_provider_id(self, provider_id, status=None):
+    def find_by_provider_id(self, provider_id, status=None, cursor=None, limit=None, with_service=False):
         """
-        Find bookings for a service provider
+        Find bookings for a service provider, newest first, including archived ones
         
         Args:
             provider_id: ID of the service provider
             status: Filter by booking status (optional)
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
+            with_service: Load each booking's service in the same query
             
         Returns:
-            List of booking objects
+            Page of Booking (or BookingArchive) objects
         """
-        # Join with Service to find bookings for the provider's services
-        query = Booking.query.join(
-            Booking.service
-        ).filter(
-            Booking.service.has(provider_id=provider_id)
-        )
+        def build_query(model):
+            # Join with Service to find bookings for the provider's services
+            query = model.query.join(
+                Service, model.service_id == Service.id
+            ).filter(
+                Service.provider_id == provider_id
+            )
+            
+            if status:
+                query = query.filter(model.status == status)
+            if with_service:
+                query = query.options(joinedload(model.service))
+            
+            return query
         
-        if status:
-            query = query.filter_by(status=status)
+        return self._paginate(build_query, cursor, limit)
+    
+    def find_all(self, status=None, cursor=None, limit=None):
+        """
+        Find all bookings, optionally filtered by status, newest first,
+        including archived ones
+        
+        Args:
+            status: Filter by booking status (optional)
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
+            
+        Returns:
+            Page of Booking (or BookingArchive) objects
+        """
+        def build_query(model):
+            query = model.query
+            
+            if status:
+                query = query.filter(model.status == status)
+            
+            return query
         
-        return query.order_by(Booking.booking_time.desc()).all()
+        return self._paginate(build_query, cursor, limit)
     
-    def find_all(self, status=None):
+    def stream_for_export(self, start, end, status=None, service_type=None, batch_size=1000):
         """
-        Find all bookings, optionally filtered by status
+        Stream bookings created in [start, end), oldest first, including
+        archived ones
+        
+        Selects plain columns rather than Booking objects and fetches them
+        batch_size rows at a time (through a server-side cursor on
+        PostgreSQL), so nothing accumulates in the session while iterating.
+        When the period reaches back before the archive cutoff, the live and
+        archived rows are merged as they are read.
         
         Args:
+            start: Start of the period (datetime, inclusive)
+            end: End of the period (datetime, exclusive)
             status: Filter by booking status (optional)
+            service_type: Filter by the booked service's type (optional)
+            batch_size: Rows fetched from the database at a time
             
         Returns:
-            List of booking objects
+            Tuple (fields, rows) where rows is an iterator of tuples
         """
-        query = Booking.query
+        def build_query(model):
+            query = db.session.query(
+                model.id,
+                model.created_at,
+                model.user_id,
+                model.service_id,
+                Service.service_type,
+                Service.provider_id,
+                model.status,
+                model.amount,
+                model.quantity,
+                model.booking_time,
+                model.start_time,
+                model.end_time,
+                model.transaction_id,
+                model.updated_at
+            ).join(Service, Service.id == model.service_id).filter(
+                model.created_at >= start,
+                model.created_at < end
+            )
+            
+            if status:
+                query = query.filter(model.status == status)
+            if service_type:
+                query = query.filter(Service.service_type == service_type)
+            
+            return query.order_by(model.created_at, model.id).yield_per(batch_size)
         
-        if status:
-            query = query.filter_by(status=status)
+        query = build_query(Booking)
+        fields = [column['name'] for column in query.column_descriptions]
+        archived_before = ArchiveRepository().archived_before(Booking.__tablename__)
+        if archived_before is None or start >= archived_before:
+            return fields, query
         
-        return query.order_by(Booking.booking_time.desc()).all()
+        rows = heapq.merge(query, build_query(BookingArchive), key=lambda row: (row.created_at, row.id))
+        return fields, rows
     
     def find_recent(self, limit=5):
         """
@@ -154,7 +240,7 @@ class BookingRepository:
     
     def count_all(self, status=None):
         """
-        Count all bookings, optionally filtered by status
+        Count all bookings, optionally filtered by status, including archived ones
         
         Args:
             status: Filter by booking status (optional)
@@ -163,8 +249,17 @@ class BookingRepository:
             Number of bookings
         """
         query = Booking.query
+        archived = BookingArchive.query
         
         if status:
             query = query.filter_by(status=status)
+            archived = archived.filter_by(status=status)
         
-        return query.count()
+        if ArchiveRepository().archived_before(Booking.__tablename__) is None:
+            return query.count()
+        return query.count() + archived.count()
+    
+    def _paginate(self, build_query, cursor, limit):
+        """Paginate a booking list across the live and archive tables"""
+        archived_before = ArchiveRepository().archived_before(Booking.__tablename__)
+        return paginate_with_archive(build_query, Booking, BookingArchive, archived_before, cursor, limit)
@@ -1,6 +1,14 @@
-from models.car_pool import CarPoolService
+from collections import defaultdict
+from flask import current_app
+from models.car_pool import CarPoolService, SeatHold
+from models.booking import Booking
+from models.enum_types import BookingStatus, SeatHoldStatus, ServiceStatus
+from repositories.notification_repository import NotificationRepository
+from repositories.waitlist_repository import WaitlistRepository
+from services.booking_state_machine import BookingStateMachine
 from app import db
-from datetime import datetime
+from sqlalchemy import and_, func, update
+from datetime import datetime, timedelta
 
 class CarPoolRepository:
     def create(self, service):
@@ -56,7 +64,304 @@ class CarPoolRepository:
         """
         return CarPoolService.query.get(service_id)
     
-    def find_all(self, vehicle_type=None, source=None, destination=None, date=None):
+    def reserve_seats(self, service_id, num_seats):
+        """
+        Atomically take seats from a ride if enough are available
+        
+        A single conditional UPDATE, so concurrent bookings can never
+        oversell. Runs in the caller's transaction and does not commit.
+        
+        Args:
+            service_id: ID of the car pool service
+            num_seats: Number of seats to reserve
+            
+        Returns:
+            True if the seats were reserved, False if not enough were available
+        """
+        table = CarPoolService.__table__
+        result = db.session.execute(
+            update(table)
+            .where(table.c.id == service_id, table.c.available_seats >= num_seats)
+            .values(available_seats=table.c.available_seats - num_seats)
+        )
+        self._expire_seats(service_id)
+        return result.rowcount == 1
+    
+    def release_seats(self, service_id, num_seats):
+        """
+        Atomically return seats to a ride, never exceeding its total seats
+        
+        Args:
+            service_id: ID of the car pool service
+            num_seats: Number of seats to release
+            
+        Returns:
+            True if the seats were released, False otherwise
+        """
+        table = CarPoolService.__table__
+        result = db.session.execute(
+            update(table)
+            .where(table.c.id == service_id,
+                   table.c.available_seats + num_seats <= table.c.total_seats)
+            .values(available_seats=table.c.available_seats + num_seats)
+        )
+        self._expire_seats(service_id)
+        return result.rowcount == 1
+    
+    def place_hold(self, service_id, user_id, num_seats, booking_id=None):
+        """
+        Hold seats on a ride for a booking awaiting payment
+        
+        The seats are taken with the same conditional UPDATE as
+        reserve_seats. If the ride looks full, its expired holds are
+        released first and the reservation is retried once. Runs in the
+        caller's transaction and does not commit.
+        
+        Args:
+            service_id: ID of the car pool service
+            user_id: ID of the user checking out
+            num_seats: Number of seats to hold
+            booking_id: ID of the pending booking the hold is for (optional)
+            
+        Returns:
+            SeatHold object, or None if not enough seats are available
+        """
+        if not self.reserve_seats(service_id, num_seats):
+            if not self._expire_holds(service_id=service_id):
+                return None
+            if not self.reserve_seats(service_id, num_seats):
+                return None
+        
+        ttl_seconds = current_app.config.get('SEAT_HOLD_TTL', 600)
+        hold = SeatHold(
+            service_id=service_id,
+            user_id=user_id,
+            booking_id=booking_id,
+            seats=num_seats,
+            status=SeatHoldStatus.ACTIVE,
+            expires_at=datetime.utcnow() + timedelta(seconds=ttl_seconds)
+        )
+        db.session.add(hold)
+        return hold
+    
+    def convert_hold(self, booking_id):
+        """
+        Turn a booking's unexpired hold into booked seats (does not commit)
+        
+        Args:
+            booking_id: ID of the booking being paid for
+            
+        Returns:
+            True if the hold was converted, False if it has expired or been
+            released, None if the booking was made without a hold
+        """
+        result = db.session.execute(
+            update(SeatHold).where(
+                SeatHold.booking_id == booking_id,
+                SeatHold.status == SeatHoldStatus.ACTIVE,
+                SeatHold.expires_at > datetime.utcnow()
+            ).values(status=SeatHoldStatus.CONVERTED)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            return True
+        has_hold = db.session.query(SeatHold.id).filter(SeatHold.booking_id == booking_id).first()
+        return False if has_hold else None
+    
+    def convert_holds(self, booking_ids):
+        """
+        Mark the active holds of several bookings as converted (does not commit)
+        
+        Used when bookings are confirmed without going through payment. A
+        PENDING booking's hold cannot have been released by the sweeper,
+        since the sweeper cancels the booking in the same transaction.
+        """
+        if not booking_ids:
+            return
+        db.session.execute(
+            update(SeatHold).where(
+                SeatHold.booking_id.in_(booking_ids),
+                SeatHold.status == SeatHoldStatus.ACTIVE
+            ).values(status=SeatHoldStatus.CONVERTED)
+            .execution_options(synchronize_session=False)
+        )
+    
+    def release_booking_seats(self, service_id, booking_id, num_seats):
+        """
+        Return a cancelled or rejected booking's seats to the ride
+        
+        Seats are released if the booking still holds them: an active hold
+        is marked released, and converted (or hold-less) bookings give
+        back their booked seats. Seats of expired holds were already
+        returned by the sweeper. Does not commit.
+        
+        Args:
+            service_id: ID of the car pool service
+            booking_id: ID of the booking
+            num_seats: Number of seats on the booking
+        """
+        result = db.session.execute(
+            update(SeatHold).where(
+                SeatHold.booking_id == booking_id,
+                SeatHold.status == SeatHoldStatus.ACTIVE
+            ).values(status=SeatHoldStatus.RELEASED)
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            hold_status = db.session.query(SeatHold.status).filter(SeatHold.booking_id == booking_id).scalar()
+            if hold_status not in (None, SeatHoldStatus.CONVERTED):
+                return
+        self.release_seats(service_id, num_seats)
+    
+    def release_expired_holds(self, batch_size=500):
+        """
+        Release every expired hold, committing after each batch
+        
+        Freed seats are offered to each ride's waitlist in the same
+        transaction that releases them.
+        
+        Args:
+            batch_size: Number of holds released per transaction
+            
+        Returns:
+            Number of seats released
+        """
+        count = 0
+        while True:
+            released = self._expire_holds(limit=batch_size)
+            for service_id in sorted(released):
+                self.promote_waitlist(service_id)
+            db.session.commit()
+            if not released:
+                break
+            count += sum(released.values())
+        return count
+    
+    def promote_waitlist(self, service_id, batch_size=50):
+        """
+        Turn waitlist entries into held PENDING bookings while seats last
+        
+        Entries are taken from the head of the queue (highest priority,
+        then first come). Promotion stops at the first entry that does not
+        fit, so a large party is not overtaken by smaller ones behind it.
+        Promoted users are notified in one batch. Runs in the caller's
+        transaction and does not commit.
+        
+        Args:
+            service_id: ID of the car pool service with freed seats
+            batch_size: Number of queue entries read at a time
+            
+        Returns:
+            Number of entries promoted
+        """
+        service = self.find_by_id(service_id)
+        if (not service or service.status != ServiceStatus.AVAILABLE
+                or service.departure_time <= datetime.utcnow()):
+            return 0
+        
+        waitlist_repository = WaitlistRepository()
+        hold_minutes = current_app.config.get('SEAT_HOLD_TTL', 600) // 60
+        notifications = []
+        
+        while service.available_seats > 0:
+            entries = waitlist_repository.find_next(service_id, batch_size)
+            if not entries:
+                break
+            
+            blocked = False
+            for entry in entries:
+                if entry.seats > service.available_seats:
+                    blocked = True
+                    break
+                
+                # Claim the entry first so a concurrent promotion skips it
+                if not waitlist_repository.mark_promoted(entry.id):
+                    continue
+                
+                hold = self.place_hold(service_id, entry.user_id, entry.seats)
+                if not hold:
+                    waitlist_repository.requeue(entry.id)
+                    blocked = True
+                    break
+                
+                booking = Booking(
+                    service_id=service_id,
+                    user_id=entry.user_id,
+                    amount=service.price * entry.seats,
+                    quantity=entry.seats,
+                    booking_time=service.departure_time
+                )
+                db.session.add(booking)
+                db.session.flush()
+                hold.booking_id = booking.id
+                entry.booking_id = booking.id
+                
+                notifications.append((
+                    entry.user_id,
+                    f"A seat opened up on {service.name}. Pay within {hold_minutes} minutes to keep it.",
+                    booking.id
+                ))
+            
+            if blocked or len(entries) < batch_size:
+                break
+        
+        NotificationRepository().add_many(notifications)
+        return len(notifications)
+    
+    def _expire_holds(self, service_id=None, limit=500):
+        """
+        Release one batch of expired holds in the caller's transaction
+        
+        Each hold is claimed with a status-guarded UPDATE so a hold being
+        cancelled concurrently is never released twice. Seats go back to
+        each ride in one UPDATE, and the abandoned PENDING bookings are
+        cancelled together through the booking state machine.
+        
+        Returns:
+            Dictionary of service ID to number of seats released
+        """
+        query = db.session.query(
+            SeatHold.id, SeatHold.service_id, SeatHold.booking_id, SeatHold.seats
+        ).filter(
+            SeatHold.status == SeatHoldStatus.ACTIVE,
+            SeatHold.expires_at <= datetime.utcnow()
+        )
+        if service_id:
+            query = query.filter(SeatHold.service_id == service_id)
+        holds = query.order_by(SeatHold.expires_at).limit(limit).all()
+        
+        seats_by_service = defaultdict(int)
+        booking_ids = []
+        for hold in holds:
+            result = db.session.execute(
+                update(SeatHold).where(SeatHold.id == hold.id, SeatHold.status == SeatHoldStatus.ACTIVE)
+                .values(status=SeatHoldStatus.EXPIRED)
+                .execution_options(synchronize_session=False)
+            )
+            if not result.rowcount:
+                continue
+            seats_by_service[hold.service_id] += hold.seats
+            if hold.booking_id:
+                booking_ids.append(hold.booking_id)
+        
+        for ride_id, seats in sorted(seats_by_service.items()):
+            self.release_seats(ride_id, seats)
+        
+        if booking_ids:
+            # Through the state machine, so the hooks record the cancellations in the outbox
+            BookingStateMachine.transition_many(
+                [Booking.id.in_(booking_ids)], 'cancel', from_status=BookingStatus.PENDING,
+                reason="Seat hold expired"
+            )
+        return dict(seats_by_service)
+    
+    def _expire_seats(self, service_id):
+        """Make a loaded ride re-read its seat count after an in-database update"""
+        service = db.session.identity_map.get(db.session.identity_key(CarPoolService, service_id))
+        if service is not None:
+            db.session.expire(service, ['available_seats'])
+    
+    def find_all(self, vehicle_type=None, source=None, destination=None, date=None, include_full=False):
         """
         Find all car pool services, optionally filtered
         
@@ -65,6 +370,7 @@ class CarPoolRepository:
             source: Filter by source location (optional)
             destination: Filter by destination (optional)
             date: Filter by departure date (optional)
+            include_full: Also return fully booked rides, e.g. to join their waitlist
             
         Returns:
             List of car pool service objects
@@ -75,31 +381,82 @@ class CarPoolRepository:
             query = query.filter_by(vehicle_type=vehicle_type)
         
         if source:
-            query = query.filter(CarPoolService.source.ilike(f"%{source}%"))
+            query = query.filter(self._place_prefix(CarPoolService.source_key, source))
         
         if destination:
-            query = query.filter(CarPoolService.destination.ilike(f"%{destination}%"))
+            query = query.filter(self._place_prefix(CarPoolService.destination_key, destination))
+        
+        # Filter out services with departure time in the past
+        departure_from = datetime.utcnow()
+        departure_to = None
         
         if date:
-            # Convert date string to datetime
+            # Convert date string to a half-open [day, next day) range
             if isinstance(date, str):
                 try:
-                    date_obj = datetime.strptime(date, "%Y-%m-%d")
-                    # Filter for services on this date
-                    query = query.filter(
-                        db.func.date(CarPoolService.departure_time) == date_obj.date()
-                    )
+                    day_start = datetime.strptime(date, "%Y-%m-%d")
+                    departure_from = max(departure_from, day_start)
+                    departure_to = day_start + timedelta(days=1)
                 except ValueError:
                     # Invalid date format, ignore this filter
                     pass
         
-        # Only show services with available seats
-        query = query.filter(CarPoolService.available_seats > 0)
+        query = query.filter(CarPoolService.departure_time > departure_from)
+        if departure_to:
+            query = query.filter(CarPoolService.departure_time < departure_to)
         
-        # Filter out services with departure time in the past
-        query = query.filter(CarPoolService.departure_time > datetime.utcnow())
+        # Only show services with available seats; seats in expired holds
+        # count as available even before the sweeper has released them
+        if not include_full:
+            query = self._filter_available(query)
         
         # Order by departure time
         query = query.order_by(CarPoolService.departure_time)
         
         return query.all()
+    
+    def _filter_available(self, query):
+        """Restrict a ride query to rides with free seats"""
+        expired_holds = db.session.query(
+            SeatHold.service_id, func.sum(SeatHold.seats).label('seats')
+        ).filter(
+            SeatHold.status == SeatHoldStatus.ACTIVE,
+            SeatHold.expires_at <= datetime.utcnow()
+        ).group_by(SeatHold.service_id).subquery('expired_holds')
+        return query.outerjoin(expired_holds, expired_holds.c.service_id == CarPoolService.id).filter(
+            CarPoolService.available_seats + func.coalesce(expired_holds.c.seats, 0) > 0
+        )
+    
+    def _place_prefix(self, column, place):
+        """
+        Match normalized place names starting with the given place
+        
+        Written as a range rather than LIKE so any B-tree index on the
+        column can serve it, whatever the collation.
+        """
+        key = CarPoolService.normalize_place(place)
+        return and_(column >= key, column < key + '\uffff')
+    
+    def rebuild_place_keys(self, batch_size=500):
+        """
+        Fill in normalized place names for rides created before they existed
+        
+        Args:
+            batch_size: Number of rides loaded per batch
+            
+        Returns:
+            Number of rides updated
+        """
+        count = 0
+        while True:
+            services = CarPoolService.query.filter(
+                (CarPoolService.source_key == None) | (CarPoolService.destination_key == None)
+            ).order_by(CarPoolService.id).limit(batch_size).all()
+            if not services:
+                break
+            for service in services:
+                service.source_key = CarPoolService.normalize_place(service.source)
+                service.destination_key = CarPoolService.normalize_place(service.destination)
+                count += 1
+            db.session.commit()
+        return count
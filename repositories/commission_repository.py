@@ -0,0 +1,96 @@
+from flask import current_app
+from models.wallet import CommissionShard
+from models.enum_types import LedgerAccountType, JournalEntryType
+from repositories.ledger_repository import LedgerRepository
+from repositories.wallet_repository import WalletRepository
+from app import db
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+
+class CommissionRepository:
+    def __init__(self):
+        self.wallet_repository = WalletRepository()
+    
+    def shard_for(self, booking_id):
+        """
+        Choose the commission shard for a booking
+        
+        Args:
+            booking_id: ID of the booking
+            
+        Returns:
+            Shard number
+        """
+        return booking_id % current_app.config.get('COMMISSION_SHARDS', 16)
+    
+    def book(self, booking_id, amount):
+        """
+        Add commission for a booking to its shard (does not commit)
+        
+        Args:
+            booking_id: ID of the booking
+            amount: Commission amount, negative for refunds
+            
+        Returns:
+            Shard number the commission was booked into
+        """
+        shard_id = self.shard_for(booking_id)
+        statement = update(CommissionShard).where(CommissionShard.id == shard_id).values(
+            balance=CommissionShard.balance + amount
+        ).execution_options(synchronize_session=False)
+        
+        if db.session.execute(statement).rowcount:
+            return shard_id
+        
+        # First commission for this shard; a concurrent writer may create it first
+        try:
+            with db.session.begin_nested():
+                db.session.add(CommissionShard(id=shard_id, balance=amount))
+        except IntegrityError:
+            db.session.execute(statement)
+        return shard_id
+    
+    def pending_total(self):
+        """
+        Get commission booked into shards but not yet rolled up
+        
+        Returns:
+            Sum of all shard balances
+        """
+        return db.session.query(func.coalesce(func.sum(CommissionShard.balance), 0)).scalar()
+    
+    def roll_up(self):
+        """
+        Move all shard balances into the admin wallet in one transaction
+        
+        Returns:
+            Amount moved into the admin wallet
+        """
+        admin_wallet = self.wallet_repository.find_admin_wallet()
+        if not admin_wallet:
+            raise ValueError("Admin wallet not found")
+        
+        shards = CommissionShard.query.filter(CommissionShard.balance != 0).order_by(
+            CommissionShard.id
+        ).with_for_update().all()
+        
+        total = 0
+        postings = []
+        for shard in shards:
+            total += shard.balance
+            postings.append((LedgerAccountType.COMMISSION, shard.id, -shard.balance))
+            db.session.execute(
+                update(CommissionShard).where(CommissionShard.id == shard.id)
+                .values(balance=CommissionShard.balance - shard.balance)
+                .execution_options(synchronize_session=False)
+            )
+        
+        if total:
+            self.wallet_repository.credit(admin_wallet.id, total)
+            postings.append((LedgerAccountType.WALLET, admin_wallet.id, total))
+            LedgerRepository().post(
+                JournalEntryType.COMMISSION_ROLLUP, postings, description="Commission roll-up"
+            )
+        
+        db.session.commit()
+        return total
@@ -1,4 +1,6 @@
 from models.feedback import Feedback
+from utils.pagination import paginate
+from sqlalchemy.orm import joinedload
 from app import db
 
 class FeedbackRepository:
@@ -55,41 +57,53 @@ class FeedbackRepository:
         """
         return Feedback.query.get(feedback_id)
     
-    def find_by_user_id(self, user_id):
+    def find_by_user_id(self, user_id, cursor=None, limit=None):
         """
-        Find feedback given by a user
+        Find feedback given by a user, newest first
         
         Args:
             user_id: ID of the user
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of feedback objects
+            Page of feedback objects
         """
-        return Feedback.query.filter_by(user_id=user_id).all()
+        query = Feedback.query.filter_by(user_id=user_id)
+        
+        return paginate(query, Feedback.created_at, Feedback.id, cursor, limit)
     
-    def find_by_provider_id(self, provider_id):
+    def find_by_provider_id(self, provider_id, cursor=None, limit=None):
         """
-        Find feedback for a provider
+        Find feedback for a provider, newest first
         
         Args:
             provider_id: ID of the provider
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of feedback objects
+            Page of feedback objects
         """
-        return Feedback.query.filter_by(provider_id=provider_id).all()
+        query = Feedback.query.filter_by(provider_id=provider_id)
+        
+        return paginate(query, Feedback.created_at, Feedback.id, cursor, limit)
     
-    def find_by_service_id(self, service_id):
+    def find_by_service_id(self, service_id, cursor=None, limit=None):
         """
-        Find feedback for a service
+        Find feedback for a service, newest first
         
         Args:
             service_id: ID of the service
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of feedback objects
+            Page of feedback objects, with the reviewing user loaded
         """
-        return Feedback.query.filter_by(service_id=service_id).all()
+        query = Feedback.query.filter_by(service_id=service_id).options(joinedload(Feedback.user))
+        
+        return paginate(query, Feedback.created_at, Feedback.id, cursor, limit)
     
     def find_by_user_service(self, user_id, service_id):
         """
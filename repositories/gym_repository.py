@@ -1,7 +1,7 @@
-from models.gym import GymService, GymSubscription
+from models.gym import GymService, GymFacility, GymSubscription
+from utils.pagination import paginate
 from app import db
 from datetime import datetime
-import json
 
 class GymRepository:
     def create(self, service):
@@ -57,7 +57,7 @@ class GymRepository:
         """
         return GymService.query.get(service_id)
     
-    def find_all(self, facility_type=None, trainers_available=None, dietician_available=None):
+    def find_all(self, facility_type=None, trainers_available=None, dietician_available=None, cursor=None, limit=None):
         """
         Find all gym services, optionally filtered
         
@@ -65,9 +65,11 @@ class GymRepository:
             facility_type: Filter by facility type (optional)
             trainers_available: Filter by trainer availability (optional)
             dietician_available: Filter by dietician availability (optional)
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of gym service objects
+            Page of gym service objects, newest first
         """
         query = GymService.query
         
@@ -78,23 +80,40 @@ class GymRepository:
         if dietician_available is not None:
             query = query.filter_by(dietician_available=dietician_available)
         
-        # Get all services matching the filters
-        services = query.all()
-        
-        # If facility type filter is specified, filter the results
+        # Facility type lookup goes through the gym_facilities primary key
         if facility_type:
-            filtered_services = []
+            query = query.join(GymFacility, GymFacility.gym_service_id == GymService.id).filter(
+                GymFacility.facility_type == GymFacility.normalize(facility_type)
+            )
+        
+        return paginate(query, GymService.created_at, GymService.id, cursor, limit)
+    
+    def rebuild_facility_index(self, batch_size=500):
+        """
+        Repopulate gym_facilities from the facility_types JSON of every gym
+        
+        Args:
+            batch_size: Number of gyms loaded per batch
+            
+        Returns:
+            Number of gyms indexed
+        """
+        count = 0
+        last_id = 0
+        while True:
+            services = GymService.query.filter(GymService.id > last_id).order_by(GymService.id).limit(batch_size).all()
+            if not services:
+                break
             for service in services:
                 try:
-                    facility_types = json.loads(service.facility_types)
-                    if isinstance(facility_types, list) and facility_type.lower() in [ft.lower() for ft in facility_types]:
-                        filtered_services.append(service)
-                except:
-                    # Skip services with invalid facility types
+                    service.set_facility_types(service.facility_types)
+                    count += 1
+                except (ValueError, TypeError):
+                    # Leave gyms with invalid facility types unindexed
                     pass
-            return filtered_services
-        
-        return services
+            last_id = services[-1].id
+            db.session.commit()
+        return count
     
     def create_subscription(self, subscription):
         """
@@ -0,0 +1,94 @@
+import json
+from datetime import datetime, timedelta
+from models.idempotency import IdempotencyRecord
+from app import db
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+
+class IdempotencyRepository:
+    def find(self, scope, key):
+        """
+        Find the record for an idempotency key
+        
+        Args:
+            scope: Caller, method and path the key belongs to
+            key: Client-supplied idempotency key
+            
+        Returns:
+            IdempotencyRecord object if found, None otherwise
+        """
+        return IdempotencyRecord.query.filter_by(scope=scope, key=key).first()
+    
+    def claim(self, scope, key, request_hash, ttl_seconds):
+        """
+        Reserve a key for a request that is about to run
+        
+        The claim is committed straight away so that a concurrent retry
+        with the same key sees it. An expired record for the key is
+        replaced.
+        
+        Args:
+            scope: Caller, method and path the key belongs to
+            key: Client-supplied idempotency key
+            request_hash: Hash of the request body
+            ttl_seconds: How long the stored response is kept
+            
+        Returns:
+            Tuple (claimed, existing record or None)
+        """
+        now = datetime.utcnow()
+        db.session.execute(
+            delete(IdempotencyRecord).where(
+                IdempotencyRecord.scope == scope,
+                IdempotencyRecord.key == key,
+                IdempotencyRecord.expires_at <= now
+            ).execution_options(synchronize_session=False)
+        )
+        
+        try:
+            db.session.add(IdempotencyRecord(
+                scope=scope, key=key, request_hash=request_hash,
+                expires_at=now + timedelta(seconds=ttl_seconds)
+            ))
+            db.session.commit()
+            return True, None
+        except IntegrityError:
+            db.session.rollback()
+            return False, self.find(scope, key)
+    
+    def complete(self, scope, key, status_code, response_body, mimetype, headers=None):
+        """Save the response, and any headers to replay with it, for a claimed key and commit"""
+        db.session.execute(
+            update(IdempotencyRecord).where(
+                IdempotencyRecord.scope == scope,
+                IdempotencyRecord.key == key
+            ).values(status_code=status_code, response_body=response_body, mimetype=mimetype,
+                     response_headers=json.dumps(headers) if headers else None)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    
+    def release(self, scope, key):
+        """Drop an unfinished claim so the request can be retried, and commit"""
+        db.session.execute(
+            delete(IdempotencyRecord).where(
+                IdempotencyRecord.scope == scope,
+                IdempotencyRecord.key == key,
+                IdempotencyRecord.status_code.is_(None)
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    
+    def purge_expired(self):
+        """
+        Delete records whose TTL has passed
+        
+        Returns:
+            Number of records deleted
+        """
+        result = db.session.execute(
+            delete(IdempotencyRecord).where(IdempotencyRecord.expires_at <= datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
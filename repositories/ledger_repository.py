@@ -0,0 +1,204 @@
+from decimal import Decimal
+from models.ledger import JournalEntry, LedgerPosting, BalanceSnapshot
+from models.wallet import Wallet, CommissionShard
+from models.enum_types import LedgerAccountType, JournalEntryType
+from app import db
+from sqlalchemy import func, and_
+
+# Account ID used for the single EXTERNAL account
+EXTERNAL_ACCOUNT_ID = 0
+
+class LedgerRepository:
+    def post(self, entry_type, postings, reference_id=None, description=None):
+        """
+        Append a balanced journal entry (does not commit)
+        
+        Wallet postings record the wallet's running balance, continuing from
+        its previous posting. Call this after the wallet balances have been
+        updated: the balance UPDATE holds each wallet's row lock until
+        commit, so running balances are written in the same order as the
+        changes they describe.
+        
+        Args:
+            entry_type: JournalEntryType of the entry
+            postings: List of (account_type, account_id, amount) tuples;
+                positive amounts credit an account, negative amounts debit it
+            reference_id: ID of the related booking or other entity (optional)
+            description: Description of the entry (optional)
+            
+        Returns:
+            Created JournalEntry object, or None if every amount is zero
+            (nothing moved, e.g. a free booking)
+            
+        Raises:
+            ValueError: If the postings do not sum to zero
+        """
+        postings = [
+            (account_type, account_id, Decimal(str(amount)))
+            for account_type, account_id, amount in postings if amount
+        ]
+        if not postings:
+            return None
+        if sum(amount for _, _, amount in postings) != 0:
+            raise ValueError("Journal entry postings must sum to zero")
+        
+        wallet_ids = {
+            account_id for account_type, account_id, _ in postings if account_type == LedgerAccountType.WALLET
+        }
+        balances = self._latest_wallet_balances(wallet_ids)
+        
+        entry = JournalEntry(
+            entry_type=entry_type,
+            reference_id=str(reference_id) if reference_id is not None else None,
+            description=description
+        )
+        db.session.add(entry)
+        for account_type, account_id, amount in postings:
+            balance_after = None
+            if account_type == LedgerAccountType.WALLET:
+                previous = balances.get(account_id, Decimal('0'))
+                # History not backfilled yet (see StatementRepository.backfill_running_balances)
+                if previous is not None:
+                    balance_after = balances[account_id] = Decimal(previous) + amount
+            entry.postings.append(LedgerPosting(
+                account_type=account_type, account_id=account_id, amount=amount, balance_after=balance_after
+            ))
+        return entry
+    
+    def _latest_wallet_balances(self, wallet_ids):
+        """
+        Get the running balance of each wallet's latest posting in one query
+        
+        Returns:
+            Dictionary of wallet ID to balance (None if not backfilled yet);
+            wallets without postings are missing
+        """
+        if not wallet_ids:
+            return {}
+        latest = db.session.query(func.max(LedgerPosting.id)).filter(
+            LedgerPosting.account_type == LedgerAccountType.WALLET,
+            LedgerPosting.account_id.in_(wallet_ids)
+        ).group_by(LedgerPosting.account_id)
+        rows = db.session.query(LedgerPosting.account_id, LedgerPosting.balance_after).filter(
+            LedgerPosting.id.in_(latest)
+        ).all()
+        return {account_id: balance_after for account_id, balance_after in rows}
+    
+    def get_balance(self, account_type, account_id):
+        """
+        Get an account's balance from its latest snapshot and later postings
+        
+        Args:
+            account_type: LedgerAccountType of the account
+            account_id: ID of the account
+            
+        Returns:
+            Account balance as a Decimal
+        """
+        snapshot = BalanceSnapshot.query.filter_by(
+            account_type=account_type, account_id=account_id
+        ).order_by(BalanceSnapshot.last_posting_id.desc()).first()
+        
+        balance = Decimal(snapshot.balance) if snapshot else Decimal('0')
+        last_posting_id = snapshot.last_posting_id if snapshot else 0
+        
+        delta = db.session.query(func.coalesce(func.sum(LedgerPosting.amount), 0)).filter(
+            LedgerPosting.account_type == account_type,
+            LedgerPosting.account_id == account_id,
+            LedgerPosting.id > last_posting_id
+        ).scalar()
+        return balance + Decimal(delta)
+    
+    def find_postings(self, account_type, account_id, limit=50):
+        """
+        Get an account's most recent postings, newest first
+        
+        Returns:
+            List of LedgerPosting objects
+        """
+        return LedgerPosting.query.filter_by(
+            account_type=account_type, account_id=account_id
+        ).order_by(LedgerPosting.id.desc()).limit(limit).all()
+    
+    def take_snapshots(self):
+        """
+        Snapshot every account that has postings since its last snapshot
+        
+        Each new snapshot is the previous one plus the sum of the postings
+        after it, so the work is proportional to the new postings rather
+        than the full history. Commits the snapshots.
+        
+        Returns:
+            Number of snapshots written
+        """
+        # Postings inserted while this runs are picked up next time
+        high_water_mark = db.session.query(func.max(LedgerPosting.id)).scalar()
+        if not high_water_mark:
+            return 0
+        
+        latest = db.session.query(
+            BalanceSnapshot.account_type,
+            BalanceSnapshot.account_id,
+            func.max(BalanceSnapshot.last_posting_id).label('last_posting_id')
+        ).group_by(BalanceSnapshot.account_type, BalanceSnapshot.account_id).subquery('latest')
+        
+        previous = db.session.query(BalanceSnapshot).join(latest, and_(
+            BalanceSnapshot.account_type == latest.c.account_type,
+            BalanceSnapshot.account_id == latest.c.account_id,
+            BalanceSnapshot.last_posting_id == latest.c.last_posting_id
+        )).all()
+        previous = {(snapshot.account_type, snapshot.account_id): snapshot for snapshot in previous}
+        
+        deltas = db.session.query(
+            LedgerPosting.account_type,
+            LedgerPosting.account_id,
+            func.sum(LedgerPosting.amount),
+            func.max(LedgerPosting.id)
+        ).outerjoin(latest, and_(
+            LedgerPosting.account_type == latest.c.account_type,
+            LedgerPosting.account_id == latest.c.account_id
+        )).filter(
+            LedgerPosting.id > func.coalesce(latest.c.last_posting_id, 0),
+            LedgerPosting.id <= high_water_mark
+        ).group_by(LedgerPosting.account_type, LedgerPosting.account_id).all()
+        
+        for account_type, account_id, delta, last_posting_id in deltas:
+            snapshot = previous.get((account_type, account_id))
+            balance = Decimal(snapshot.balance) if snapshot else Decimal('0')
+            db.session.add(BalanceSnapshot(
+                account_type=account_type,
+                account_id=account_id,
+                balance=balance + Decimal(delta),
+                last_posting_id=last_posting_id
+            ))
+        
+        db.session.commit()
+        return len(deltas)
+    
+    def open_missing_balances(self):
+        """
+        Post opening balances for accounts that are not in the ledger yet
+        
+        Used once for wallets and commission shards that held money before
+        the ledger existed. Commits the entries.
+        
+        Returns:
+            Number of accounts opened
+        """
+        opened = 0
+        for account_type, model in ((LedgerAccountType.WALLET, Wallet),
+                                    (LedgerAccountType.COMMISSION, CommissionShard)):
+            posted = db.session.query(LedgerPosting.account_id).filter(
+                LedgerPosting.account_type == account_type
+            ).distinct()
+            accounts = model.query.filter(~model.id.in_(posted), model.balance != 0).all()
+            
+            for account in accounts:
+                self.post(JournalEntryType.OPENING_BALANCE, [
+                    (LedgerAccountType.EXTERNAL, EXTERNAL_ACCOUNT_ID, -account.balance),
+                    (account_type, account.id, account.balance)
+                ], description="Opening balance")
+            opened += len(accounts)
+        
+        db.session.commit()
+        return opened
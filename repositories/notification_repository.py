@@ -0,0 +1,56 @@
+from datetime import datetime
+from models.notification import Notification
+from utils.pagination import paginate
+from app import db
+from sqlalchemy import insert, update
+
+class NotificationRepository:
+    def add_many(self, notifications):
+        """
+        Queue notifications for several users in one INSERT (does not commit)
+        
+        Args:
+            notifications: List of (user_id, message, reference_id) tuples
+        """
+        if not notifications:
+            return
+        now = datetime.utcnow()
+        db.session.execute(insert(Notification), [
+            {
+                'user_id': user_id,
+                'message': message,
+                'reference_id': str(reference_id) if reference_id is not None else None,
+                'created_at': now
+            }
+            for user_id, message, reference_id in notifications
+        ])
+    
+    def find_by_user_id(self, user_id, cursor=None, limit=None):
+        """
+        Find a user's notifications
+        
+        Args:
+            user_id: ID of the user
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
+            
+        Returns:
+            Page of notification objects, newest first
+        """
+        query = Notification.query.filter_by(user_id=user_id)
+        return paginate(query, Notification.created_at, Notification.id, cursor, limit)
+    
+    def mark_all_read(self, user_id):
+        """
+        Mark all of a user's unread notifications as read
+        
+        Returns:
+            Number of notifications updated
+        """
+        result = db.session.execute(
+            update(Notification).where(Notification.user_id == user_id, Notification.read_at.is_(None))
+            .values(read_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
@@ -0,0 +1,112 @@
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+from models.outbox import OutboxEvent
+from models.enum_types import OutboxStatus
+from app import db
+from sqlalchemy import delete, insert, update
+
+def _json_default(value):
+    """Serialize the non-JSON values found in event payloads"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__} in an event payload")
+
+class OutboxRepository:
+    def add(self, aggregate_type, aggregate_id, event_type, payload):
+        """
+        Record an event in the current transaction (does not commit)
+        
+        Args:
+            aggregate_type: Kind of entity that changed ('booking' or 'wallet')
+            aggregate_id: ID of the entity that changed
+            event_type: OutboxEventType value
+            payload: Dictionary describing the change
+        """
+        self.add_many([(aggregate_type, aggregate_id, event_type, payload)])
+    
+    def add_many(self, events):
+        """
+        Record several events in one INSERT (does not commit)
+        
+        Args:
+            events: List of (aggregate_type, aggregate_id, event_type, payload) tuples
+        """
+        if not events:
+            return
+        now = datetime.utcnow()
+        db.session.execute(insert(OutboxEvent), [
+            {
+                'aggregate_type': aggregate_type,
+                'aggregate_id': aggregate_id,
+                'event_type': event_type,
+                'payload': json.dumps(payload, default=_json_default),
+                'status': OutboxStatus.PENDING,
+                'attempts': 0,
+                'created_at': now
+            }
+            for aggregate_type, aggregate_id, event_type, payload in events
+        ])
+    
+    def find_pending(self, batch_size):
+        """
+        Find the oldest undelivered events, locking them where the database
+        supports it so a second dispatcher waits instead of reordering them
+        
+        Returns:
+            List of OutboxEvent objects in ID order
+        """
+        return OutboxEvent.query.filter(
+            OutboxEvent.status == OutboxStatus.PENDING
+        ).order_by(OutboxEvent.id).limit(batch_size).with_for_update().all()
+    
+    def mark_dispatched(self, event_ids):
+        """Mark delivered events in one UPDATE (does not commit)"""
+        if not event_ids:
+            return
+        db.session.execute(
+            update(OutboxEvent).where(OutboxEvent.id.in_(event_ids)).values(
+                status=OutboxStatus.DISPATCHED,
+                attempts=OutboxEvent.attempts + 1,
+                last_error=None,
+                dispatched_at=datetime.utcnow()
+            ).execution_options(synchronize_session=False)
+        )
+    
+    def record_failure(self, event, error, max_attempts):
+        """
+        Record a failed delivery (does not commit)
+        
+        The event stays pending to be retried until it has failed
+        max_attempts times.
+        
+        Returns:
+            True if the event was given up on
+        """
+        given_up = event.attempts + 1 >= max_attempts
+        db.session.execute(
+            update(OutboxEvent).where(OutboxEvent.id == event.id).values(
+                status=OutboxStatus.FAILED if given_up else OutboxStatus.PENDING,
+                attempts=OutboxEvent.attempts + 1,
+                last_error=str(error)[:255]
+            ).execution_options(synchronize_session=False)
+        )
+        return given_up
+    
+    def purge_dispatched(self, older_than_seconds):
+        """
+        Delete delivered events older than the retention period
+        
+        Returns:
+            Number of events deleted
+        """
+        result = db.session.execute(
+            delete(OutboxEvent).where(
+                OutboxEvent.status == OutboxStatus.DISPATCHED,
+                OutboxEvent.dispatched_at < datetime.utcnow() - timedelta(seconds=older_than_seconds)
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
@@ -0,0 +1,119 @@
+import uuid
+from datetime import datetime, timedelta
+from models.payment_job import PaymentJob
+from models.enum_types import PaymentJobStatus
+from app import db
+from sqlalchemy import update
+
+class PaymentJobRepository:
+    def create(self, job):
+        """
+        Create a new payment job
+        
+        Args:
+            job: PaymentJob object to create
+            
+        Returns:
+            Created payment job object
+        """
+        db.session.add(job)
+        db.session.commit()
+        return job
+    
+    def find_by_id(self, job_id):
+        """
+        Find a payment job by ID
+        
+        Returns:
+            PaymentJob object if found, None otherwise
+        """
+        return PaymentJob.query.get(job_id)
+    
+    def find_open_for_booking(self, booking_id):
+        """
+        Find a queued or running payment job for a booking
+        
+        Returns:
+            PaymentJob object if one exists, None otherwise
+        """
+        return PaymentJob.query.filter(
+            PaymentJob.booking_id == booking_id,
+            PaymentJob.status.in_([PaymentJobStatus.QUEUED, PaymentJobStatus.PROCESSING])
+        ).first()
+    
+    def claim_batch(self, worker_id, batch_size):
+        """
+        Take the oldest queued jobs for a worker and commit the claim
+        
+        Candidates are read in ID order (skipping rows other workers have
+        locked, where the database supports it) and claimed with one
+        status-guarded UPDATE, so a job is only ever claimed once.
+        
+        Args:
+            worker_id: Name of the claiming worker
+            batch_size: Maximum number of jobs to claim
+            
+        Returns:
+            List of claimed PaymentJob objects, oldest first
+        """
+        candidates = db.session.query(PaymentJob.id).filter(
+            PaymentJob.status == PaymentJobStatus.QUEUED
+        ).order_by(PaymentJob.id).limit(batch_size).with_for_update(skip_locked=True).all()
+        job_ids = [job_id for (job_id,) in candidates]
+        if not job_ids:
+            db.session.rollback()
+            return []
+        
+        # Tag the claim uniquely so this worker can tell its rows apart
+        claim = f"{worker_id}:{uuid.uuid4().hex[:12]}"
+        db.session.execute(
+            update(PaymentJob).where(
+                PaymentJob.id.in_(job_ids),
+                PaymentJob.status == PaymentJobStatus.QUEUED
+            ).values(
+                status=PaymentJobStatus.PROCESSING,
+                locked_by=claim,
+                locked_at=datetime.utcnow(),
+                attempts=PaymentJob.attempts + 1
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        
+        # Another worker may have claimed some candidates between the read and the update
+        return PaymentJob.query.filter(
+            PaymentJob.id.in_(job_ids),
+            PaymentJob.status == PaymentJobStatus.PROCESSING,
+            PaymentJob.locked_by == claim
+        ).order_by(PaymentJob.id).all()
+    
+    def finish(self, job, succeeded, message):
+        """Record the outcome of a claimed job and commit"""
+        db.session.execute(
+            update(PaymentJob).where(
+                PaymentJob.id == job.id,
+                PaymentJob.status == PaymentJobStatus.PROCESSING,
+                PaymentJob.locked_by == job.locked_by
+            ).values(
+                status=PaymentJobStatus.SUCCEEDED if succeeded else PaymentJobStatus.FAILED,
+                message=message[:255] if message else None,
+                completed_at=datetime.utcnow()
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    
+    def requeue_stale(self, timeout_seconds):
+        """
+        Put jobs back in the queue whose worker stopped before finishing them
+        
+        Returns:
+            Number of jobs requeued
+        """
+        result = db.session.execute(
+            update(PaymentJob).where(
+                PaymentJob.status == PaymentJobStatus.PROCESSING,
+                PaymentJob.locked_at < datetime.utcnow() - timedelta(seconds=timeout_seconds)
+            ).values(status=PaymentJobStatus.QUEUED, locked_by=None, locked_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
@@ -0,0 +1,114 @@
+from models.feedback import Feedback, RatingAggregate
+from models.enum_types import RatingSubject
+from app import db
+from sqlalchemy import case, func, literal, update
+from sqlalchemy.exc import IntegrityError
+
+class RatingRepository:
+    def find(self, subject_type, subject_id):
+        """
+        Find the rating aggregate for a service or provider
+        
+        Args:
+            subject_type: RatingSubject.SERVICE or RatingSubject.PROVIDER
+            subject_id: ID of the service or provider
+            
+        Returns:
+            RatingAggregate object if the subject has been rated, None otherwise
+        """
+        return RatingAggregate.query.filter_by(subject_type=subject_type, subject_id=subject_id).first()
+    
+    def find_many(self, subject_type, subject_ids):
+        """
+        Find rating aggregates for several services or providers in one query
+        
+        Returns:
+            Dictionary of subject ID to RatingAggregate object
+        """
+        if not subject_ids:
+            return {}
+        aggregates = RatingAggregate.query.filter(
+            RatingAggregate.subject_type == subject_type,
+            RatingAggregate.subject_id.in_(set(subject_ids))
+        ).all()
+        return {aggregate.subject_id: aggregate for aggregate in aggregates}
+    
+    def apply(self, service_id, provider_id, added=None, removed=None):
+        """
+        Adjust the service and provider aggregates for a rating change
+        
+        Runs in-database increments in the caller's transaction, so the
+        aggregates commit or roll back together with the feedback row.
+        
+        Args:
+            service_id: ID of the rated service
+            provider_id: ID of the rated provider
+            added: Rating being added (optional)
+            removed: Rating being removed (optional)
+        """
+        deltas = {'rating_count': 0, 'rating_sum': 0}
+        # The stars_N column names are built from the ratings, so they must be ints
+        if added is not None:
+            added = int(added)
+            deltas['rating_count'] += 1
+            deltas['rating_sum'] += added
+            deltas[f'stars_{added}'] = deltas.get(f'stars_{added}', 0) + 1
+        if removed is not None:
+            removed = int(removed)
+            deltas['rating_count'] -= 1
+            deltas['rating_sum'] -= removed
+            deltas[f'stars_{removed}'] = deltas.get(f'stars_{removed}', 0) - 1
+        
+        deltas = {column: delta for column, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        
+        for subject_type, subject_id in ((RatingSubject.SERVICE, service_id), (RatingSubject.PROVIDER, provider_id)):
+            self._increment(subject_type, subject_id, deltas)
+    
+    def _increment(self, subject_type, subject_id, deltas):
+        """Apply column deltas to one aggregate row, creating it if needed"""
+        values = {column: getattr(RatingAggregate, column) + delta for column, delta in deltas.items()}
+        statement = update(RatingAggregate).where(
+            RatingAggregate.subject_type == subject_type,
+            RatingAggregate.subject_id == subject_id
+        ).values(**values).execution_options(synchronize_session=False)
+        
+        if db.session.execute(statement).rowcount:
+            return
+        
+        # First rating for this subject; a concurrent writer may insert it first
+        try:
+            with db.session.begin_nested():
+                db.session.add(RatingAggregate(subject_type=subject_type, subject_id=subject_id, **deltas))
+        except IntegrityError:
+            db.session.execute(statement)
+    
+    def rebuild(self):
+        """
+        Recompute every aggregate from the feedback table
+        
+        Returns:
+            Number of aggregate rows written
+        """
+        db.session.query(RatingAggregate).delete(synchronize_session=False)
+        
+        count = 0
+        for subject_type, subject_column in ((RatingSubject.SERVICE, Feedback.service_id),
+                                             (RatingSubject.PROVIDER, Feedback.provider_id)):
+            columns = [
+                literal(subject_type), subject_column,
+                func.count(Feedback.id), func.sum(Feedback.rating)
+            ]
+            columns += [func.sum(case((Feedback.rating == stars, 1), else_=0)) for stars in range(1, 6)]
+            
+            select = db.session.query(*columns).group_by(subject_column).subquery()
+            statement = RatingAggregate.__table__.insert().from_select(
+                ['subject_type', 'subject_id', 'rating_count', 'rating_sum',
+                 'stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5'],
+                db.session.query(select)
+            )
+            count += db.session.execute(statement).rowcount
+        
+        db.session.commit()
+        return count
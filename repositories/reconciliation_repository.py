@@ -0,0 +1,213 @@
+from datetime import datetime
+from decimal import Decimal
+from models.ledger import BalanceSnapshot, LedgerPosting
+from models.reconciliation import ReconciliationRun, WalletDrift
+from models.wallet import Wallet
+from models.enum_types import LedgerAccountType, ReconciliationStatus
+from repositories.ledger_repository import LedgerRepository
+from utils.pagination import paginate
+from app import db
+from sqlalchemy import and_, func, insert
+
+class ReconciliationRepository:
+    def wallet_id_bounds(self):
+        """
+        Get the lowest and highest wallet IDs
+        
+        Returns:
+            Tuple (first_id, last_id), or None if there are no wallets
+        """
+        first_id, last_id = db.session.query(func.min(Wallet.id), func.max(Wallet.id)).one()
+        return (first_id, last_id) if first_id is not None else None
+    
+    def high_water_posting_id(self):
+        """Get the ID of the latest ledger posting (0 if there are none)"""
+        return db.session.query(func.coalesce(func.max(LedgerPosting.id), 0)).scalar()
+    
+    def find_changed_wallet_ids(self, since, after_posting_id):
+        """
+        Find wallets updated at or after a moment, or with postings after a
+        posting ID
+        
+        Both lookups are index range scans over the recent changes only.
+        
+        Returns:
+            Sorted list of wallet IDs
+        """
+        updated = db.session.query(Wallet.id).filter(Wallet.updated_at >= since)
+        posted = db.session.query(LedgerPosting.account_id).filter(
+            LedgerPosting.id > after_posting_id,
+            LedgerPosting.account_type == LedgerAccountType.WALLET
+        )
+        return sorted({wallet_id for (wallet_id,) in updated.union(posted).all()})
+    
+    def find_drifted_wallet_ids(self, run_id):
+        """Get the IDs of the wallets that drifted in a run"""
+        return [wallet_id for (wallet_id,) in db.session.query(WalletDrift.wallet_id).filter(
+            WalletDrift.run_id == run_id
+        ).all()]
+    
+    def find_mismatches(self, first_id=None, last_id=None, wallet_ids=None):
+        """
+        Compare stored balances with ledger balances for a range or list of wallets
+        
+        Each ledger balance is the wallet's latest snapshot plus the sum of
+        its postings after it. The snapshots, the posting sums and the
+        wallet balances are each read with one grouped query for the whole
+        range, so the work does not grow with the number of wallets in it.
+        The reads are not locked, so a mismatch may be a payment that
+        committed between them; confirm_mismatch rules those out.
+        
+        Args:
+            first_id: Lowest wallet ID of the range (inclusive)
+            last_id: Highest wallet ID of the range (inclusive)
+            wallet_ids: List of wallet IDs, instead of a range
+            
+        Returns:
+            Tuple (wallets_checked, mismatches) where mismatches is a list of
+            (wallet_id, wallet_balance, ledger_balance) tuples
+        """
+        if wallet_ids is not None:
+            in_snapshots = BalanceSnapshot.account_id.in_(wallet_ids)
+            in_postings = LedgerPosting.account_id.in_(wallet_ids)
+            in_wallets = Wallet.id.in_(wallet_ids)
+        else:
+            in_snapshots = BalanceSnapshot.account_id.between(first_id, last_id)
+            in_postings = LedgerPosting.account_id.between(first_id, last_id)
+            in_wallets = Wallet.id.between(first_id, last_id)
+        
+        latest = db.session.query(
+            BalanceSnapshot.account_id,
+            func.max(BalanceSnapshot.last_posting_id).label('last_posting_id')
+        ).filter(
+            BalanceSnapshot.account_type == LedgerAccountType.WALLET, in_snapshots
+        ).group_by(BalanceSnapshot.account_id).subquery('latest')
+        
+        ledger = {
+            account_id: Decimal(balance)
+            for account_id, balance in db.session.query(BalanceSnapshot.account_id, BalanceSnapshot.balance).join(latest, and_(
+                BalanceSnapshot.account_id == latest.c.account_id,
+                BalanceSnapshot.last_posting_id == latest.c.last_posting_id
+            )).filter(BalanceSnapshot.account_type == LedgerAccountType.WALLET)
+        }
+        
+        deltas = db.session.query(LedgerPosting.account_id, func.sum(LedgerPosting.amount)).outerjoin(
+            latest, LedgerPosting.account_id == latest.c.account_id
+        ).filter(
+            LedgerPosting.account_type == LedgerAccountType.WALLET,
+            in_postings,
+            LedgerPosting.id > func.coalesce(latest.c.last_posting_id, 0)
+        ).group_by(LedgerPosting.account_id)
+        for account_id, delta in deltas:
+            ledger[account_id] = ledger.get(account_id, Decimal('0')) + Decimal(delta)
+        
+        checked = 0
+        mismatches = []
+        for wallet_id, balance in db.session.query(Wallet.id, Wallet.balance).filter(in_wallets):
+            checked += 1
+            expected = ledger.get(wallet_id, Decimal('0'))
+            if Decimal(balance) != expected:
+                mismatches.append((wallet_id, Decimal(balance), expected))
+        return checked, mismatches
+    
+    def confirm_mismatch(self, wallet_id):
+        """
+        Re-read one wallet's balance and ledger balance consistently
+        
+        Postings are written while the wallet row is locked, so holding the
+        lock means no payment is half-applied. The lock is released before
+        returning.
+        
+        Returns:
+            Tuple (wallet_balance, ledger_balance), or None if the wallet is gone
+        """
+        try:
+            balance = db.session.query(Wallet.balance).filter(Wallet.id == wallet_id).with_for_update().scalar()
+            if balance is None:
+                return None
+            return Decimal(balance), LedgerRepository().get_balance(LedgerAccountType.WALLET, wallet_id)
+        finally:
+            db.session.rollback()
+    
+    def start_run(self, mode, checkpoint_run_id, high_water_posting_id):
+        """
+        Record the start of a run (commits)
+        
+        Returns:
+            ReconciliationRun object
+        """
+        run = ReconciliationRun(
+            mode=mode,
+            status=ReconciliationStatus.RUNNING,
+            checkpoint_run_id=checkpoint_run_id,
+            high_water_posting_id=high_water_posting_id,
+            started_at=datetime.utcnow()
+        )
+        db.session.add(run)
+        db.session.commit()
+        return run
+    
+    def finish_run(self, run, wallets_checked, drifts):
+        """
+        Record a run's results (commits)
+        
+        Args:
+            run: ReconciliationRun object
+            wallets_checked: Number of wallets compared
+            drifts: List of (wallet_id, wallet_balance, ledger_balance) tuples
+        """
+        now = datetime.utcnow()
+        if drifts:
+            db.session.execute(insert(WalletDrift), [
+                {
+                    'run_id': run.id,
+                    'wallet_id': wallet_id,
+                    'wallet_balance': wallet_balance,
+                    'ledger_balance': ledger_balance,
+                    'difference': wallet_balance - ledger_balance,
+                    'detected_at': now
+                }
+                for wallet_id, wallet_balance, ledger_balance in drifts
+            ])
+        run.status = ReconciliationStatus.COMPLETED
+        run.wallets_checked = wallets_checked
+        run.drifted_wallets = len(drifts)
+        run.total_drift = sum((abs(wallet_balance - ledger_balance) for _, wallet_balance, ledger_balance in drifts), Decimal('0'))
+        run.finished_at = now
+        db.session.commit()
+    
+    def fail_run(self, run, error):
+        """Record that a run stopped with an error (commits)"""
+        db.session.rollback()
+        run.status = ReconciliationStatus.FAILED
+        run.error = str(error)[:255]
+        run.finished_at = datetime.utcnow()
+        db.session.commit()
+    
+    def find_run(self, run_id):
+        """Find a run by ID"""
+        return db.session.get(ReconciliationRun, run_id)
+    
+    def find_latest_run(self, status=None):
+        """
+        Find the most recent run, optionally with a given status
+        
+        Returns:
+            ReconciliationRun object, or None
+        """
+        query = ReconciliationRun.query
+        
+        if status:
+            query = query.filter(ReconciliationRun.status == status)
+        
+        return query.order_by(ReconciliationRun.id.desc()).first()
+    
+    def find_drifts(self, run_id, cursor=None, limit=None):
+        """
+        Find the wallets that drifted in a run, by wallet ID
+        
+        Returns:
+            Page of WalletDrift objects
+        """
+        query = WalletDrift.query.filter(WalletDrift.run_id == run_id)
+        return paginate(query, WalletDrift.wallet_id, WalletDrift.id, cursor, limit, descending=False)
@@ -1,6 +1,16 @@
 from models.service import Service, ServiceStatus
+# Subclass mappers must be registered for polymorphic search results
+from models.car_pool import CarPoolService
+from models.gym import GymService
+from models.household import HouseholdService
+from models.mechanical import MechanicalService
+from utils.pagination import Page, paginate
+from utils.search_index import (
+    FTS_TABLE, TS_CONFIG, get_search_backend, postgres_tsquery, search_terms, sqlite_match_query
+)
 from app import db
-from sqlalchemy import or_, and_
+from sqlalchemy import Float, Integer, String, func, inspect, literal, literal_column, or_, and_, text
+from sqlalchemy.orm import with_polymorphic
 
 class ServiceRepository:
     def create(self, service):
@@ -56,7 +66,7 @@ class ServiceRepository:
         """
         return Service.query.get(service_id)
     
-    def find_all(self, service_type=None, status=None, provider_id=None):
+    def find_all(self, service_type=None, status=None, provider_id=None, cursor=None, limit=None):
         """
         Find all services, optionally filtered by type, status, and/or provider
         
@@ -64,9 +74,11 @@ class ServiceRepository:
             service_type: Filter by service type (optional)
             status: Filter by status (optional)
             provider_id: Filter by provider ID (optional)
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of service objects
+            Page of service objects, newest first
         """
         query = Service.query
         
@@ -83,36 +95,93 @@ class ServiceRepository:
         if status != ServiceStatus.DELETED:
             query = query.filter(Service.status != ServiceStatus.DELETED)
         
-        return query.all()
+        return paginate(query, Service.created_at, Service.id, cursor, limit)
     
-    def search(self, search_term, service_type=None, status=None):
+    def search(self, search_term, service_type=None, status=None, cursor=None, limit=None):
         """
         Search for services by name or description
         
+        Uses the full-text index (FTS5 on SQLite, tsvector on PostgreSQL) to
+        rank matches, falling back to a LIKE scan on other databases.
+        
         Args:
             search_term: Term to search for
             service_type: Filter by service type (optional)
             status: Filter by status (optional)
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of service objects matching the search
+            Page of (service, rank, name_highlight, description_highlight)
+            rows, best match first
         """
-        query = Service.query.filter(
-            or_(
-                Service.name.ilike(f"%{search_term}%"),
-                Service.description.ilike(f"%{search_term}%")
+        terms = search_terms(search_term)
+        if not terms:
+            return Page([])
+        
+        services = with_polymorphic(Service, '*')
+        ranked = True
+        backend = get_search_backend(db.session.get_bind())
+        
+        if backend == 'sqlite' and inspect(db.session.get_bind()).has_table(FTS_TABLE):
+            # bm25() is lower for better matches; the name column weighs more
+            matches = text(f"""
+                SELECT rowid AS service_id,
+                       bm25({FTS_TABLE}, 10.0, 1.0) AS rank,
+                       highlight({FTS_TABLE}, 0, '<mark>', '</mark>') AS name_highlight,
+                       snippet({FTS_TABLE}, 1, '<mark>', '</mark>', '…', 16) AS description_highlight
+                FROM {FTS_TABLE}
+                WHERE {FTS_TABLE} MATCH :match_query
+            """).bindparams(match_query=sqlite_match_query(terms)).columns(
+                service_id=Integer, rank=Float,
+                name_highlight=String, description_highlight=String
+            ).subquery('matches')
+            sort_column = matches.c.rank
+            query = db.session.query(
+                services, sort_column, matches.c.name_highlight, matches.c.description_highlight
+            ).join(matches, matches.c.service_id == services.id)
+            descending = False
+        elif backend == 'postgresql':
+            ts_query = func.to_tsquery(TS_CONFIG, postgres_tsquery(terms))
+            search_vector = literal_column('services.search_vector')
+            sort_column = func.ts_rank(search_vector, ts_query)
+            headline_options = 'StartSel=<mark>, StopSel=</mark>, MaxFragments=1'
+            query = db.session.query(
+                services, sort_column,
+                func.ts_headline(TS_CONFIG, services.name, ts_query, 'HighlightAll=true'),
+                func.ts_headline(TS_CONFIG, func.coalesce(services.description, ''), ts_query, headline_options)
+            ).filter(search_vector.op('@@')(ts_query))
+            descending = True
+        else:
+            # No index on this database: unranked LIKE scan, newest first
+            ranked = False
+            sort_column = services.created_at
+            query = db.session.query(
+                services, literal(None), services.name, services.description
+            ).filter(
+                or_(
+                    services.name.ilike(f"%{search_term}%"),
+                    services.description.ilike(f"%{search_term}%")
+                )
             )
-        )
+            descending = True
         
         if service_type:
-            query = query.filter_by(service_type=service_type)
+            query = query.filter(services.service_type == service_type)
         
         if status:
-            query = query.filter_by(status=status)
+            query = query.filter(services.status == status)
         else:
-            query = query.filter(Service.status != ServiceStatus.DELETED)
+            query = query.filter(services.status != ServiceStatus.DELETED)
+        
+        # Key on the services row identity; the subtype's id column is NULL
+        # for services created without their detail row
+        if ranked:
+            row_key = lambda row: (row[1], inspect(row[0]).identity[0])
+        else:
+            row_key = lambda row: (row[0].created_at, inspect(row[0]).identity[0])
         
-        return query.all()
+        return paginate(query, sort_column, services.id, cursor, limit, descending, row_key=row_key)
     
     def count_all(self, status=None):
         """
@@ -0,0 +1,233 @@
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+from models.ledger import JournalEntry, LedgerPosting, WalletStatementMonth
+from models.wallet import Wallet
+from models.enum_types import LedgerAccountType
+from utils.pagination import paginate
+from app import db
+from sqlalchemy import case, delete, func, insert
+
+# A month is summarized only once this long has passed after it ends, so
+# transactions that were in flight at midnight have committed
+MONTH_CLOSE_GRACE = timedelta(hours=1)
+
+def month_start(value):
+    """Get midnight on the first day of the month containing a date or datetime"""
+    return datetime(value.year, value.month, 1)
+
+def next_month(month):
+    """Get the first day of the month after a month start"""
+    return datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+class StatementRepository:
+    def balance_before(self, wallet_id, moment):
+        """
+        Get a wallet's running balance just before a moment in time
+        
+        Reads the latest posting before the moment through the account and
+        date index, so the cost does not depend on the wallet's history.
+        
+        Returns:
+            Balance as a Decimal (zero if the wallet had no postings yet)
+        """
+        balance = db.session.query(LedgerPosting.balance_after).filter(
+            LedgerPosting.account_type == LedgerAccountType.WALLET,
+            LedgerPosting.account_id == wallet_id,
+            LedgerPosting.created_at < moment
+        ).order_by(LedgerPosting.created_at.desc(), LedgerPosting.id.desc()).limit(1).scalar()
+        return Decimal(balance) if balance is not None else Decimal('0')
+    
+    def aggregate_postings(self, wallet_id, start, end):
+        """
+        Total a wallet's postings in [start, end) by journal entry type
+        
+        Returns:
+            Dictionary of entry type to (credits, debits, count)
+        """
+        if start >= end:
+            return {}
+        rows = db.session.query(
+            JournalEntry.entry_type,
+            func.coalesce(func.sum(case((LedgerPosting.amount > 0, LedgerPosting.amount), else_=0)), 0),
+            func.coalesce(func.sum(case((LedgerPosting.amount < 0, -LedgerPosting.amount), else_=0)), 0),
+            func.count(LedgerPosting.id)
+        ).join(JournalEntry, JournalEntry.id == LedgerPosting.entry_id).filter(
+            LedgerPosting.account_type == LedgerAccountType.WALLET,
+            LedgerPosting.account_id == wallet_id,
+            LedgerPosting.created_at >= start,
+            LedgerPosting.created_at < end
+        ).group_by(JournalEntry.entry_type).all()
+        return {
+            entry_type: (Decimal(credits), Decimal(debits), count)
+            for entry_type, credits, debits, count in rows
+        }
+    
+    def find_months(self, wallet_id, start_month, end_month):
+        """
+        Get a wallet's precomputed months in [start_month, end_month)
+        
+        Returns:
+            List of WalletStatementMonth objects, oldest first
+        """
+        return WalletStatementMonth.query.filter(
+            WalletStatementMonth.wallet_id == wallet_id,
+            WalletStatementMonth.month >= start_month.date(),
+            WalletStatementMonth.month < end_month.date()
+        ).order_by(WalletStatementMonth.month).all()
+    
+    def summarized_through(self):
+        """
+        Get the last month the statement job has summarized
+        
+        Months are summarized in order, so every earlier month is done too.
+        
+        Returns:
+            Month start as a datetime, or None if nothing is summarized
+        """
+        month = db.session.query(func.max(WalletStatementMonth.month)).scalar()
+        return month_start(month) if month else None
+    
+    def find_lines(self, wallet_id, start, end, cursor=None, limit=None):
+        """
+        Get a page of a wallet's postings in [start, end), oldest first
+        
+        Returns:
+            Page of (LedgerPosting, JournalEntry) rows
+        """
+        query = db.session.query(LedgerPosting, JournalEntry).join(
+            JournalEntry, JournalEntry.id == LedgerPosting.entry_id
+        ).filter(
+            LedgerPosting.account_type == LedgerAccountType.WALLET,
+            LedgerPosting.account_id == wallet_id,
+            LedgerPosting.created_at >= start,
+            LedgerPosting.created_at < end
+        )
+        return paginate(
+            query, LedgerPosting.created_at, LedgerPosting.id, cursor, limit, descending=False,
+            row_key=lambda row: (row[0].created_at, row[0].id)
+        )
+    
+    def backfill_running_balances(self, batch_size=1000):
+        """
+        Fill in running balances for wallet postings written before they
+        were recorded, committing after each wallet
+        
+        Each wallet is locked while its history is filled in, so new
+        postings wait and then continue from the backfilled balance.
+        
+        Returns:
+            Number of postings updated
+        """
+        wallet_ids = [wallet_id for (wallet_id,) in db.session.query(LedgerPosting.account_id).filter(
+            LedgerPosting.account_type == LedgerAccountType.WALLET,
+            LedgerPosting.balance_after.is_(None)
+        ).distinct().order_by(LedgerPosting.account_id).all()]
+        
+        updated = 0
+        for wallet_id in wallet_ids:
+            db.session.query(Wallet.id).filter(Wallet.id == wallet_id).with_for_update().first()
+            account = (
+                LedgerPosting.account_type == LedgerAccountType.WALLET,
+                LedgerPosting.account_id == wallet_id
+            )
+            first_missing = db.session.query(func.min(LedgerPosting.id)).filter(
+                *account, LedgerPosting.balance_after.is_(None)
+            ).scalar()
+            previous = db.session.query(LedgerPosting.balance_after).filter(
+                *account, LedgerPosting.id < first_missing
+            ).order_by(LedgerPosting.id.desc()).limit(1).scalar()
+            balance = Decimal(previous) if previous is not None else Decimal('0')
+            
+            mappings = []
+            postings = db.session.query(LedgerPosting.id, LedgerPosting.amount).filter(
+                *account, LedgerPosting.id >= first_missing
+            ).order_by(LedgerPosting.id).yield_per(batch_size)
+            for posting_id, amount in postings:
+                balance += Decimal(amount)
+                mappings.append({'id': posting_id, 'balance_after': balance})
+            for offset in range(0, len(mappings), batch_size):
+                db.session.bulk_update_mappings(LedgerPosting, mappings[offset:offset + batch_size])
+            
+            db.session.commit()
+            updated += len(mappings)
+        return updated
+    
+    def summarize_closed_months(self, now=None):
+        """
+        Precompute every wallet's totals for months that have closed since
+        the last run, committing after each month
+        
+        Returns:
+            Number of months summarized
+        """
+        now = now or datetime.utcnow()
+        last_done = self.summarized_through()
+        if last_done:
+            month = next_month(last_done)
+        else:
+            first_posting = db.session.query(func.min(LedgerPosting.created_at)).filter(
+                LedgerPosting.account_type == LedgerAccountType.WALLET
+            ).scalar()
+            if not first_posting:
+                return 0
+            month = month_start(first_posting)
+        
+        summarized = 0
+        while next_month(month) + MONTH_CLOSE_GRACE <= now:
+            self._summarize_month(month)
+            db.session.commit()
+            summarized += 1
+            month = next_month(month)
+        return summarized
+    
+    def _summarize_month(self, month):
+        """Write the statement rows of every wallet with postings in a month (does not commit)"""
+        end = next_month(month)
+        in_month = (
+            LedgerPosting.account_type == LedgerAccountType.WALLET,
+            LedgerPosting.created_at >= month,
+            LedgerPosting.created_at < end
+        )
+        
+        totals = db.session.query(
+            LedgerPosting.account_id,
+            JournalEntry.entry_type,
+            func.coalesce(func.sum(case((LedgerPosting.amount > 0, LedgerPosting.amount), else_=0)), 0),
+            func.coalesce(func.sum(case((LedgerPosting.amount < 0, -LedgerPosting.amount), else_=0)), 0),
+            func.count(LedgerPosting.id)
+        ).join(JournalEntry, JournalEntry.id == LedgerPosting.entry_id).filter(*in_month).group_by(
+            LedgerPosting.account_id, JournalEntry.entry_type
+        ).all()
+        
+        # The month's last posting per wallet carries its closing balance
+        last_ids = db.session.query(func.max(LedgerPosting.id)).filter(*in_month).group_by(LedgerPosting.account_id)
+        closings = dict(db.session.query(LedgerPosting.account_id, LedgerPosting.balance_after).filter(
+            LedgerPosting.id.in_(last_ids)
+        ).all())
+        
+        wallets = {}
+        for wallet_id, entry_type, credits, debits, count in totals:
+            summary = wallets.setdefault(wallet_id, {'credits': Decimal('0'), 'debits': Decimal('0'), 'count': 0, 'by_type': {}})
+            summary['credits'] += Decimal(credits)
+            summary['debits'] += Decimal(debits)
+            summary['count'] += count
+            summary['by_type'][entry_type] = {'credits': str(Decimal(credits)), 'debits': str(Decimal(debits)), 'count': count}
+        
+        db.session.execute(delete(WalletStatementMonth).where(WalletStatementMonth.month == month.date()))
+        rows = []
+        for wallet_id, summary in sorted(wallets.items()):
+            closing = Decimal(closings.get(wallet_id) or 0)
+            rows.append({
+                'wallet_id': wallet_id,
+                'month': month.date(),
+                'opening_balance': closing - summary['credits'] + summary['debits'],
+                'closing_balance': closing,
+                'credits': summary['credits'],
+                'debits': summary['debits'],
+                'posting_count': summary['count'],
+                'breakdown': json.dumps(summary['by_type'], sort_keys=True),
+                'created_at': datetime.utcnow()
+            })
+        if rows:
+            db.session.execute(insert(WalletStatementMonth), rows)
@@ -1,4 +1,9 @@
+import heapq
+from models.archive import TransactionArchive
 from models.transaction import Transaction
+from models.wallet import Wallet
+from repositories.archive_repository import ArchiveRepository
+from utils.pagination import paginate_with_archive
 from app import db
 
 class TransactionRepository:
@@ -28,23 +33,95 @@ class TransactionRepository:
         """
         return Transaction.query.get(transaction_id)
     
-    def find_by_wallet_id(self, wallet_id, limit=None):
+    def find_by_wallet_id(self, wallet_id, cursor=None, limit=None):
         """
-        Find transactions for a specific wallet
+        Find transactions for a specific wallet, newest first, including
+        archived ones
         
         Args:
             wallet_id: ID of the wallet
-            limit: Maximum number of transactions to return
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of transaction objects
+            Page of Transaction (or TransactionArchive) objects
+        """
+        def build_query(model):
+            return model.query.filter(model.wallet_id == wallet_id)
+        
+        return self._paginate(build_query, cursor, limit)
+    
+    def find_all(self, transaction_type=None, cursor=None, limit=None):
         """
-        query = Transaction.query.filter_by(wallet_id=wallet_id).order_by(Transaction.created_at.desc())
+        Find all transactions, optionally filtered by type, newest first,
+        including archived ones
         
-        if limit:
-            query = query.limit(limit)
+        Args:
+            transaction_type: Filter by transaction type (optional)
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
+            
+        Returns:
+            Page of Transaction (or TransactionArchive) objects
+        """
+        def build_query(model):
+            query = model.query
+            
+            if transaction_type:
+                query = query.filter(model.transaction_type == transaction_type)
+            
+            return query
+        
+        return self._paginate(build_query, cursor, limit)
+    
+    def stream_for_export(self, start, end, transaction_type=None, batch_size=1000):
+        """
+        Stream transactions created in [start, end), oldest first,
+        including archived ones
+        
+        Selects plain columns rather than Transaction objects and fetches
+        them batch_size rows at a time (through a server-side cursor on
+        PostgreSQL), so nothing accumulates in the session while iterating.
+        When the period reaches back before the archive cutoff, the live and
+        archived rows are merged as they are read.
+        
+        Args:
+            start: Start of the period (datetime, inclusive)
+            end: End of the period (datetime, exclusive)
+            transaction_type: Filter by transaction type (optional)
+            batch_size: Rows fetched from the database at a time
+            
+        Returns:
+            Tuple (fields, rows) where rows is an iterator of tuples
+        """
+        def build_query(model):
+            query = db.session.query(
+                model.id,
+                model.created_at,
+                model.wallet_id,
+                Wallet.user_id,
+                model.transaction_type,
+                model.amount,
+                model.description,
+                model.reference_id
+            ).join(Wallet, Wallet.id == model.wallet_id).filter(
+                model.created_at >= start,
+                model.created_at < end
+            )
+            
+            if transaction_type:
+                query = query.filter(model.transaction_type == transaction_type)
             
-        return query.all()
+            return query.order_by(model.created_at, model.id).yield_per(batch_size)
+        
+        query = build_query(Transaction)
+        fields = [column['name'] for column in query.column_descriptions]
+        archived_before = ArchiveRepository().archived_before(Transaction.__tablename__)
+        if archived_before is None or start >= archived_before:
+            return fields, query
+        
+        rows = heapq.merge(query, build_query(TransactionArchive), key=lambda row: (row.created_at, row.id))
+        return fields, rows
     
     def find_by_reference_id(self, reference_id):
         """
@@ -83,4 +160,42 @@ class TransactionRepository:
         """
         db.session.delete(transaction)
         db.session.commit()
-        return True
\ No newline at end of file
+        return True
+    
+    def find_recent(self, limit=5):
+        """
+        Find recent transactions
+        
+        Args:
+            limit: Maximum number of transactions to return
+            
+        Returns:
+            List of transaction objects
+        """
+        return Transaction.query.order_by(Transaction.created_at.desc()).limit(limit).all()
+    
+    def count_all(self, transaction_type=None):
+        """
+        Count all transactions, optionally filtered by type, including archived ones
+        
+        Args:
+            transaction_type: Filter by transaction type (optional)
+            
+        Returns:
+            Number of transactions
+        """
+        query = Transaction.query
+        archived = TransactionArchive.query
+        
+        if transaction_type:
+            query = query.filter_by(transaction_type=transaction_type)
+            archived = archived.filter_by(transaction_type=transaction_type)
+        
+        if ArchiveRepository().archived_before(Transaction.__tablename__) is None:
+            return query.count()
+        return query.count() + archived.count()
+    
+    def _paginate(self, build_query, cursor, limit):
+        """Paginate a transaction list across the live and archive tables"""
+        archived_before = ArchiveRepository().archived_before(Transaction.__tablename__)
+        return paginate_with_archive(build_query, Transaction, TransactionArchive, archived_before, cursor, limit)
@@ -1,4 +1,5 @@
 from models.user import User, UserRole, UserStatus
+from utils.pagination import paginate
 from app import db
 
 class UserRepository:
@@ -67,16 +68,18 @@ class UserRepository:
         """
         return User.query.filter_by(email=email).first()
     
-    def find_all(self, role=None, status=None):
+    def find_all(self, role=None, status=None, cursor=None, limit=None):
         """
-        Find all users, optionally filtered by role and/or status
+        Find all users, optionally filtered by role and/or status, newest first
         
         Args:
             role: Filter by role (optional)
             status: Filter by status (optional)
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of user objects
+            Page of user objects
         """
         query = User.query
         
@@ -86,18 +89,20 @@ class UserRepository:
         if status:
             query = query.filter_by(status=status)
         
-        return query.all()
+        return paginate(query, User.created_at, User.id, cursor, limit)
     
-    def find_service_providers(self, service_type=None, status=None):
+    def find_service_providers(self, service_type=None, status=None, cursor=None, limit=None):
         """
         Find all service providers, optionally filtered by service type and/or status
         
         Args:
             service_type: Filter by service type (optional)
             status: Filter by status (optional)
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of service provider user objects
+            Page of service provider user objects
         """
         query = User.query.filter_by(role=UserRole.POWER_USER)
         
@@ -107,7 +112,7 @@ class UserRepository:
         if status:
             query = query.filter_by(status=status)
         
-        return query.all()
+        return paginate(query, User.created_at, User.id, cursor, limit)
     
     def count_all(self):
         """
@@ -0,0 +1,108 @@
+from datetime import datetime
+from models.waitlist import WaitlistEntry
+from models.enum_types import WaitlistStatus
+from utils.pagination import paginate
+from app import db
+from sqlalchemy import func, update
+
+class WaitlistRepository:
+    def create(self, entry):
+        """
+        Create a new waitlist entry
+        
+        Args:
+            entry: WaitlistEntry object to create
+            
+        Returns:
+            Created waitlist entry object
+        """
+        db.session.add(entry)
+        db.session.commit()
+        return entry
+    
+    def find_waiting(self, service_id, user_id):
+        """
+        Find a user's place in a service's queue
+        
+        Returns:
+            WaitlistEntry object if the user is waiting, None otherwise
+        """
+        return WaitlistEntry.query.filter_by(
+            service_id=service_id, user_id=user_id, status=WaitlistStatus.WAITING
+        ).first()
+    
+    def find_by_user_id(self, user_id, cursor=None, limit=None):
+        """
+        Find a user's waitlist entries
+        
+        Returns:
+            Page of waitlist entry objects, newest first
+        """
+        query = WaitlistEntry.query.filter_by(user_id=user_id)
+        return paginate(query, WaitlistEntry.created_at, WaitlistEntry.id, cursor, limit)
+    
+    def find_next(self, service_id, limit):
+        """
+        Get the head of a service's queue
+        
+        Args:
+            service_id: ID of the service
+            limit: Number of entries to return
+            
+        Returns:
+            List of waiting entries, highest priority first, then first come
+        """
+        return WaitlistEntry.query.filter_by(
+            service_id=service_id, status=WaitlistStatus.WAITING
+        ).order_by(WaitlistEntry.priority.desc(), WaitlistEntry.id).limit(limit).all()
+    
+    def count_waiting(self, service_id):
+        """Get the number of users waiting for a service"""
+        return db.session.query(func.count(WaitlistEntry.id)).filter(
+            WaitlistEntry.service_id == service_id,
+            WaitlistEntry.status == WaitlistStatus.WAITING
+        ).scalar()
+    
+    def mark_promoted(self, entry_id):
+        """
+        Move an entry out of the queue if it is still waiting (does not commit)
+        
+        Returns:
+            True if this call promoted the entry
+        """
+        result = db.session.execute(
+            update(WaitlistEntry).where(
+                WaitlistEntry.id == entry_id,
+                WaitlistEntry.status == WaitlistStatus.WAITING
+            ).values(status=WaitlistStatus.PROMOTED, promoted_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+    
+    def requeue(self, entry_id):
+        """Put a promoted entry back in its place in the queue (does not commit)"""
+        db.session.execute(
+            update(WaitlistEntry).where(
+                WaitlistEntry.id == entry_id,
+                WaitlistEntry.status == WaitlistStatus.PROMOTED
+            ).values(status=WaitlistStatus.WAITING, promoted_at=None)
+            .execution_options(synchronize_session=False)
+        )
+    
+    def cancel(self, service_id, user_id):
+        """
+        Take a user out of a service's queue
+        
+        Returns:
+            True if the user was waiting
+        """
+        result = db.session.execute(
+            update(WaitlistEntry).where(
+                WaitlistEntry.service_id == service_id,
+                WaitlistEntry.user_id == user_id,
+                WaitlistEntry.status == WaitlistStatus.WAITING
+            ).values(status=WaitlistStatus.CANCELLED)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount > 0
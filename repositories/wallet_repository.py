@@ -1,5 +1,8 @@
 from models.wallet import Wallet
+from models.user import User
+from models.enum_types import UserRole
 from app import db
+from sqlalchemy import or_, update
 
 class WalletRepository:
     def create(self, wallet):
@@ -75,3 +78,104 @@ class WalletRepository:
             List of wallet objects
         """
         return Wallet.query.all()
+    
+    def find_settlement_wallets(self, user_ids):
+        """
+        Load the given users' wallets and the admin wallet in one query
+        
+        Args:
+            user_ids: IDs of the users taking part in the settlement
+            
+        Returns:
+            Tuple (dictionary of user ID to Wallet, admin Wallet or None)
+        """
+        rows = db.session.query(Wallet, User.role).join(User, User.id == Wallet.user_id).filter(
+            or_(Wallet.user_id.in_(set(user_ids)), User.role == UserRole.ADMIN)
+        ).order_by(Wallet.id).all()
+        
+        wallets = {}
+        admin_wallet = None
+        for wallet, role in rows:
+            if wallet.user_id in user_ids:
+                wallets[wallet.user_id] = wallet
+            if role == UserRole.ADMIN and admin_wallet is None:
+                admin_wallet = wallet
+        return wallets, admin_wallet
+    
+    def find_ids_by_user_ids(self, user_ids):
+        """
+        Look up wallet IDs for several users in one query, without locking
+        
+        Args:
+            user_ids: IDs of the users
+            
+        Returns:
+            Dictionary of user ID to wallet ID
+        """
+        rows = db.session.query(Wallet.user_id, Wallet.id).filter(Wallet.user_id.in_(set(user_ids))).all()
+        return {user_id: wallet_id for user_id, wallet_id in rows}
+    
+    def find_admin_wallet(self):
+        """
+        Find the wallet that platform commission is rolled up into
+        
+        Returns:
+            Wallet object of the first admin user, None if there is none
+        """
+        return Wallet.query.join(User, User.id == Wallet.user_id).filter(
+            User.role == UserRole.ADMIN
+        ).order_by(Wallet.id).first()
+    
+    def apply_balance_changes(self, changes):
+        """
+        Apply several balance changes in wallet ID order (does not commit)
+        
+        Each UPDATE locks its row, so applying changes in a fixed order
+        means concurrent settlements over the same wallets cannot deadlock.
+        
+        Args:
+            changes: Iterable of (wallet_id, amount) with negative amounts for debits
+            
+        Returns:
+            True if all changes were applied, False if a debit had insufficient funds
+        """
+        for wallet_id, amount in sorted(changes, key=lambda change: change[0]):
+            if amount < 0:
+                if not self.debit(wallet_id, -amount):
+                    return False
+            else:
+                self.credit(wallet_id, amount)
+        return True
+    
+    def credit(self, wallet_id, amount):
+        """
+        Add to a wallet balance with in-database arithmetic (does not commit)
+        
+        Args:
+            wallet_id: ID of the wallet
+            amount: Amount to add
+            
+        Returns:
+            True if the wallet was updated
+        """
+        result = db.session.execute(
+            update(Wallet).where(Wallet.id == wallet_id).values(balance=Wallet.balance + amount)
+        )
+        return result.rowcount == 1
+    
+    def debit(self, wallet_id, amount):
+        """
+        Subtract from a wallet balance if it has sufficient funds (does not commit)
+        
+        Args:
+            wallet_id: ID of the wallet
+            amount: Amount to subtract
+            
+        Returns:
+            True if the wallet was updated, False if funds were insufficient
+        """
+        result = db.session.execute(
+            update(Wallet).where(Wallet.id == wallet_id, Wallet.balance >= amount)
+            .values(balance=Wallet.balance - amount)
+        )
+        return result.rowcount == 1
@@ -0,0 +1,12 @@
+from app import app
+from repositories.commission_repository import CommissionRepository
+
+# Run periodically (e.g. from cron) to fold sharded commission into the admin wallet
+def rollup_commission():
+    with app.app_context():
+        print("Rolling up commission shards...")
+        total = CommissionRepository().roll_up()
+        print(f"Moved {total} into the admin wallet!")
+
+if __name__ == "__main__":
+    rollup_commission()
\ No newline at end of file
@@ -7,6 +7,7 @@ from models.car_pool import CarPoolService, VehicleType
 from models.gym import GymService
 from models.household import HouseholdService, HouseholdServiceType
 from models.mechanical import MechanicalService, MechanicalServiceType
+from repositories.ledger_repository import LedgerRepository
 from datetime import datetime
 
 def create_test_data(force=False):
@@ -112,6 +113,9 @@ def create_test_data(force=False):
         
         db.session.commit()
         
+        # Record the starting balances in the ledger
+        LedgerRepository().open_missing_balances()
+        
         # Create services using the specific model classes instead of base Service class
         # This ensures polymorphic attributes are properly set
 
@@ -3,6 +3,8 @@ from repositories.user_repository import UserRepository
 from repositories.service_repository import ServiceRepository
 from repositories.booking_repository import BookingRepository
 from repositories.transaction_repository import TransactionRepository
+from repositories.wallet_repository import WalletRepository
+from repositories.commission_repository import CommissionRepository
 from app import db
 
 class AdminService:
@@ -11,6 +13,8 @@ class AdminService:
         self.service_repository = ServiceRepository()
         self.booking_repository = BookingRepository()
         self.transaction_repository = TransactionRepository()
+        self.wallet_repository = WalletRepository()
+        self.commission_repository = CommissionRepository()
     
     def get_dashboard_stats(self):
         """
@@ -34,6 +38,10 @@ class AdminService:
         # Get recent transactions
         recent_transactions = self.transaction_repository.find_recent(limit=5)
         
+        # Platform commission: admin wallet plus commission not yet rolled up
+        admin_wallet = self.wallet_repository.find_admin_wallet()
+        commission_balance = (admin_wallet.balance if admin_wallet else 0) + self.commission_repository.pending_total()
+        
         return {
             'total_users': total_users,
             'total_providers': total_providers,
@@ -41,46 +49,83 @@ class AdminService:
             'total_bookings': total_bookings,
             'total_transactions': total_transactions,
             'pending_approvals': pending_approvals,
+            'commission_balance': float(commission_balance),
             'recent_bookings': [booking.to_dict() for booking in recent_bookings],
             'recent_transactions': [transaction.to_dict() for transaction in recent_transactions]
         }
     
-    def get_all_services(self, status=None):
+    def get_all_services(self, status=None, cursor=None, limit=None):
         """
         Get all services, optionally filtered by status
         
         Args:
             status: Filter by service status (optional)
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of service objects
+            Page of service objects
         """
-        return self.service_repository.find_all(status=status)
+        return self.service_repository.find_all(status=status, cursor=cursor, limit=limit)
     
-    def get_all_bookings(self, status=None):
+    def get_all_bookings(self, status=None, cursor=None, limit=None):
         """
         Get all bookings, optionally filtered by status
         
         Args:
             status: Filter by booking status (optional)
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
+            
+        Returns:
+            Page of booking objects
+        """
+        return self.booking_repository.find_all(status=status, cursor=cursor, limit=limit)
+    
+    def get_all_transactions(self, transaction_type=None, cursor=None, limit=None):
+        """
+        Get all transactions, optionally filtered by type
+        
+        Args:
+            transaction_type: Filter by transaction type (optional)
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
+            
+        Returns:
+            Page of transaction objects
+        """
+        return self.transaction_repository.find_all(transaction_type=transaction_type, cursor=cursor, limit=limit)
+    
+    def export_bookings(self, start, end, status=None, service_type=None, batch_size=1000):
+        """
+        Get the bookings created in [start, end) for a streaming export
+        
+        Args:
+            start: Start of the period (datetime, inclusive)
+            end: End of the period (datetime, exclusive)
+            status: Filter by booking status (optional)
+            service_type: Filter by service type (optional)
+            batch_size: Rows fetched from the database at a time
             
         Returns:
-            List of booking objects
+            Tuple (fields, rows) where rows is an iterator of tuples
         """
-        return self.booking_repository.find_all(status=status)
+        return self.booking_repository.stream_for_export(start, end, status, service_type, batch_size)
     
-    def get_all_transactions(self, transaction_type=None, limit=50):
+    def export_transactions(self, start, end, transaction_type=None, batch_size=1000):
         """
-        Get all transactions, optionally filtered by type and limited
+        Get the transactions created in [start, end) for a streaming export
         
         Args:
+            start: Start of the period (datetime, inclusive)
+            end: End of the period (datetime, exclusive)
             transaction_type: Filter by transaction type (optional)
-            limit: Maximum number of transactions to return
+            batch_size: Rows fetched from the database at a time
             
         Returns:
-            List of transaction objects
+            Tuple (fields, rows) where rows is an iterator of tuples
         """
-        return self.transaction_repository.find_all(transaction_type=transaction_type, limit=limit)
+        return self.transaction_repository.stream_for_export(start, end, transaction_type, batch_size)
     
     def update_service(self, service_id, data):
         """
@@ -1,14 +1,48 @@
-from datetime import datetime
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
 from flask import current_app
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
-from models.booking import Booking
+from models.booking import Booking, BOOKING_TRANSITIONS
 from models.service import Service
 from models.user import User
 from models.wallet import Wallet
 from models.transaction import Transaction
-from models.enum_types import BookingStatus, ServiceStatus, UserRole, TransactionType
+from models.enum_types import (
+    BookingStatus, ServiceStatus, ServiceType, TransactionType, LedgerAccountType, JournalEntryType,
+    OutboxEventType
+)
+from repositories.booking_repository import BookingRepository
+from repositories.car_pool_repository import CarPoolRepository
+from repositories.commission_repository import CommissionRepository
+from repositories.ledger_repository import LedgerRepository
+from repositories.outbox_repository import OutboxRepository
+from repositories.wallet_repository import WalletRepository
+from services.booking_state_machine import (
+    BookingStateMachine, CONFLICT_MESSAGE, MAX_TRANSITION_ATTEMPTS, on_transition
+)
 from app import db
 
+# Share of each booking paid to the platform (admin wallet)
+COMMISSION_RATE = Decimal('0.10')
+
+# Largest cart accepted by create_batch_bookings
+MAX_BATCH_ITEMS = 20
+
+# Largest number of bookings accepted by bulk_update_status
+MAX_BULK_IDS = 500
+
+# Provider actions accepted by bulk_update_status
+BULK_ACTIONS = ('confirm', 'reject', 'complete')
+
+# Outbox event recorded when a booking moves into each status
+STATUS_EVENTS = {
+    BookingStatus.CONFIRMED: OutboxEventType.BOOKING_CONFIRMED,
+    BookingStatus.REJECTED: OutboxEventType.BOOKING_REJECTED,
+    BookingStatus.COMPLETED: OutboxEventType.BOOKING_COMPLETED,
+    BookingStatus.CANCELLED: OutboxEventType.BOOKING_CANCELLED
+}
+
 class BookingService:
     @staticmethod
     def get_booking(booking_id):
@@ -16,29 +50,19 @@ class BookingService:
         return Booking.query.get(booking_id)
     
     @staticmethod
-    def get_all_bookings(status=None):
-        """Get all bookings with optional status filter"""
-        query = Booking.query
-        if status:
-            query = query.filter_by(status=status)
-        return query.order_by(Booking.created_at.desc()).all()
+    def get_all_bookings(status=None, cursor=None, limit=None):
+        """Get a page of all bookings (including archived ones) with optional status filter"""
+        return BookingRepository().find_all(status, cursor, limit)
     
     @staticmethod
-    def get_user_bookings(user_id, status=None):
-        """Get bookings for a user with optional status filter"""
-        query = Booking.query.filter_by(user_id=user_id)
-        if status:
-            query = query.filter_by(status=status)
-        return query.order_by(Booking.created_at.desc()).all()
+    def get_user_bookings(user_id, status=None, cursor=None, limit=None):
+        """Get a page of bookings (including archived ones) for a user with optional status filter"""
+        return BookingRepository().find_by_user_id(user_id, status, cursor, limit)
     
     @staticmethod
-    def get_provider_bookings(provider_id, status=None):
-        """Get bookings for a service provider with optional status filter"""
-        query = db.session.query(Booking).join(Service, Booking.service_id == Service.id)
-        query = query.filter(Service.provider_id == provider_id)
-        if status:
-            query = query.filter(Booking.status == status)
-        return query.order_by(Booking.created_at.desc()).all()
+    def get_provider_bookings(provider_id, status=None, cursor=None, limit=None):
+        """Get a page of bookings (including archived ones) for a service provider with optional status filter"""
+        return BookingRepository().find_by_provider_id(provider_id, status, cursor, limit)
     
     @staticmethod
     def create_booking(service_id, user_id, quantity=1, notes=None, **kwargs):
@@ -49,6 +73,7 @@ class BookingService:
         1. Validating service availability
         2. Calculating the total cost
         3. Creating the booking record (without payment)
+        4. Holding the seats of pool bookings until they are paid for
         
         Returns the created booking object
         """
@@ -80,10 +105,209 @@ class BookingService:
         
         # Create the booking (but don't process payment yet)
         db.session.add(booking)
+        
+        # Seats are held until the booking is paid or the hold expires
+        if service.service_type in (ServiceType.CAR_POOL, ServiceType.BIKE_POOL):
+            db.session.flush()
+            if not CarPoolRepository().place_hold(service_id, user_id, quantity, booking.id):
+                db.session.rollback()
+                raise ValueError("Not enough seats available")
+        
         db.session.commit()
         
         return booking
     
+    @staticmethod
+    def create_batch_bookings(user_id, items):
+        """
+        Book and pay for a cart of services in one transaction
+        
+        Every item is validated and priced before anything is written.
+        Pool seats are reserved with conditional updates, the user's wallet
+        is debited once for the cart total, and each provider is credited
+        once for all of their items. Any failure rolls back the whole cart.
+        
+        Args:
+            user_id: ID of the user booking
+            items: List of dicts with service_id and optional quantity,
+                notes, start_time and end_time
+            
+        Returns a tuple (success, list of per-item results). Each result has
+        the item index, service_id, success flag, and the booking or error.
+        """
+        if not items:
+            return False, []
+        if len(items) > MAX_BATCH_ITEMS:
+            return False, [BookingService._batch_result(index, item, error=f"A cart can hold at most {MAX_BATCH_ITEMS} items")
+                           for index, item in enumerate(items)]
+        
+        service_ids = {item.get('service_id') for item in items}
+        services = {service.id: service for service in Service.query.filter(Service.id.in_(service_ids)).all()}
+        
+        # Validate and price every item before writing anything
+        errors = {}
+        amounts = []
+        for index, item in enumerate(items):
+            service = services.get(item.get('service_id'))
+            quantity = item.get('quantity', 1)
+            amounts.append(None)
+            if not service:
+                errors[index] = "Service not found"
+            elif service.status != ServiceStatus.AVAILABLE:
+                errors[index] = "Service is not available for booking"
+            elif service.provider_id == user_id:
+                errors[index] = "You cannot book your own service"
+            elif not isinstance(quantity, int) or quantity <= 0:
+                errors[index] = "Quantity must be a positive integer"
+            else:
+                amounts[index] = Decimal(service.price or 0) * quantity
+        if errors:
+            return False, BookingService._batch_results(items, errors)
+        
+        try:
+            wallet_repository = WalletRepository()
+            provider_ids = {services[item['service_id']].provider_id for item in items}
+            wallets, admin_wallet = wallet_repository.find_settlement_wallets([user_id, *provider_ids])
+            
+            user_wallet = wallets.get(user_id)
+            if not user_wallet:
+                return BookingService._abort_batch(items, "User wallet not found")
+            if not admin_wallet:
+                return BookingService._abort_batch(items, "Admin wallet not found")
+            for index, item in enumerate(items):
+                if services[item['service_id']].provider_id not in wallets:
+                    errors[index] = "Provider wallet not found"
+            if errors:
+                return BookingService._abort_batch(items, errors=errors)
+            
+            total = sum(amounts)
+            if user_wallet.balance < total:
+                return BookingService._abort_batch(items, "Insufficient funds in wallet")
+            
+            # Reserve pool seats; the conditional update cannot oversell
+            car_pool_repository = CarPoolRepository()
+            for index, item in enumerate(items):
+                service = services[item['service_id']]
+                if service.service_type in (ServiceType.CAR_POOL, ServiceType.BIKE_POOL):
+                    if not car_pool_repository.reserve_seats(service.id, item.get('quantity', 1)):
+                        errors[index] = "Not enough seats available"
+            if errors:
+                return BookingService._abort_batch(items, errors=errors)
+            
+            bookings = []
+            for index, item in enumerate(items):
+                booking = Booking(
+                    service_id=item['service_id'],
+                    user_id=user_id,
+                    amount=amounts[index],
+                    quantity=item.get('quantity', 1),
+                    notes=item.get('notes'),
+                    status=BookingStatus.CONFIRMED,
+                    start_time=item.get('start_time'),
+                    end_time=item.get('end_time')
+                )
+                db.session.add(booking)
+                bookings.append(booking)
+            db.session.flush()
+            
+            # One debit for the cart and one credit per provider wallet
+            changes = defaultdict(Decimal)
+            changes[user_wallet.id] -= total
+            splits = []
+            for booking in bookings:
+                admin_commission, provider_amount = BookingService._split_commission(booking.amount)
+                provider_wallet = wallets[services[booking.service_id].provider_id]
+                changes[provider_wallet.id] += provider_amount
+                splits.append((booking, provider_wallet, admin_commission, provider_amount))
+            if not wallet_repository.apply_balance_changes(changes.items()):
+                return BookingService._abort_batch(items, "Insufficient funds in wallet")
+            
+            commission_repository = CommissionRepository()
+            ledger_repository = LedgerRepository()
+            user_transactions = []
+            for booking, provider_wallet, admin_commission, provider_amount in splits:
+                service = services[booking.service_id]
+                shard_id = commission_repository.book(booking.id, admin_commission)
+                ledger_repository.post(JournalEntryType.PAYMENT, [
+                    (LedgerAccountType.WALLET, user_wallet.id, -Decimal(booking.amount)),
+                    (LedgerAccountType.WALLET, provider_wallet.id, provider_amount),
+                    (LedgerAccountType.COMMISSION, shard_id, admin_commission)
+                ], reference_id=booking.id, description=f"Payment for {service.name}")
+                
+                user_transaction = Transaction(
+                    wallet_id=user_wallet.id,
+                    amount=booking.amount,
+                    transaction_type=TransactionType.PAYMENT,
+                    description=f"Payment for {service.name}",
+                    reference_id=str(booking.id)
+                )
+                user_transactions.append(user_transaction)
+                db.session.add_all([
+                    user_transaction,
+                    Transaction(
+                        wallet_id=provider_wallet.id,
+                        amount=provider_amount,
+                        transaction_type=TransactionType.PAYMENT,
+                        description=f"Payment received for {service.name}",
+                        reference_id=str(booking.id)
+                    ),
+                    Transaction(
+                        wallet_id=admin_wallet.id,
+                        amount=admin_commission,
+                        transaction_type=TransactionType.COMMISSION,
+                        description=f"Commission for booking #{booking.id}",
+                        reference_id=str(booking.id)
+                    )
+                ])
+            
+            # Link each booking to the user's payment
+            db.session.flush()
+            for booking, user_transaction in zip(bookings, user_transactions):
+                booking.transaction_id = user_transaction.id
+            BookingService._record_events(BookingStatus.CONFIRMED, bookings, None, paid=True)
+            
+            db.session.commit()
+            return True, [
+                BookingService._batch_result(index, item, booking=booking)
+                for index, (item, booking) in enumerate(zip(items, bookings))
+            ]
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error creating batch bookings: {str(e)}")
+            return False, BookingService._batch_results(items, {}, f"Database error: {str(e)}")
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error creating batch bookings: {str(e)}")
+            return False, BookingService._batch_results(items, {}, f"Error: {str(e)}")
+    
+    @staticmethod
+    def _batch_result(index, item, booking=None, error=None):
+        """Build the result for one cart item"""
+        return {
+            'index': index,
+            'service_id': item.get('service_id'),
+            'success': booking is not None,
+            'booking': booking.to_dict() if booking is not None else None,
+            'error': error
+        }
+    
+    @staticmethod
+    def _batch_results(items, errors, message="Not booked because another item failed"):
+        """Build failure results, with each item's own error where it has one"""
+        return [
+            BookingService._batch_result(index, item, error=errors.get(index, message))
+            for index, item in enumerate(items)
+        ]
+    
+    @staticmethod
+    def _abort_batch(items, message=None, errors=None):
+        """Roll back a batch and return its failure results"""
+        db.session.rollback()
+        if message:
+            return False, BookingService._batch_results(items, {}, message)
+        return False, BookingService._batch_results(items, errors)
+    
     @staticmethod
     def process_payment(booking_id):
         """
@@ -95,53 +319,67 @@ class BookingService:
         3. Updating booking status to CONFIRMED
         4. Distributing funds (90% to provider, 10% to admin)
         
+        Everything happens in one transaction: the wallets involved are
+        resolved in a single query, balances change through in-database
+        arithmetic applied in wallet ID order, and the booking leaves
+        PENDING only once. Commission goes to a sharded sub-account rather
+        than the admin wallet row, so payments do not queue on it. The
+        money movement is recorded as one balanced ledger entry.
+        
         Returns a tuple (success, message)
         """
-        booking = Booking.query.get(booking_id)
-        if not booking:
+        result = BookingService._get_booking_with_service(booking_id)
+        if not result:
             return False, "Booking not found"
+        booking, service = result
         
         if booking.status != BookingStatus.PENDING:
             return False, f"Booking is already {booking.status}"
         
         try:
-            # Get user and check wallet balance
-            user = User.query.get(booking.user_id)
-            if not user:
-                return False, "User not found"
+            wallet_repository = WalletRepository()
+            wallets, admin_wallet = wallet_repository.find_settlement_wallets(
+                [booking.user_id, service.provider_id]
+            )
             
-            user_wallet = Wallet.query.filter_by(user_id=user.id).first()
+            user_wallet = wallets.get(booking.user_id)
             if not user_wallet:
-                return False, "User wallet not found"
-            
-            if not user_wallet.has_sufficient_funds(booking.amount):
-                return False, "Insufficient funds in wallet"
-            
-            # Get service and provider
-            service = Service.query.get(booking.service_id)
-            if not service:
-                return False, "Service not found"
+                return BookingService._abort("User wallet not found")
             
-            provider = User.query.get(service.provider_id)
-            if not provider:
-                return False, "Service provider not found"
-            
-            provider_wallet = Wallet.query.filter_by(user_id=provider.id).first()
+            provider_wallet = wallets.get(service.provider_id)
             if not provider_wallet:
-                return False, "Provider wallet not found"
-            
-            # Get admin wallet
-            admin = User.query.filter_by(role=UserRole.ADMIN).first()
-            if not admin:
-                return False, "Admin user not found"
+                return BookingService._abort("Provider wallet not found")
             
-            admin_wallet = Wallet.query.filter_by(user_id=admin.id).first()
             if not admin_wallet:
-                return False, "Admin wallet not found"
+                return BookingService._abort("Admin wallet not found")
+            
+            # Only one concurrent request can move the booking out of PENDING
+            success, message = BookingStateMachine.transition(booking, 'confirm', paid=True)
+            if not success:
+                return BookingService._abort(
+                    "Booking is already being processed" if message == CONFLICT_MESSAGE else message
+                )
+            
+            # Pool seats held at checkout must still be held to be paid for
+            if service.service_type in (ServiceType.CAR_POOL, ServiceType.BIKE_POOL):
+                if CarPoolRepository().convert_hold(booking.id) is False:
+                    return BookingService._abort("Seat hold has expired, please book again")
             
             # Calculate commission (10% to admin)
-            admin_commission = booking.amount * 0.1
-            provider_amount = booking.amount - admin_commission
+            admin_commission, provider_amount = BookingService._split_commission(booking.amount)
+            
+            # Update wallet balances
+            if not wallet_repository.apply_balance_changes([
+                (user_wallet.id, -Decimal(booking.amount)),
+                (provider_wallet.id, provider_amount)
+            ]):
+                return BookingService._abort("Insufficient funds in wallet")
+            shard_id = CommissionRepository().book(booking.id, admin_commission)
+            LedgerRepository().post(JournalEntryType.PAYMENT, [
+                (LedgerAccountType.WALLET, user_wallet.id, -Decimal(booking.amount)),
+                (LedgerAccountType.WALLET, provider_wallet.id, provider_amount),
+                (LedgerAccountType.COMMISSION, shard_id, admin_commission)
+            ], reference_id=booking.id, description=f"Payment for {service.name}")
             
             # Create transaction record for user payment
             user_transaction = Transaction(
@@ -173,13 +411,8 @@ class BookingService:
             )
             db.session.add(admin_transaction)
             
-            # Update wallet balances
-            user_wallet.withdraw(booking.amount)
-            provider_wallet.deposit(provider_amount)
-            admin_wallet.deposit(admin_commission)
-            
-            # Update booking
-            booking.status = BookingStatus.CONFIRMED
+            # Link the booking to the user's payment
+            db.session.flush()
             booking.transaction_id = user_transaction.id
             
             db.session.commit()
@@ -203,26 +436,67 @@ class BookingService:
         1. Updating booking status to CANCELLED
         2. Refunding user (if payment was processed)
         
+        The refund reverses the payment's balance changes in one
+        transaction, updating wallets in the same order as process_payment.
+        If the booking changes while it is being cancelled (e.g. it is paid
+        for), the cancellation is retried against its new state.
+        
         Returns a tuple (success, message)
         """
-        booking = Booking.query.get(booking_id)
-        if not booking:
+        for attempt in range(MAX_TRANSITION_ATTEMPTS):
+            success, message = BookingService._cancel_booking(booking_id, reload=attempt > 0)
+            if message != CONFLICT_MESSAGE:
+                break
+        return success, message
+    
+    @staticmethod
+    def _cancel_booking(booking_id, reload=False):
+        """Make one attempt at cancel_booking; returns (success, message)"""
+        result = BookingService._get_booking_with_service(booking_id, reload)
+        if not result:
             return False, "Booking not found"
+        booking, service = result
         
-        if booking.status not in [BookingStatus.PENDING, BookingStatus.CONFIRMED]:
+        if not booking.can('cancel'):
             return False, f"Cannot cancel booking with status {booking.status}"
         
         try:
-            # Update booking status
-            old_status = booking.status
-            booking.status = BookingStatus.CANCELLED
+            needs_refund = booking.status == BookingStatus.CONFIRMED and booking.transaction_id
             
-            # If payment was processed, issue refund
-            if old_status == BookingStatus.CONFIRMED and booking.transaction_id:
-                # Get user wallet
-                user_wallet = Wallet.query.filter_by(user_id=booking.user_id).first()
+            if needs_refund:
+                wallet_repository = WalletRepository()
+                wallets, admin_wallet = wallet_repository.find_settlement_wallets(
+                    [booking.user_id, service.provider_id]
+                )
+                user_wallet = wallets.get(booking.user_id)
+                provider_wallet = wallets.get(service.provider_id)
                 if not user_wallet:
-                    return False, "User wallet not found"
+                    return BookingService._abort("User wallet not found")
+                if not provider_wallet or not admin_wallet:
+                    return BookingService._abort("Provider or admin wallet not found")
+            
+            # Update booking status; the hooks return pool seats to the ride
+            success, message = BookingStateMachine.transition(booking, 'cancel', refunded=bool(needs_refund))
+            if not success:
+                return BookingService._abort(message)
+            
+            # If payment was processed, issue refund
+            if needs_refund:
+                # Calculate amounts
+                admin_commission, provider_amount = BookingService._split_commission(booking.amount)
+                
+                # Deduct from provider wallet and commission, then refund the user
+                if not wallet_repository.apply_balance_changes([
+                    (provider_wallet.id, -provider_amount),
+                    (user_wallet.id, Decimal(booking.amount))
+                ]):
+                    return BookingService._abort("Provider wallet has insufficient funds for refund")
+                shard_id = CommissionRepository().book(booking.id, -admin_commission)
+                LedgerRepository().post(JournalEntryType.REFUND, [
+                    (LedgerAccountType.WALLET, provider_wallet.id, -provider_amount),
+                    (LedgerAccountType.COMMISSION, shard_id, -admin_commission),
+                    (LedgerAccountType.WALLET, user_wallet.id, Decimal(booking.amount))
+                ], reference_id=booking.id, description=f"Refund for cancelled booking #{booking.id}")
                 
                 # Create refund transaction
                 refund_transaction = Transaction(
@@ -234,26 +508,6 @@ class BookingService:
                 )
                 db.session.add(refund_transaction)
                 
-                # Update user wallet
-                user_wallet.deposit(booking.amount)
-                
-                # Get service and provider
-                service = Service.query.get(booking.service_id)
-                provider = User.query.get(service.provider_id)
-                provider_wallet = Wallet.query.filter_by(user_id=provider.id).first()
-                
-                # Get admin wallet
-                admin = User.query.filter_by(role=UserRole.ADMIN).first()
-                admin_wallet = Wallet.query.filter_by(user_id=admin.id).first()
-                
-                # Calculate amounts
-                admin_commission = booking.amount * 0.1
-                provider_amount = booking.amount - admin_commission
-                
-                # Deduct from provider and admin wallets
-                provider_wallet.withdraw(provider_amount)
-                admin_wallet.withdraw(admin_commission)
-                
                 # Create provider and admin transaction records
                 provider_refund = Transaction(
                     wallet_id=provider_wallet.id,
@@ -286,59 +540,206 @@ class BookingService:
             return False, f"Error: {str(e)}"
     
     @staticmethod
-    def complete_booking(booking_id):
-        """Mark a booking as completed"""
-        booking = Booking.query.get(booking_id)
-        if not booking:
-            return False, "Booking not found"
+    def _get_booking_with_service(booking_id, reload=False):
+        """
+        Load a booking and its service in one query; returns (booking, service) or None
         
-        if booking.status != BookingStatus.CONFIRMED:
-            return False, f"Cannot complete booking with status {booking.status}"
+        Pass reload=True to overwrite a copy of the booking already in the session.
+        """
+        query = db.session.query(Booking, Service).join(
+            Service, Service.id == Booking.service_id
+        ).filter(Booking.id == booking_id)
+        if reload:
+            query = query.populate_existing()
+        return query.first()
+    
+    @staticmethod
+    def _record_transition(action, bookings, from_status, details):
+        """Transition hook: record the status change in the outbox"""
+        BookingService._record_events(BOOKING_TRANSITIONS[action][1], bookings, from_status, **details)
+    
+    @staticmethod
+    def _record_events(to_status, bookings, from_status, **details):
+        """
+        Record a status change event for each booking in the outbox
+        (in the caller's transaction, so events commit with the change)
         
-        try:
-            booking.status = BookingStatus.COMPLETED
-            db.session.commit()
-            return True, "Booking marked as completed"
-            
-        except SQLAlchemyError as e:
-            db.session.rollback()
-            return False, f"Database error: {str(e)}"
+        Args:
+            to_status: Status the bookings moved to
+            bookings: Bookings or rows with id, user_id, service_id and amount
+            from_status: Status the bookings moved from (None for new bookings)
+            details: Extra payload fields (e.g. reason)
+        """
+        OutboxRepository().add_many([
+            ('booking', booking.id, STATUS_EVENTS[to_status], {
+                'booking_id': booking.id,
+                'user_id': booking.user_id,
+                'service_id': booking.service_id,
+                'amount': booking.amount,
+                'from_status': from_status,
+                'status': to_status,
+                **details
+            })
+            for booking in bookings
+        ])
     
     @staticmethod
-    def confirm_booking(booking_id):
-        """Confirm a booking (service provider only)"""
-        booking = Booking.query.get(booking_id)
-        if not booking:
-            return False, "Booking not found"
+    def _split_commission(amount):
+        """Split a booking amount into (admin commission, provider amount)"""
+        amount = Decimal(amount)
+        admin_commission = (amount * COMMISSION_RATE).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        return admin_commission, amount - admin_commission
+    
+    @staticmethod
+    def _abort(message):
+        """Roll back the current transaction and return a failure result"""
+        db.session.rollback()
+        return False, message
+    
+    @staticmethod
+    def bulk_update_status(booking_ids, action, provider_id, is_admin=False, reason=None):
+        """
+        Confirm, reject or complete many bookings with one set-based UPDATE
         
-        if booking.status != BookingStatus.PENDING:
-            return False, f"Cannot confirm booking with status {booking.status}"
+        The UPDATE is guarded by the current status and, for providers, by
+        ownership of the booked service, so only bookings the caller may
+        move are changed. The bookings that were not changed are then
+        looked up together to explain why.
+        
+        Args:
+            booking_ids: IDs of the bookings to update
+            action: 'confirm', 'reject' or 'complete'
+            provider_id: ID of the provider making the change
+            is_admin: Whether the caller may act on any provider's bookings
+            reason: Rejection reason stored in the booking notes (optional)
+            
+        Returns a tuple (success, message or list of per-booking results)
+        """
+        if action not in BULK_ACTIONS:
+            return False, f"Unknown action: {action}"
+        booking_ids = list(dict.fromkeys(booking_ids))
+        if not booking_ids:
+            return False, "booking_ids must not be empty"
+        if len(booking_ids) > MAX_BULK_IDS:
+            return False, f"At most {MAX_BULK_IDS} bookings can be updated at once"
+        
+        to_status = BOOKING_TRANSITIONS[action][1]
         
         try:
-            booking.status = BookingStatus.CONFIRMED
+            conditions = [Booking.id.in_(booking_ids)]
+            if not is_admin:
+                conditions.append(Booking.service_id.in_(
+                    select(Service.id).where(Service.provider_id == provider_id)
+                ))
+            values, details = {}, {}
+            if action == 'reject' and reason:
+                values['notes'] = reason
+                details['reason'] = reason
+            
+            changed = BookingStateMachine.transition_many(conditions, action, values, **details)
             db.session.commit()
-            return True, "Booking confirmed"
             
         except SQLAlchemyError as e:
             db.session.rollback()
+            current_app.logger.error(f"Error updating bookings: {str(e)}")
             return False, f"Database error: {str(e)}"
+        
+        changed_ids = {row.id for row in changed}
+        unchanged_ids = [booking_id for booking_id in booking_ids if booking_id not in changed_ids]
+        current = {}
+        if unchanged_ids:
+            rows = db.session.query(Booking.id, Booking.status, Service.provider_id).join(
+                Service, Service.id == Booking.service_id
+            ).filter(Booking.id.in_(unchanged_ids)).all()
+            current = {row.id: row for row in rows}
+        
+        results = []
+        for booking_id in booking_ids:
+            if booking_id in changed_ids:
+                results.append({'booking_id': booking_id, 'success': True, 'status': to_status, 'error': None})
+                continue
+            row = current.get(booking_id)
+            if not row:
+                error, status = "Booking not found", None
+            elif not is_admin and row.provider_id != provider_id:
+                error, status = "Not your service", None
+            else:
+                error, status = f"Cannot {action} booking with status {row.status}", row.status
+            results.append({'booking_id': booking_id, 'success': False, 'status': status, 'error': error})
+        return True, results
+    
+    @staticmethod
+    def _settle_pool_seats(action, bookings, from_status=None, details=None):
+        """
+        Transition hook: convert the seat holds of confirmed pool bookings, or
+        return the seats of rejected and cancelled ones to the ride and offer
+        them to the waitlist
+        """
+        if action == 'complete' or not bookings:
+            return
+        # A paid booking's hold was already converted, with an expiry check, by process_payment
+        if action == 'confirm' and details and details.get('paid'):
+            return
+        
+        pool_service_ids = {
+            service_id for (service_id,) in db.session.query(Service.id).filter(
+                Service.id.in_({booking.service_id for booking in bookings}),
+                Service.service_type.in_([ServiceType.CAR_POOL, ServiceType.BIKE_POOL])
+            )
+        }
+        pool_bookings = [booking for booking in bookings if booking.service_id in pool_service_ids]
+        if not pool_bookings:
+            return
+        
+        car_pool_repository = CarPoolRepository()
+        if action == 'confirm':
+            car_pool_repository.convert_holds([booking.id for booking in pool_bookings])
+            return
+        
+        for booking in pool_bookings:
+            car_pool_repository.release_booking_seats(booking.service_id, booking.id, booking.quantity or 1)
+        for service_id in sorted(pool_service_ids):
+            car_pool_repository.promote_waitlist(service_id)
+    
+    @staticmethod
+    def complete_booking(booking_id):
+        """Mark a booking as completed"""
+        return BookingService._apply_transition(booking_id, 'complete', "Booking marked as completed")
+    
+    @staticmethod
+    def confirm_booking(booking_id):
+        """Confirm a booking (service provider only)"""
+        return BookingService._apply_transition(booking_id, 'confirm', "Booking confirmed")
     
     @staticmethod
     def reject_booking(booking_id, reason=None):
         """Reject a booking (service provider only)"""
-        booking = Booking.query.get(booking_id)
-        if not booking:
-            return False, "Booking not found"
-        
-        if booking.status != BookingStatus.PENDING:
-            return False, f"Cannot reject booking with status {booking.status}"
+        if reason:
+            return BookingService._apply_transition(
+                booking_id, 'reject', "Booking rejected", values={'notes': reason}, reason=reason
+            )
+        return BookingService._apply_transition(booking_id, 'reject', "Booking rejected")
+    
+    @staticmethod
+    def _apply_transition(booking_id, action, success_message, values=None, **details):
+        """
+        Apply a single status transition and commit, retrying if another
+        request changes the booking at the same time
         
+        Returns a tuple (success, message)
+        """
         try:
-            booking.status = BookingStatus.REJECTED
-            booking.notes = reason if reason else booking.notes
+            success, message, _ = BookingStateMachine.transition_by_id(booking_id, action, values, **details)
+            if not success:
+                return BookingService._abort(message)
             db.session.commit()
-            return True, "Booking rejected"
+            return True, success_message
             
         except SQLAlchemyError as e:
             db.session.rollback()
-            return False, f"Database error: {str(e)}"
\ No newline at end of file
+            current_app.logger.error(f"Error updating booking: {str(e)}")
+            return False, f"Database error: {str(e)}"
+
+# Side effects of every status change, run in the transition's transaction
+on_transition('confirm', 'reject', 'cancel')(BookingService._settle_pool_seats)
+on_transition()(BookingService._record_transition)
\ No newline at end of file
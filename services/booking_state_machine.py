@@ -0,0 +1,150 @@
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.orm.attributes import set_committed_value
+from models.booking import Booking, BOOKING_TRANSITIONS
+from app import db
+
+# Returned when another request changed the booking first; the caller may retry
+CONFLICT_MESSAGE = "Booking was changed by another request, please try again"
+
+# Attempts made by transition_by_id before giving up on a busy booking
+MAX_TRANSITION_ATTEMPTS = 3
+
+# Hooks by action; '*' runs for every action
+_hooks = defaultdict(list)
+
+def on_transition(*actions):
+    """
+    Register the decorated function as a hook for the given actions
+    
+    Hooks are called as hook(action, bookings, from_status, details) after
+    the status change is written and before the caller commits, so their
+    writes share the transition's transaction. `bookings` are Booking
+    objects or rows with id, user_id, service_id, quantity and amount.
+    """
+    def decorator(hook):
+        for action in actions or ('*',):
+            if hook not in _hooks[action]:
+                _hooks[action].append(hook)
+        return hook
+    return decorator
+
+class BookingStateMachine:
+    @staticmethod
+    def transition(booking, action, values=None, **details):
+        """
+        Move a loaded booking through a transition with a compare-and-set UPDATE
+        
+        The UPDATE matches the booking's ID and the version it was read at,
+        so of two requests that read the same version only one succeeds.
+        No row lock is taken. The loaded object is updated in place, so it
+        does not need to be read again. Does not commit; on failure the
+        caller should roll back.
+        
+        Args:
+            booking: Booking object
+            action: 'confirm', 'reject', 'complete' or 'cancel'
+            values: Other columns to set in the same UPDATE (optional)
+            details: Extra context passed to the hooks (e.g. reason)
+        
+        Returns a tuple (success, message). The message is CONFLICT_MESSAGE
+        when the booking changed since it was read.
+        """
+        if action not in BOOKING_TRANSITIONS:
+            return False, f"Unknown action: {action}"
+        if not booking.can(action):
+            return False, f"Cannot {action} booking with status {booking.status}"
+        
+        from_status = booking.status
+        to_status = BOOKING_TRANSITIONS[action][1]
+        values = dict(values or {}, status=to_status, updated_at=datetime.utcnow())
+        
+        result = db.session.execute(
+            update(Booking).where(Booking.id == booking.id, Booking.version == booking.version)
+            .values(version=Booking.version + 1, **values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            return False, CONFLICT_MESSAGE
+        
+        for key, value in values.items():
+            set_committed_value(booking, key, value)
+        set_committed_value(booking, 'version', booking.version + 1)
+        
+        BookingStateMachine._run_hooks(action, [booking], from_status, details)
+        return True, None
+    
+    @staticmethod
+    def transition_by_id(booking_id, action, values=None, attempts=MAX_TRANSITION_ATTEMPTS, **details):
+        """
+        Apply a transition, re-reading the booking and retrying on conflict
+        
+        A booking already loaded in the session is used without a query.
+        
+        Returns a tuple (success, message, booking)
+        """
+        booking = None
+        message = "Booking not found"
+        for attempt in range(attempts):
+            booking = db.session.get(Booking, booking_id, populate_existing=attempt > 0)
+            if not booking:
+                return False, "Booking not found", None
+            
+            success, message = BookingStateMachine.transition(booking, action, values, **details)
+            if success or message != CONFLICT_MESSAGE:
+                return success, message, booking
+        return False, message, booking
+    
+    @staticmethod
+    def transition_many(conditions, action, values=None, from_status=None, **details):
+        """
+        Apply one transition to every booking matching the conditions with a
+        single set-based UPDATE
+        
+        The UPDATE is guarded by the status the action starts from and bumps
+        each row's version, so it cannot interleave with a single-booking
+        transition. Does not commit.
+        
+        Args:
+            conditions: SQLAlchemy filter expressions selecting the bookings
+            action: 'confirm', 'reject', 'complete' or 'cancel'
+            values: Other columns to set in the same UPDATE (optional)
+            from_status: Starting status to apply the action from; required
+                for actions allowed from more than one status (e.g. cancel)
+            details: Extra context passed to the hooks
+        
+        Returns:
+            List of rows (id, user_id, service_id, quantity, amount) that changed
+        """
+        from_statuses, to_status = BOOKING_TRANSITIONS[action]
+        if from_status is None:
+            if len(from_statuses) != 1:
+                raise ValueError(f"Cannot apply {action} in bulk without a starting status")
+            from_status = from_statuses[0]
+        elif from_status not in from_statuses:
+            raise ValueError(f"Cannot {action} bookings with status {from_status}")
+        
+        conditions = [*conditions, Booking.status == from_status]
+        values = dict(values or {}, status=to_status, updated_at=datetime.utcnow())
+        statement = update(Booking).where(*conditions).values(
+            version=Booking.version + 1, **values
+        ).execution_options(synchronize_session=False)
+        columns = (Booking.id, Booking.user_id, Booking.service_id, Booking.quantity, Booking.amount)
+        
+        if db.session.get_bind().dialect.update_returning:
+            changed = db.session.execute(statement.returning(*columns)).all()
+        else:
+            changed = db.session.query(*columns).filter(*conditions).with_for_update().all()
+            db.session.execute(statement)
+        
+        BookingStateMachine._run_hooks(action, changed, from_status, details)
+        return changed
+    
+    @staticmethod
+    def _run_hooks(action, bookings, from_status, details):
+        """Call the hooks registered for an action, then the catch-all hooks"""
+        if not bookings:
+            return
+        for hook in _hooks[action] + _hooks['*']:
+            hook(action, bookings, from_status, details)
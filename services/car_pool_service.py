@@ -1,9 +1,12 @@
 from datetime import datetime
 from models.car_pool import CarPoolService as CarPoolServiceModel, BikePoolService as BikePoolServiceModel
 from models.booking import Booking
-from models.enum_types import ServiceType, BookingStatus, VehicleType
+from models.waitlist import WaitlistEntry
+from models.enum_types import ServiceType, VehicleType
 from repositories.car_pool_repository import CarPoolRepository
 from repositories.booking_repository import BookingRepository
+from repositories.waitlist_repository import WaitlistRepository
+from services.booking_service import BookingService
 from services.wallet_service import WalletService
 from app import db
 
@@ -11,9 +14,11 @@ class CarPoolService:
     def __init__(self):
         self.car_pool_repository = CarPoolRepository()
         self.booking_repository = BookingRepository()
+        self.waitlist_repository = WaitlistRepository()
         self.wallet_service = WalletService()
     
-    def get_car_pool_services(self, vehicle_type=None, source=None, destination=None, date=None):
+    def get_car_pool_services(self, vehicle_type=None, source=None, destination=None, date=None,
+                              include_full=False):
         """
         Get car/bike pool services, optionally filtered
         
@@ -22,6 +27,7 @@ class CarPoolService:
             source: Filter by source location (optional)
             destination: Filter by destination (optional)
             date: Filter by departure date (optional)
+            include_full: Also return fully booked rides (optional)
             
         Returns:
             List of car/bike pool service objects
@@ -30,7 +36,8 @@ class CarPoolService:
             vehicle_type=vehicle_type,
             source=source,
             destination=destination,
-            date=date
+            date=date,
+            include_full=include_full
         )
     
     def create_car_pool_service(self, name, description, provider_id, vehicle_type, price,
@@ -166,6 +173,11 @@ class CarPoolService:
             seats_difference = new_total_seats - service.total_seats
             service.total_seats = new_total_seats
             service.available_seats += seats_difference
+            
+            # Offer any added seats to the waitlist
+            if seats_difference > 0:
+                db.session.flush()
+                self.car_pool_repository.promote_waitlist(service.id)
         
         # Save updated service
         return self.car_pool_repository.update(service)
@@ -194,51 +206,36 @@ class CarPoolService:
         if not service:
             raise ValueError(f"Car pool service with ID {service_id} not found")
         
-        # Check if enough seats are available
-        if service.available_seats < num_seats:
-            raise ValueError(f"Not enough seats available. Requested: {num_seats}, Available: {service.available_seats}")
-        
         # Calculate total price
-        total_price = float(service.price) * num_seats
-        
-        # Verify wallet has sufficient funds
-        wallet = self.wallet_service.get_wallet_by_user_id(user_id)
-        if not wallet or not wallet.has_sufficient_funds(total_price):
-            raise ValueError("Insufficient funds in wallet")
+        total_price = service.price * num_seats
         
         try:
-            # Process payment
-            payment_success = self.wallet_service.transfer_payment(
-                from_user_id=user_id,
-                to_user_id=service.provider_id,
-                amount=total_price,
-                reference_id=f"car_pool_booking_{user_id}_{service_id}_{datetime.utcnow().timestamp()}"
-            )
-            
-            if not payment_success:
-                raise ValueError("Payment processing failed")
-            
-            # Book seats
-            service.book_seat(num_seats)
-            self.car_pool_repository.update(service)
-            
-            # Create booking
+            # Create the booking and hold its seats; the conditional update cannot oversell
             booking = Booking(
                 user_id=user_id,
                 service_id=service_id,
                 booking_time=service.departure_time,
-                amount=total_price
+                amount=total_price,
+                quantity=num_seats
             )
+            db.session.add(booking)
+            db.session.flush()
             
-            # Additional data for car pool bookings
-            booking.additional_data = f"Seats: {num_seats}"
-            
-            # Save booking
-            return self.booking_repository.create(booking)
+            if not self.car_pool_repository.place_hold(service_id, user_id, num_seats, booking.id):
+                raise ValueError(f"Not enough seats available. Requested: {num_seats}, Available: {service.available_seats}")
+            db.session.commit()
             
         except Exception as e:
             db.session.rollback()
             raise e
+        
+        # Paying converts the hold into booked seats
+        success, message = BookingService.process_payment(booking.id)
+        if not success:
+            BookingService.cancel_booking(booking.id)
+            raise ValueError(message)
+        
+        return self.booking_repository.find_by_id(booking.id)
     
     def cancel_car_pool_booking(self, booking_id, user_id):
         """
@@ -264,41 +261,78 @@ class CarPoolService:
             raise ValueError("Not authorized to cancel this booking")
         
         # Check if booking can be cancelled
-        if booking.status not in [BookingStatus.PENDING, BookingStatus.CONFIRMED]:
+        if not booking.can('cancel'):
             raise ValueError(f"Booking with status {booking.status} cannot be cancelled")
         
-        # Get service
-        service = self.car_pool_repository.find_by_id(booking.service_id)
-        if not service:
-            raise ValueError(f"Car pool service with ID {booking.service_id} not found")
+        # Refunds the payment and returns the seats (or the hold) to the ride
+        success, message = BookingService.cancel_booking(booking_id)
+        if not success:
+            raise ValueError(message)
         
-        try:
-            # Process refund
-            self.wallet_service.refund_payment(
-                user_id=user_id,
-                amount=float(booking.amount),
-                reference_id=str(booking_id),
-                description=f"Refund for cancelled car pool booking #{booking_id}"
-            )
-            
-            # Extract number of seats from additional_data
-            num_seats = 1  # Default
-            if booking.additional_data and "Seats:" in booking.additional_data:
-                try:
-                    num_seats = int(booking.additional_data.split("Seats:")[1].strip())
-                except:
-                    pass
-            
-            # Release seats
-            service.release_seat(num_seats)
-            self.car_pool_repository.update(service)
-            
-            # Update booking status
-            booking.status = BookingStatus.CANCELLED
+        return self.booking_repository.find_by_id(booking_id)
+    
+    def join_waitlist(self, user_id, service_id, num_seats=1, priority=0):
+        """
+        Queue a user for seats on a fully booked ride
+        
+        When seats free up, waiting users are given PENDING bookings with
+        a seat hold and a notification, so nobody has to poll the ride.
+        
+        Args:
+            user_id: ID of the user joining the waitlist
+            service_id: ID of the car/bike pool service
+            num_seats: Number of seats wanted
+            priority: Queue priority; higher is promoted first (default 0)
             
-            # Save updated booking
-            return self.booking_repository.update(booking)
+        Returns:
+            Waitlist entry object
             
-        except Exception as e:
-            db.session.rollback()
-            raise e
+        Raises:
+            ValueError: If the ride cannot be waitlisted
+        """
+        if num_seats <= 0:
+            raise ValueError("Number of seats must be positive")
+        
+        service = self.car_pool_repository.find_by_id(service_id)
+        if not service:
+            raise ValueError(f"Car pool service with ID {service_id} not found")
+        
+        if service.departure_time <= datetime.utcnow():
+            raise ValueError("This ride has already departed")
+        
+        if num_seats > service.total_seats:
+            raise ValueError(f"This ride only has {service.total_seats} seats")
+        
+        if service.available_seats >= num_seats:
+            raise ValueError("Seats are available; book the ride instead")
+        
+        if self.waitlist_repository.find_waiting(service_id, user_id):
+            raise ValueError("You are already on the waitlist for this ride")
+        
+        entry = self.waitlist_repository.create(WaitlistEntry(
+            service_id=service_id,
+            user_id=user_id,
+            seats=num_seats,
+            priority=priority
+        ))
+        
+        # Seats may have been freed since they were checked
+        self.car_pool_repository.promote_waitlist(service_id)
+        db.session.commit()
+        return entry
+    
+    def leave_waitlist(self, user_id, service_id):
+        """
+        Take a user off a ride's waitlist
+        
+        Raises:
+            ValueError: If the user is not waiting for the ride
+        """
+        if not self.waitlist_repository.cancel(service_id, user_id):
+            raise ValueError("You are not on the waitlist for this ride")
+    
+    def get_user_waitlist(self, user_id, cursor=None, limit=None):
+        """
+        Get a page of a user's waitlist entries, newest first
+        """
+        return self.waitlist_repository.find_by_user_id(user_id, cursor, limit)
\ No newline at end of file
@@ -0,0 +1,24 @@
+"""
+Outbox event handlers
+
+Importing this module registers the handlers with the outbox dispatcher.
+"""
+from models.enum_types import OutboxEventType
+from repositories.notification_repository import NotificationRepository
+from services.outbox_service import subscribe
+
+BOOKING_MESSAGES = {
+    OutboxEventType.BOOKING_CONFIRMED: "Your booking #{booking_id} has been confirmed",
+    OutboxEventType.BOOKING_REJECTED: "Your booking #{booking_id} has been rejected",
+    OutboxEventType.BOOKING_COMPLETED: "Your booking #{booking_id} has been completed",
+    OutboxEventType.BOOKING_CANCELLED: "Your booking #{booking_id} has been cancelled"
+}
+
+@subscribe(*BOOKING_MESSAGES)
+def notify_booking_status(event):
+    """Tell the user who made a booking that its status changed"""
+    data = event.data
+    message = BOOKING_MESSAGES[event.event_type].format(booking_id=data['booking_id'])
+    if data.get('reason'):
+        message = f"{message}: {data['reason']}"
+    NotificationRepository().add_many([(data['user_id'], message[:255], data['booking_id'])])
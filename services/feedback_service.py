@@ -1,6 +1,7 @@
 from models.feedback import Feedback
 from models.service import Service
 from repositories.feedback_repository import FeedbackRepository
+from repositories.rating_repository import RatingRepository
 from repositories.service_repository import ServiceRepository
 from repositories.user_repository import UserRepository
 from app import db
@@ -8,6 +9,7 @@ from app import db
 class FeedbackService:
     def __init__(self):
         self.feedback_repository = FeedbackRepository()
+        self.rating_repository = RatingRepository()
         self.service_repository = ServiceRepository()
         self.user_repository = UserRepository()
     
@@ -54,22 +56,27 @@ class FeedbackService:
                 review=review
             )
             
-            # Save feedback
-            return self.feedback_repository.create(feedback)
+            # Save feedback and its rating totals in one transaction
+            db.session.add(feedback)
+            self.rating_repository.apply(service_id, provider_id, added=rating)
+            db.session.commit()
+            return feedback
             
         except Exception as e:
             db.session.rollback()
             raise e
     
-    def get_service_feedback(self, service_id):
+    def get_service_feedback(self, service_id, cursor=None, limit=None):
         """
         Get feedback for a specific service
         
         Args:
             service_id: ID of the service
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of feedback objects
+            Page of feedback objects
             
         Raises:
             ValueError: If service not found
@@ -79,17 +86,19 @@ class FeedbackService:
         if not service:
             raise ValueError(f"Service with ID {service_id} not found")
         
-        return self.feedback_repository.find_by_service_id(service_id)
+        return self.feedback_repository.find_by_service_id(service_id, cursor=cursor, limit=limit)
     
-    def get_provider_feedback(self, provider_id):
+    def get_provider_feedback(self, provider_id, cursor=None, limit=None):
         """
         Get feedback for a specific service provider
         
         Args:
             provider_id: ID of the service provider
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of feedback objects
+            Page of feedback objects
             
         Raises:
             ValueError: If provider not found
@@ -99,19 +108,21 @@ class FeedbackService:
         if not provider:
             raise ValueError(f"Provider with ID {provider_id} not found")
         
-        return self.feedback_repository.find_by_provider_id(provider_id)
+        return self.feedback_repository.find_by_provider_id(provider_id, cursor=cursor, limit=limit)
     
-    def get_user_feedback(self, user_id):
+    def get_user_feedback(self, user_id, cursor=None, limit=None):
         """
         Get feedback given by a specific user
         
         Args:
             user_id: ID of the user
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of feedback objects
+            Page of feedback objects
         """
-        return self.feedback_repository.find_by_user_id(user_id)
+        return self.feedback_repository.find_by_user_id(user_id, cursor=cursor, limit=limit)
     
     def update_feedback(self, feedback_id, user_id, rating=None, review=None):
         """
@@ -138,18 +149,28 @@ class FeedbackService:
         if feedback.user_id != user_id:
             raise ValueError("Not authorized to update this feedback")
         
-        # Update fields
-        if rating is not None:
-            # Validate rating
-            if rating < 1 or rating > 5:
-                raise ValueError("Rating must be between 1 and 5")
-            feedback.rating = rating
-        
-        if review is not None:
-            feedback.review = review
+        # Validate rating
+        if rating is not None and (rating < 1 or rating > 5):
+            raise ValueError("Rating must be between 1 and 5")
         
-        # Save updated feedback
-        return self.feedback_repository.update(feedback)
+        try:
+            # Update fields
+            if rating is not None and rating != feedback.rating:
+                self.rating_repository.apply(
+                    feedback.service_id, feedback.provider_id, added=rating, removed=feedback.rating
+                )
+                feedback.rating = rating
+            
+            if review is not None:
+                feedback.review = review
+            
+            # Save updated feedback
+            db.session.commit()
+            return feedback
+            
+        except Exception as e:
+            db.session.rollback()
+            raise e
     
     def delete_feedback(self, feedback_id, user_id, role):
         """
@@ -175,6 +196,13 @@ class FeedbackService:
         if feedback.user_id != user_id and role != 'ADMIN':
             raise ValueError("Not authorized to delete this feedback")
         
-        # Delete feedback
-        self.feedback_repository.delete(feedback)
-        return True
+        try:
+            # Delete feedback and remove it from the rating totals
+            self.rating_repository.apply(feedback.service_id, feedback.provider_id, removed=feedback.rating)
+            db.session.delete(feedback)
+            db.session.commit()
+            return True
+            
+        except Exception as e:
+            db.session.rollback()
+            raise e
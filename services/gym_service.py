@@ -11,7 +11,8 @@ class GymService:
         self.gym_repository = GymRepository()
         self.wallet_service = WalletService()
     
-    def get_gym_services(self, facility_type=None, trainers_available=None, dietician_available=None):
+    def get_gym_services(self, facility_type=None, trainers_available=None, dietician_available=None,
+                         cursor=None, limit=None):
         """
         Get gym services, optionally filtered
         
@@ -19,14 +20,18 @@ class GymService:
             facility_type: Filter by facility type (optional)
             trainers_available: Filter by trainer availability (optional)
             dietician_available: Filter by dietician availability (optional)
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of gym service objects
+            Page of gym service objects
         """
         return self.gym_repository.find_all(
             facility_type=facility_type,
             trainers_available=trainers_available,
-            dietician_available=dietician_available
+            dietician_available=dietician_available,
+            cursor=cursor,
+            limit=limit
         )
     
     def create_gym_service(self, name, description, provider_id, gym_name, facility_types,
@@ -120,7 +125,7 @@ class GymService:
         if 'gym_name' in data:
             service.gym_name = data['gym_name']
         if 'facility_types' in data:
-            service.facility_types = json.dumps(data['facility_types']) if isinstance(data['facility_types'], list) else data['facility_types']
+            service.set_facility_types(data['facility_types'])
         if 'operating_hours' in data:
             service.operating_hours = json.dumps(data['operating_hours']) if isinstance(data['operating_hours'], dict) else data['operating_hours']
         if 'subscription_plans' in data:
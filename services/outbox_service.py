@@ -0,0 +1,86 @@
+from collections import defaultdict
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+from repositories.outbox_repository import OutboxRepository
+from app import db
+
+# Handlers by event type; '*' receives every event
+_handlers = defaultdict(list)
+
+def subscribe(*event_types):
+    """
+    Register the decorated function as a handler for the given event types
+    
+    Handlers are called with the OutboxEvent and may be called more than
+    once for the same event, so they must be idempotent. Database writes
+    made by a handler commit together with the event being marked as
+    delivered.
+    """
+    def decorator(handler):
+        for event_type in event_types or ('*',):
+            OutboxService.register(event_type, handler)
+        return handler
+    return decorator
+
+class OutboxService:
+    @staticmethod
+    def register(event_type, handler):
+        """Register a handler for an event type ('*' for every event)"""
+        if handler not in _handlers[event_type]:
+            _handlers[event_type].append(handler)
+    
+    @staticmethod
+    def get_handlers(event_type):
+        """Get the handlers for an event type in registration order"""
+        return _handlers[event_type] + _handlers['*']
+    
+    @staticmethod
+    def dispatch_batch(batch_size=None):
+        """
+        Deliver a batch of pending events to their handlers in ID order
+        
+        Each event runs in a savepoint, and the batch is marked as delivered
+        with one UPDATE and one commit. If the process stops first, the
+        whole batch is delivered again. When an event fails, later events
+        for the same booking or wallet are held back until it succeeds or
+        is given up on, so each entity's events are seen in order.
+        
+        Returns:
+            Number of events delivered
+        """
+        repository = OutboxRepository()
+        batch_size = batch_size or current_app.config.get('OUTBOX_BATCH_SIZE', 100)
+        max_attempts = current_app.config.get('OUTBOX_MAX_ATTEMPTS', 5)
+        
+        try:
+            events = repository.find_pending(batch_size)
+            delivered = []
+            blocked = set()
+            for event in events:
+                aggregate = (event.aggregate_type, event.aggregate_id)
+                if aggregate in blocked:
+                    continue
+                
+                try:
+                    with db.session.begin_nested():
+                        for handler in OutboxService.get_handlers(event.event_type):
+                            handler(event)
+                    delivered.append(event.id)
+                except Exception as e:
+                    current_app.logger.error(f"Error handling outbox event {event.id} ({event.event_type}): {str(e)}")
+                    if not repository.record_failure(event, e, max_attempts):
+                        blocked.add(aggregate)
+            
+            repository.mark_dispatched(delivered)
+            db.session.commit()
+            return len(delivered)
+        
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error dispatching outbox events: {str(e)}")
+            raise
+    
+    @staticmethod
+    def purge_dispatched():
+        """Delete delivered events older than OUTBOX_RETENTION"""
+        return OutboxRepository().purge_dispatched(current_app.config.get('OUTBOX_RETENTION', 604800))
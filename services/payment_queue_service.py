@@ -0,0 +1,74 @@
+from flask import current_app
+from models.booking import Booking
+from models.payment_job import PaymentJob
+from models.enum_types import BookingStatus
+from repositories.payment_job_repository import PaymentJobRepository
+from services.booking_service import BookingService
+from app import db
+
+class PaymentQueueService:
+    @staticmethod
+    def enqueue_payment(booking_id, user_id):
+        """
+        Queue a booking payment for the payment workers
+        
+        A booking has at most one open job; asking again returns it.
+        
+        Returns a tuple (success, message or job)
+        """
+        booking = Booking.query.get(booking_id)
+        if not booking:
+            return False, "Booking not found"
+        
+        if booking.status != BookingStatus.PENDING:
+            return False, f"Booking is already {booking.status}"
+        
+        repository = PaymentJobRepository()
+        job = repository.find_open_for_booking(booking_id)
+        if job:
+            return True, job
+        
+        return True, repository.create(PaymentJob(booking_id=booking_id, user_id=user_id))
+    
+    @staticmethod
+    def get_job(job_id):
+        """Get a payment job by ID"""
+        return PaymentJobRepository().find_by_id(job_id)
+    
+    @staticmethod
+    def process_batch(worker_id, batch_size=None):
+        """
+        Claim a batch of queued payments and process them in order
+        
+        Each payment still runs in its own transaction, so one failure
+        does not affect the rest of the batch. A job that was retried after
+        its worker stopped is marked succeeded if the payment had already
+        gone through.
+        
+        Returns:
+            Number of jobs processed
+        """
+        repository = PaymentJobRepository()
+        batch_size = batch_size or current_app.config.get('PAYMENT_BATCH_SIZE', 20)
+        jobs = repository.claim_batch(worker_id, batch_size)
+        
+        for job in jobs:
+            try:
+                booking = Booking.query.get(job.booking_id)
+                if job.attempts > 1 and booking and booking.status == BookingStatus.CONFIRMED and booking.transaction_id:
+                    repository.finish(job, True, "Payment processed successfully")
+                    continue
+                
+                success, message = BookingService.process_payment(job.booking_id)
+                repository.finish(job, success, message)
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.error(f"Error processing payment job {job.id}: {str(e)}")
+                repository.finish(job, False, f"Error: {str(e)}")
+        
+        return len(jobs)
+    
+    @staticmethod
+    def requeue_stale_jobs():
+        """Retry jobs whose worker stopped before finishing them"""
+        return PaymentJobRepository().requeue_stale(current_app.config.get('PAYMENT_JOB_TIMEOUT', 300))
@@ -0,0 +1,132 @@
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from models.enum_types import ReconciliationMode, ReconciliationStatus
+from repositories.reconciliation_repository import ReconciliationRepository
+from app import app, db
+
+def _init_worker():
+    """Give a pool process its own database connections instead of the parent's"""
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+def _check_task(task):
+    """Compare balances for one task (first_id, last_id, wallet_ids) in a pool process"""
+    first_id, last_id, wallet_ids = task
+    with app.app_context():
+        try:
+            return ReconciliationRepository().find_mismatches(first_id, last_id, wallet_ids)
+        finally:
+            db.session.remove()
+
+class ReconciliationService:
+    @staticmethod
+    def run(mode=ReconciliationMode.INCREMENTAL, workers=None, range_size=None):
+        """
+        Compare every wallet's stored balance with its ledger balance and
+        record the wallets that drifted
+        
+        A full run splits the wallet IDs into ranges of range_size and
+        checks them in parallel across a pool of processes. An incremental
+        run continues from the last completed run and only checks wallets
+        updated or posted to since it started, plus the wallets that had
+        drifted in it; without one it runs in full.
+        Mismatches are re-checked with the wallet locked before they are
+        reported, so payments in flight are not counted as drift.
+        
+        Args:
+            mode: ReconciliationMode value
+            workers: Number of processes (defaults to RECONCILE_WORKERS; 1 checks in this process)
+            range_size: Wallet IDs per task (defaults to RECONCILE_RANGE_SIZE)
+            
+        Returns:
+            The completed ReconciliationRun
+        """
+        repository = ReconciliationRepository()
+        workers = workers or current_app.config.get('RECONCILE_WORKERS', 4)
+        range_size = range_size or current_app.config.get('RECONCILE_RANGE_SIZE', 5000)
+        
+        checkpoint = repository.find_latest_run(ReconciliationStatus.COMPLETED)
+        if checkpoint is None:
+            mode = ReconciliationMode.FULL
+        run = repository.start_run(
+            mode,
+            checkpoint.id if mode == ReconciliationMode.INCREMENTAL else None,
+            repository.high_water_posting_id()
+        )
+        
+        try:
+            if mode == ReconciliationMode.INCREMENTAL:
+                # Wallets still drifted at the checkpoint are re-checked, so the latest report keeps listing them
+                wallet_ids = sorted(
+                    set(repository.find_changed_wallet_ids(checkpoint.started_at, checkpoint.high_water_posting_id))
+                    | set(repository.find_drifted_wallet_ids(checkpoint.id))
+                )
+                tasks = [
+                    (None, None, wallet_ids[offset:offset + range_size])
+                    for offset in range(0, len(wallet_ids), range_size)
+                ]
+            else:
+                bounds = repository.wallet_id_bounds()
+                tasks = [
+                    (first_id, min(first_id + range_size - 1, bounds[1]), None)
+                    for first_id in range(bounds[0], bounds[1] + 1, range_size)
+                ] if bounds else []
+            
+            checked, mismatches = ReconciliationService._check(tasks, workers)
+            
+            drifts = []
+            for wallet_id, _, _ in mismatches:
+                balances = repository.confirm_mismatch(wallet_id)
+                if balances and balances[0] != balances[1]:
+                    drifts.append((wallet_id, *balances))
+            
+            repository.finish_run(run, checked, drifts)
+        except Exception as e:
+            current_app.logger.error(f"Reconciliation run {run.id} failed: {str(e)}")
+            repository.fail_run(run, e)
+            raise
+        return run
+    
+    @staticmethod
+    def get_checkpoint():
+        """Get the latest completed run, which incremental runs continue from, or None"""
+        return ReconciliationRepository().find_latest_run(ReconciliationStatus.COMPLETED)
+    
+    @staticmethod
+    def get_report(run_id=None, cursor=None, limit=None):
+        """
+        Get a run and a page of the wallets that drifted in it
+        
+        Args:
+            run_id: ID of the run (defaults to the latest run)
+            cursor: Cursor from the previous page of drifts (optional)
+            limit: Page size (optional)
+            
+        Returns:
+            Tuple (run, page of WalletDrift objects), or (None, None) if
+            there is no such run
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        repository = ReconciliationRepository()
+        run = repository.find_run(run_id) if run_id else repository.find_latest_run()
+        if not run:
+            return None, None
+        return run, repository.find_drifts(run.id, cursor, limit)
+    
+    @staticmethod
+    def _check(tasks, workers):
+        """Run the comparison tasks, in parallel when there is more than one"""
+        if workers <= 1 or len(tasks) <= 1:
+            results = [
+                ReconciliationRepository().find_mismatches(first_id, last_id, wallet_ids)
+                for first_id, last_id, wallet_ids in tasks
+            ]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_worker) as pool:
+                results = list(pool.map(_check_task, tasks))
+        
+        checked = sum(count for count, _ in results)
+        mismatches = [mismatch for _, task_mismatches in results for mismatch in task_mismatches]
+        return checked, mismatches
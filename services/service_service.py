@@ -1,7 +1,15 @@
 from flask import current_app
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload, with_polymorphic
 from models.service import Service
+# Subclass mappers must be registered for polymorphic catalog loading
+from models.car_pool import CarPoolService
+from models.gym import GymService
+from models.household import HouseholdService
+from models.mechanical import MechanicalService
 from models.enum_types import ServiceStatus, ServiceType
+from models.user import User
+from repositories.service_repository import ServiceRepository
 from app import db
 
 class ServiceService:
@@ -26,6 +34,47 @@ class ServiceService:
         
         return query.all()
     
+    @staticmethod
+    def get_catalog(service_type=None, status=ServiceStatus.AVAILABLE):
+        """
+        Get services for catalog display in a single query
+        
+        Every subtype table is outer-joined so subclass columns are loaded
+        up front, and the provider is eager-loaded on the same statement.
+        """
+        catalog = with_polymorphic(Service, '*')
+        query = db.session.query(catalog).options(joinedload(catalog.provider))
+        
+        if status:
+            query = query.filter(catalog.status == status)
+        
+        if service_type:
+            query = query.filter(catalog.service_type == service_type)
+        
+        return query.order_by(catalog.id).all()
+    
+    @staticmethod
+    def get_service_with_provider(service_id):
+        """
+        Get a service with its subtype columns and provider in a single query
+        
+        Returns a tuple (service, provider), or None if the service does not exist
+        """
+        service = with_polymorphic(Service, '*')
+        return db.session.query(service, User).join(
+            User, User.id == service.provider_id
+        ).filter(service.id == service_id).first()
+    
+    @staticmethod
+    def search_services(search_term, service_type=None, status=None, cursor=None, limit=None):
+        """
+        Full-text search over service names and descriptions
+        
+        Returns a page of (service, rank, name_highlight, description_highlight)
+        rows, best match first
+        """
+        return ServiceRepository().search(search_term, service_type, status, cursor, limit)
+    
     @staticmethod
     def get_all_services():
         """Get all services (admin)"""
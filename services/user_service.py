@@ -1,22 +1,26 @@
 from models.user import User, UserRole, UserStatus
+from repositories.notification_repository import NotificationRepository
 from repositories.user_repository import UserRepository
 
 class UserService:
     def __init__(self):
         self.user_repository = UserRepository()
+        self.notification_repository = NotificationRepository()
     
-    def get_all_users(self, role=None, status=None):
+    def get_all_users(self, role=None, status=None, cursor=None, limit=None):
         """
         Get all users, optionally filtered by role and/or status
         
         Args:
             role: Filter by role (optional)
             status: Filter by status (optional)
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of user objects
+            Page of user objects
         """
-        return self.user_repository.find_all(role=role, status=status)
+        return self.user_repository.find_all(role=role, status=status, cursor=cursor, limit=limit)
     
     def get_user_by_id(self, user_id):
         """
@@ -30,16 +34,18 @@ class UserService:
         """
         return self.user_repository.find_by_id(user_id)
     
-    def get_service_providers(self, service_type=None, status=None):
+    def get_service_providers(self, service_type=None, status=None, cursor=None, limit=None):
         """
         Get all service providers, optionally filtered by service type and/or status
         
         Args:
             service_type: Filter by service type (optional)
             status: Filter by status (optional)
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
             
         Returns:
-            List of service provider user objects
+            Page of service provider user objects
         """
         # Default status to ACTIVE if not specified
         if status is None:
@@ -47,7 +53,9 @@ class UserService:
             
         return self.user_repository.find_service_providers(
             service_type=service_type, 
-            status=status
+            status=status,
+            cursor=cursor,
+            limit=limit
         )
     
     def approve_service_provider(self, provider_id):
@@ -106,3 +114,26 @@ class UserService:
         
         # Save updated provider
         return self.user_repository.update(provider)
+    
+    def get_notifications(self, user_id, cursor=None, limit=None):
+        """
+        Get a page of a user's notifications, newest first
+        
+        Args:
+            user_id: ID of the user
+            cursor: Cursor from the previous page (optional)
+            limit: Page size (optional)
+            
+        Returns:
+            Page of notification objects
+        """
+        return self.notification_repository.find_by_user_id(user_id, cursor, limit)
+    
+    def mark_notifications_read(self, user_id):
+        """
+        Mark all of a user's notifications as read
+        
+        Returns:
+            Number of notifications marked
+        """
+        return self.notification_repository.mark_all_read(user_id)
@@ -1,49 +1,145 @@
+import json
+from decimal import Decimal, ROUND_HALF_UP
 from flask import current_app
 from sqlalchemy.exc import SQLAlchemyError
 from models.wallet import Wallet, TransactionType
 from models.transaction import Transaction
+from models.enum_types import UserRole, LedgerAccountType, JournalEntryType, OutboxEventType
+from repositories.commission_repository import CommissionRepository
+from repositories.ledger_repository import LedgerRepository, EXTERNAL_ACCOUNT_ID
+from repositories.outbox_repository import OutboxRepository
+from repositories.statement_repository import StatementRepository, month_start, next_month
+from repositories.transaction_repository import TransactionRepository
+from repositories.wallet_repository import WalletRepository
+from utils.transactions import run_in_transaction
 from app import db
 
 class WalletService:
     @staticmethod
     def get_wallet(user_id):
-        """Get wallet by user ID"""
-        return Wallet.query.filter_by(user_id=user_id).first()
+        """
+        Get wallet by user ID
+        
+        The admin wallet also reports commission still held in the
+        commission shards, so its balance is correct between roll-ups.
+        """
+        wallet = Wallet.query.filter_by(user_id=user_id).first()
+        if wallet and WalletService._is_commission_wallet(wallet):
+            wallet.pending_commission = CommissionRepository().pending_total()
+        return wallet
+    
+    @staticmethod
+    def _is_commission_wallet(wallet):
+        """Check whether a wallet is the one commission is rolled up into"""
+        if wallet.user.role != UserRole.ADMIN:
+            return False
+        admin_wallet = WalletRepository().find_admin_wallet()
+        return admin_wallet is not None and admin_wallet.id == wallet.id
     
     @staticmethod
-    def get_transactions(wallet_id, limit=5):
-        """Get recent transactions for a wallet"""
-        return Transaction.query.filter_by(wallet_id=wallet_id).order_by(Transaction.created_at.desc()).limit(limit).all()
+    def get_transactions(wallet_id, limit=5, cursor=None):
+        """Get a page of recent transactions (including archived ones) for a wallet"""
+        return TransactionRepository().find_by_wallet_id(wallet_id, cursor, limit)
+    
+    @staticmethod
+    def get_statement(wallet_id, start, end, cursor=None, limit=None):
+        """
+        Build a wallet statement for the period [start, end)
+        
+        Opening and closing balances are read from the running balance on
+        the postings either side of the period. Totals for whole months the
+        statement job has summarized come from their precomputed rows, and
+        only the partial months at either end are totalled from postings,
+        so a yearly statement reads about a dozen summary rows.
+        
+        Args:
+            wallet_id: ID of the wallet
+            start: Start of the period (datetime, inclusive)
+            end: End of the period (datetime, exclusive)
+            cursor: Cursor for the next page of statement lines (optional)
+            limit: Number of statement lines per page (optional)
+            
+        Returns:
+            Dictionary with balances, totals by entry type, monthly
+            summaries, and a page of lines with running balances
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        repository = StatementRepository()
+        
+        # Whole months inside the period that have been summarized
+        full_start = start if start == month_start(start) else next_month(month_start(start))
+        summarized_through = repository.summarized_through()
+        full_end = min(month_start(end), next_month(summarized_through)) if summarized_through else full_start
+        
+        months = []
+        by_type = {}
+        def add(entry_type, credits, debits, count):
+            totals = by_type.setdefault(entry_type, [Decimal('0'), Decimal('0'), 0])
+            totals[0] += credits
+            totals[1] += debits
+            totals[2] += count
+        
+        if full_end > full_start:
+            months = repository.find_months(wallet_id, full_start, full_end)
+            for month in months:
+                for entry_type, totals in json.loads(month.breakdown).items():
+                    add(entry_type, Decimal(totals['credits']), Decimal(totals['debits']), totals['count'])
+            partial_ranges = [(start, full_start), (full_end, end)]
+        else:
+            partial_ranges = [(start, end)]
+        for range_start, range_end in partial_ranges:
+            for entry_type, totals in repository.aggregate_postings(wallet_id, range_start, range_end).items():
+                add(entry_type, *totals)
+        
+        lines = repository.find_lines(wallet_id, start, end, cursor, limit)
+        credits = sum((totals[0] for totals in by_type.values()), Decimal('0'))
+        debits = sum((totals[1] for totals in by_type.values()), Decimal('0'))
+        return {
+            'wallet_id': wallet_id,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'opening_balance': float(repository.balance_before(wallet_id, start)),
+            'closing_balance': float(repository.balance_before(wallet_id, end)),
+            'credits': float(credits),
+            'debits': float(debits),
+            'by_type': {
+                entry_type: {'credits': float(totals[0]), 'debits': float(totals[1]), 'count': totals[2]}
+                for entry_type, totals in sorted(by_type.items())
+            },
+            'months': [month.to_dict() for month in months],
+            'lines': [
+                dict(posting.to_dict(), entry_type=entry.entry_type, description=entry.description,
+                     reference_id=entry.reference_id)
+                for posting, entry in lines
+            ],
+            'next_cursor': lines.next_cursor
+        }
     
     @staticmethod
     def add_funds(user_id, amount):
         """
         Add funds to user wallet
         
+        The balance changes through one in-database UPDATE, issued after the
+        transaction record is written so the wallet row is locked only for
+        the ledger entry and commit. Transactions aborted by a conflict are
+        retried.
+        
         Returns a tuple (success, message or wallet)
         """
+        amount = WalletService._to_amount(amount)
+        if amount is None:
+            return False, "Amount must be a finite number"
         if amount <= 0:
             return False, "Amount must be positive"
         
         try:
-            wallet = Wallet.query.filter_by(user_id=user_id).first()
-            if not wallet:
-                return False, "Wallet not found"
-            
-            # Create transaction record
-            transaction = Transaction(
-                wallet_id=wallet.id,
-                amount=amount,
-                transaction_type=TransactionType.DEPOSIT,
-                description="Funds added to wallet"
-            )
-            db.session.add(transaction)
-            
-            # Update wallet balance
-            wallet.deposit(amount)
-            
-            db.session.commit()
-            return True, wallet
+            success, result = run_in_transaction(lambda: WalletService._add_funds(user_id, amount))
+            if not success:
+                return False, result
+            return True, Wallet.query.get(result)
             
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -54,6 +150,35 @@ class WalletService:
             current_app.logger.error(f"Error adding funds: {str(e)}")
             return False, f"Error: {str(e)}"
     
+    @staticmethod
+    def _add_funds(user_id, amount):
+        """Write one add_funds attempt (does not commit); returns (success, message or wallet ID)"""
+        wallet_repository = WalletRepository()
+        wallet_id = wallet_repository.find_ids_by_user_ids([user_id]).get(user_id)
+        if not wallet_id:
+            return False, "Wallet not found"
+        
+        # Create transaction record
+        db.session.add(Transaction(
+            wallet_id=wallet_id,
+            amount=amount,
+            transaction_type=TransactionType.DEPOSIT,
+            description="Funds added to wallet"
+        ))
+        OutboxRepository().add('wallet', wallet_id, OutboxEventType.WALLET_FUNDS_ADDED, {
+            'wallet_id': wallet_id,
+            'user_id': user_id,
+            'amount': amount
+        })
+        
+        # Update wallet balance, then record it in the ledger under the row lock
+        wallet_repository.credit(wallet_id, amount)
+        LedgerRepository().post(JournalEntryType.DEPOSIT, [
+            (LedgerAccountType.EXTERNAL, EXTERNAL_ACCOUNT_ID, -amount),
+            (LedgerAccountType.WALLET, wallet_id, amount)
+        ], description="Funds added to wallet")
+        return True, wallet_id
+    
     @staticmethod
     def create_wallet(user_id, initial_balance=0):
         """
@@ -73,6 +198,11 @@ class WalletService:
             
             # If initial balance > 0, create transaction record
             if initial_balance > 0:
+                db.session.flush()
+                LedgerRepository().post(JournalEntryType.OPENING_BALANCE, [
+                    (LedgerAccountType.EXTERNAL, EXTERNAL_ACCOUNT_ID, -initial_balance),
+                    (LedgerAccountType.WALLET, wallet.id, initial_balance)
+                ], description="Initial wallet balance")
                 transaction = Transaction(
                     wallet_id=wallet.id,
                     amount=initial_balance,
@@ -98,49 +228,25 @@ class WalletService:
         """
         Transfer funds between wallets (admin only)
         
+        The source is debited with a conditional UPDATE that only succeeds
+        if it has sufficient funds, and both wallets are updated in wallet
+        ID order after the transaction records are written. No row is read
+        for update, so busy wallets are locked only for the ledger entry and
+        commit at the end of each transfer.
+        Transactions aborted by a conflict are retried.
+        
         Returns a tuple (success, message)
         """
+        amount = WalletService._to_amount(amount)
+        if amount is None:
+            return False, "Amount must be a finite number"
         if amount <= 0:
             return False, "Amount must be positive"
         
         try:
-            # Get source wallet
-            from_wallet = Wallet.query.filter_by(user_id=from_user_id).first()
-            if not from_wallet:
-                return False, "Source wallet not found"
-            
-            # Get destination wallet
-            to_wallet = Wallet.query.filter_by(user_id=to_user_id).first()
-            if not to_wallet:
-                return False, "Destination wallet not found"
-            
-            # Check if source wallet has sufficient funds
-            if not from_wallet.has_sufficient_funds(amount):
-                return False, "Insufficient funds in source wallet"
-            
-            # Create transaction records
-            from_transaction = Transaction(
-                wallet_id=from_wallet.id,
-                amount=amount,
-                transaction_type=TransactionType.WITHDRAWAL,
-                description=description or f"Transfer to user {to_user_id}"
+            return run_in_transaction(
+                lambda: WalletService._transfer_funds(from_user_id, to_user_id, amount, description)
             )
-            db.session.add(from_transaction)
-            
-            to_transaction = Transaction(
-                wallet_id=to_wallet.id,
-                amount=amount,
-                transaction_type=TransactionType.DEPOSIT,
-                description=description or f"Transfer from user {from_user_id}"
-            )
-            db.session.add(to_transaction)
-            
-            # Update wallet balances
-            from_wallet.withdraw(amount)
-            to_wallet.deposit(amount)
-            
-            db.session.commit()
-            return True, "Funds transferred successfully"
             
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -151,40 +257,75 @@ class WalletService:
             current_app.logger.error(f"Error transferring funds: {str(e)}")
             return False, f"Error: {str(e)}"
     
+    @staticmethod
+    def _transfer_funds(from_user_id, to_user_id, amount, description):
+        """Write one transfer_funds attempt (does not commit); returns (success, message)"""
+        wallet_repository = WalletRepository()
+        wallet_ids = wallet_repository.find_ids_by_user_ids([from_user_id, to_user_id])
+        
+        from_wallet_id = wallet_ids.get(from_user_id)
+        if not from_wallet_id:
+            return False, "Source wallet not found"
+        
+        to_wallet_id = wallet_ids.get(to_user_id)
+        if not to_wallet_id:
+            return False, "Destination wallet not found"
+        
+        # Create transaction records
+        db.session.add_all([
+            Transaction(
+                wallet_id=from_wallet_id,
+                amount=amount,
+                transaction_type=TransactionType.WITHDRAWAL,
+                description=description or f"Transfer to user {to_user_id}"
+            ),
+            Transaction(
+                wallet_id=to_wallet_id,
+                amount=amount,
+                transaction_type=TransactionType.DEPOSIT,
+                description=description or f"Transfer from user {from_user_id}"
+            )
+        ])
+        OutboxRepository().add('wallet', from_wallet_id, OutboxEventType.WALLET_TRANSFER, {
+            'from_wallet_id': from_wallet_id,
+            'to_wallet_id': to_wallet_id,
+            'from_user_id': from_user_id,
+            'to_user_id': to_user_id,
+            'amount': amount,
+            'description': description
+        })
+        
+        # Update wallet balances; the debit fails if funds are insufficient
+        if not wallet_repository.apply_balance_changes([(from_wallet_id, -amount), (to_wallet_id, amount)]):
+            return False, "Insufficient funds in source wallet"
+        LedgerRepository().post(JournalEntryType.TRANSFER, [
+            (LedgerAccountType.WALLET, from_wallet_id, -amount),
+            (LedgerAccountType.WALLET, to_wallet_id, amount)
+        ], description=description or f"Transfer from user {from_user_id} to user {to_user_id}")
+        return True, "Funds transferred successfully"
+    
     @staticmethod
     def adjust_balance(user_id, amount, description=None):
         """
         Adjust wallet balance (admin only)
         
-        Amount can be positive or negative
+        Amount can be positive or negative; a negative adjustment cannot take
+        the balance below zero. Transactions aborted by a conflict are retried.
         Returns a tuple (success, message or wallet)
         """
+        amount = WalletService._to_amount(amount)
+        if amount is None:
+            return False, "Amount must be a finite number"
+        if amount == 0:
+            return False, "Amount must not be zero"
+        
         try:
-            wallet = Wallet.query.filter_by(user_id=user_id).first()
-            if not wallet:
-                return False, "Wallet not found"
-            
-            # Create transaction record
-            transaction_type = TransactionType.DEPOSIT if amount > 0 else TransactionType.WITHDRAWAL
-            transaction = Transaction(
-                wallet_id=wallet.id,
-                amount=abs(amount),
-                transaction_type=transaction_type,
-                description=description or "Admin adjustment"
+            success, result = run_in_transaction(
+                lambda: WalletService._adjust_balance(user_id, amount, description)
             )
-            db.session.add(transaction)
-            
-            # Update wallet balance
-            if amount > 0:
-                wallet.deposit(amount)
-            else:
-                try:
-                    wallet.withdraw(abs(amount))
-                except ValueError as e:
-                    return False, str(e)
-            
-            db.session.commit()
-            return True, wallet
+            if not success:
+                return False, result
+            return True, Wallet.query.get(result)
             
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -193,4 +334,47 @@ class WalletService:
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f"Error adjusting balance: {str(e)}")
-            return False, f"Error: {str(e)}"
\ No newline at end of file
+            return False, f"Error: {str(e)}"
+    
+    @staticmethod
+    def _adjust_balance(user_id, amount, description):
+        """Write one adjust_balance attempt (does not commit); returns (success, message or wallet ID)"""
+        wallet_repository = WalletRepository()
+        wallet_id = wallet_repository.find_ids_by_user_ids([user_id]).get(user_id)
+        if not wallet_id:
+            return False, "Wallet not found"
+        
+        # Create transaction record
+        db.session.add(Transaction(
+            wallet_id=wallet_id,
+            amount=abs(amount),
+            transaction_type=TransactionType.DEPOSIT if amount > 0 else TransactionType.WITHDRAWAL,
+            description=description or "Admin adjustment"
+        ))
+        OutboxRepository().add('wallet', wallet_id, OutboxEventType.WALLET_ADJUSTED, {
+            'wallet_id': wallet_id,
+            'user_id': user_id,
+            'amount': amount,
+            'description': description
+        })
+        
+        # Update wallet balance
+        if not wallet_repository.apply_balance_changes([(wallet_id, amount)]):
+            return False, "Insufficient funds"
+        LedgerRepository().post(JournalEntryType.ADJUSTMENT, [
+            (LedgerAccountType.EXTERNAL, EXTERNAL_ACCOUNT_ID, -amount),
+            (LedgerAccountType.WALLET, wallet_id, amount)
+        ], description=description or "Admin adjustment")
+        return True, wallet_id
+    
+    @staticmethod
+    def _to_amount(amount):
+        """
+        Convert a request amount (often a float) to an exact Decimal in cents
+        
+        Returns None for NaN and infinity, which cannot be rounded to cents.
+        """
+        amount = Decimal(str(amount))
+        if not amount.is_finite():
+            return None
+        return amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
\ No newline at end of file
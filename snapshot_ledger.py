@@ -0,0 +1,12 @@
+from app import app
+from repositories.ledger_repository import LedgerRepository
+
+# Run periodically (e.g. from cron) so balance reads only sum recent postings
+def snapshot_ledger():
+    with app.app_context():
+        print("Taking ledger balance snapshots...")
+        count = LedgerRepository().take_snapshots()
+        print(f"Wrote {count} snapshots!")
+
+if __name__ == "__main__":
+    snapshot_ledger()
\ No newline at end of file
@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the application at a throwaway SQLite database before it is imported
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+import config
+# The PostgreSQL connect_timeout option is not understood by SQLite
+config.Config.SQLALCHEMY_ENGINE_OPTIONS = {}
+
+@pytest.fixture
+def db():
+    """A database session with every table emptied after the test"""
+    from app import app, db
+    app.config['TESTING'] = True
+    with app.app_context():
+        yield db
+        db.session.rollback()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+
+@pytest.fixture
+def accounts(db):
+    """An admin, a provider and two users, each with a wallet of 1000"""
+    from models.user import User
+    from models.wallet import Wallet
+    from repositories.ledger_repository import LedgerRepository
+
+    ids = {}
+    for name, role in (('admin', 'ADMIN'), ('provider', 'POWER_USER'), ('user', 'USER'), ('other', 'USER')):
+        user = User(f'{name}@example.com', 'Passw0rd!', name.title(), 'Test', '5550100', role)
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Wallet(user_id=user.id, initial_balance=1000))
+        ids[name] = user.id
+    db.session.commit()
+    LedgerRepository().open_missing_balances()
+    return ids
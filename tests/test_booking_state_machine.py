@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import update
+from sqlalchemy.orm.attributes import set_committed_value
+from models.booking import Booking
+from models.car_pool import CarPoolService, SeatHold
+from models.enum_types import BookingStatus, OutboxEventType
+from models.household import HouseholdService
+from models.outbox import OutboxEvent
+from models.wallet import Wallet
+from repositories.car_pool_repository import CarPoolRepository
+from services.booking_service import BookingService
+from services.booking_state_machine import BookingStateMachine, CONFLICT_MESSAGE
+
+def _household_booking(db, accounts, price=100):
+    service = HouseholdService('Cleaning', 'Home cleaning', accounts['provider'], price, 'CLEANING')
+    service.status = 'AVAILABLE'
+    db.session.add(service)
+    db.session.commit()
+    return BookingService.create_booking(service.id, accounts['user'])
+
+def test_stale_confirm_loses_to_cancel(db, accounts):
+    booking = _household_booking(db, accounts)
+    version = booking.version
+    
+    # Another request cancels the booking after this one read it
+    db.session.execute(
+        update(Booking).where(Booking.id == booking.id)
+        .values(status=BookingStatus.CANCELLED, version=Booking.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    set_committed_value(booking, 'status', BookingStatus.PENDING)
+    set_committed_value(booking, 'version', version)
+    
+    success, message = BookingStateMachine.transition(booking, 'confirm')
+    db.session.rollback()
+    
+    assert not success
+    assert message == CONFLICT_MESSAGE
+    assert db.session.get(Booking, booking.id, populate_existing=True).status == BookingStatus.CANCELLED
+
+def test_cancel_rereads_and_refunds_a_booking_paid_meanwhile(db, accounts):
+    booking = _household_booking(db, accounts)
+    version = booking.version
+    
+    success, message = BookingService.process_payment(booking.id)
+    assert success, message
+    assert Wallet.query.filter_by(user_id=accounts['user']).first().balance == Decimal('900')
+    
+    # The cancelling request still holds the booking as it was before payment
+    set_committed_value(booking, 'status', BookingStatus.PENDING)
+    set_committed_value(booking, 'version', version)
+    set_committed_value(booking, 'transaction_id', None)
+    
+    success, message = BookingService.cancel_booking(booking.id)
+    
+    assert success, message
+    assert db.session.get(Booking, booking.id).status == BookingStatus.CANCELLED
+    assert Wallet.query.filter_by(user_id=accounts['user']).first().balance == Decimal('1000')
+    assert Wallet.query.filter_by(user_id=accounts['provider']).first().balance == Decimal('1000')
+
+def test_expired_holds_cancel_bookings_once(db, accounts):
+    ride = CarPoolService('Ride', 'Into town', accounts['provider'], 50, 'CAR', 'A', 'B',
+                          datetime.utcnow() + timedelta(days=1), 3)
+    ride.status = 'AVAILABLE'
+    db.session.add(ride)
+    db.session.commit()
+    booking = BookingService.create_booking(ride.id, accounts['user'], quantity=2)
+    assert db.session.get(CarPoolService, ride.id).available_seats == 1
+    
+    db.session.execute(update(SeatHold).values(expires_at=datetime.utcnow() - timedelta(minutes=1)))
+    db.session.commit()
+    
+    assert CarPoolRepository().release_expired_holds() == 2
+    assert CarPoolRepository().release_expired_holds() == 0
+    
+    assert db.session.get(CarPoolService, ride.id, populate_existing=True).available_seats == 3
+    assert db.session.get(Booking, booking.id, populate_existing=True).status == BookingStatus.CANCELLED
+    events = OutboxEvent.query.filter_by(aggregate_id=booking.id,
+                                         event_type=OutboxEventType.BOOKING_CANCELLED).all()
+    assert len(events) == 1
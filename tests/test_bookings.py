@@ -0,0 +1,40 @@
+from decimal import Decimal
+from models.booking import Booking
+from models.household import HouseholdService
+from models.wallet import Wallet
+from services.booking_service import BookingService
+
+def _service(db, provider_id, price):
+    service = HouseholdService('Cleaning', 'Home cleaning', provider_id, price, 'CLEANING')
+    service.status = 'AVAILABLE'
+    db.session.add(service)
+    db.session.commit()
+    return service
+
+def _balance(user_id):
+    return Wallet.query.filter_by(user_id=user_id).first().balance
+
+def test_free_booking_can_be_paid_and_cancelled(db, accounts):
+    service = _service(db, accounts['provider'], 0)
+    booking = BookingService.create_booking(service.id, accounts['user'])
+    
+    success, message = BookingService.process_payment(booking.id)
+    assert success, message
+    assert db.session.get(Booking, booking.id).status == 'CONFIRMED'
+    
+    success, message = BookingService.cancel_booking(booking.id)
+    assert success, message
+    assert db.session.get(Booking, booking.id).status == 'CANCELLED'
+    assert _balance(accounts['user']) == Decimal('1000')
+    assert _balance(accounts['provider']) == Decimal('1000')
+
+def test_free_items_can_be_checked_out_in_a_batch(db, accounts):
+    free = _service(db, accounts['provider'], 0)
+    paid = _service(db, accounts['provider'], 100)
+    
+    success, results = BookingService.create_batch_bookings(
+        accounts['user'], [{'service_id': free.id}, {'service_id': paid.id}]
+    )
+    
+    assert success, results
+    assert _balance(accounts['user']) == Decimal('900')
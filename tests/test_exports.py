@@ -0,0 +1,34 @@
+import csv
+import io
+import json
+import pytest
+from app import app
+from utils.exports import EXPORT_FAILED_MARKER, export_response
+
+def _rows_then_error():
+    yield (1, 'first')
+    yield (2, 'second')
+    raise RuntimeError("connection lost")
+
+def _download(rows, export_format):
+    with app.test_request_context('/api/admin/export'):
+        return export_response(['id', 'name'], rows, export_format, 'bookings').get_data(as_text=True)
+
+def test_failed_csv_export_ends_with_the_marker_row():
+    lines = list(csv.reader(io.StringIO(_download(_rows_then_error(), 'csv'))))
+    
+    assert lines[:3] == [['id', 'name'], ['1', 'first'], ['2', 'second']]
+    assert len(lines[-1]) == 1 and lines[-1][0].startswith(EXPORT_FAILED_MARKER)
+
+def test_failed_ndjson_export_ends_with_an_error_line():
+    lines = [json.loads(line) for line in _download(_rows_then_error(), 'ndjson').splitlines()]
+    
+    assert [line['id'] for line in lines[:-1]] == [1, 2]
+    assert 'error' in lines[-1]
+
+@pytest.mark.parametrize('export_format', ['csv', 'ndjson'])
+def test_complete_export_has_no_marker(export_format):
+    body = _download(iter([(1, 'first')]), export_format)
+    
+    assert EXPORT_FAILED_MARKER not in body
+    assert '"error"' not in body
@@ -0,0 +1,60 @@
+from flask import jsonify, session
+from app import app
+from models.idempotency import IdempotencyRecord
+from repositories.idempotency_repository import IdempotencyRepository
+import utils.idempotency as idempotency
+
+def _call(view, key, query_string=None, body=None):
+    """Run an @idempotent view in a request made by user 1"""
+    with app.test_request_context('/api/thing', method='POST', query_string=query_string, json=body or {},
+                                  headers={idempotency.IDEMPOTENCY_HEADER: key}):
+        session['user_id'] = 1
+        return app.make_response(view())
+
+def _counting_view(calls):
+    @idempotency.idempotent
+    def view():
+        calls.append(1)
+        return jsonify({"calls": len(calls)}), 202, {'Location': '/api/jobs/7'}
+    return view
+
+def test_replay_keeps_the_location_header(db):
+    idempotency._cache.clear()
+    calls = []
+    view = _counting_view(calls)
+    
+    first = _call(view, 'k1')
+    idempotency._cache.clear()
+    replay = _call(view, 'k1')
+    
+    assert len(calls) == 1
+    assert replay.status_code == 202
+    assert replay.headers['Location'] == first.headers['Location'] == '/api/jobs/7'
+    assert replay.headers[idempotency.REPLAYED_HEADER] == 'true'
+
+def test_same_key_with_a_different_query_string_is_rejected(db):
+    idempotency._cache.clear()
+    calls = []
+    view = _counting_view(calls)
+    
+    _call(view, 'k2')
+    response = _call(view, 'k2', query_string={'async': 'true'})
+    
+    assert response.status_code == 422
+    assert len(calls) == 1
+
+def test_claim_is_released_when_the_response_cannot_be_saved(db, monkeypatch):
+    idempotency._cache.clear()
+    calls = []
+    view = _counting_view(calls)
+    
+    def fail(*args, **kwargs):
+        raise RuntimeError("database went away")
+    monkeypatch.setattr(IdempotencyRepository, 'complete', fail)
+    
+    assert _call(view, 'k3').status_code == 202
+    assert IdempotencyRecord.query.count() == 0
+    
+    monkeypatch.undo()
+    assert _call(view, 'k3').status_code == 202
+    assert len(calls) == 2
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from models.archive import TransactionArchive
+from models.transaction import Transaction
+from repositories.archive_repository import ArchiveRepository
+from repositories.transaction_repository import TransactionRepository
+
+def _add_transactions(db, wallet_id, count, first_created_at):
+    for index in range(count):
+        transaction = Transaction(wallet_id, 1, 'DEPOSIT', f"Deposit {index}")
+        transaction.created_at = first_created_at + timedelta(days=index)
+        db.session.add(transaction)
+    db.session.commit()
+
+def _all_pages(wallet_id, limit):
+    ids, cursor = [], None
+    while True:
+        page = TransactionRepository().find_by_wallet_id(wallet_id, cursor, limit)
+        ids += [transaction.id for transaction in page]
+        cursor = page.next_cursor
+        if not cursor:
+            return ids
+
+def test_pages_through_archive_only_history(db):
+    _add_transactions(db, 1, 7, datetime(2024, 1, 1))
+    expected = _all_pages(1, 3)
+    
+    ArchiveRepository().archive_closed_months(1, now=datetime(2026, 1, 1))
+    assert Transaction.query.count() == 0
+    assert TransactionArchive.query.count() == 7
+    
+    assert _all_pages(1, 3) == expected
+    assert _all_pages(1, 7) == expected
+
+def test_pages_through_live_and_archive_rows_filling_a_page_exactly(db):
+    _add_transactions(db, 1, 5, datetime(2024, 1, 1))
+    ArchiveRepository().archive_closed_months(1, now=datetime(2026, 1, 1))
+    _add_transactions(db, 1, 5, datetime(2025, 12, 20))
+    expected = sorted(
+        [(row.created_at, row.id) for row in Transaction.query] +
+        [(row.created_at, row.id) for row in TransactionArchive.query],
+        reverse=True
+    )
+    
+    for limit in (2, 5, 10, 20):
+        assert _all_pages(1, limit) == [row_id for _, row_id in expected]
@@ -0,0 +1,13 @@
+from models.enum_types import RatingSubject
+from models.feedback import RatingAggregate
+from repositories.rating_repository import RatingRepository
+
+def test_apply_accepts_ratings_sent_as_strings(db):
+    repository = RatingRepository()
+    repository.apply(service_id=10, provider_id=20, added='4')
+    repository.apply(service_id=10, provider_id=20, added='5', removed='4')
+    db.session.commit()
+    
+    aggregate = RatingAggregate.query.filter_by(subject_type=RatingSubject.SERVICE, subject_id=10).one()
+    assert (aggregate.rating_count, aggregate.rating_sum) == (1, 5)
+    assert (aggregate.stars_4, aggregate.stars_5) == (0, 1)
@@ -0,0 +1,33 @@
+from flask_jwt_extended import create_access_token
+from app import app
+from models.enum_types import ReconciliationMode
+from models.reconciliation import ReconciliationRun
+from services.reconciliation_service import ReconciliationService
+
+def _client(accounts, monkeypatch):
+    monkeypatch.setitem(app.config, 'JWT_VERIFY_SUB', False)
+    monkeypatch.setitem(app.config, 'WTF_CSRF_ENABLED', False)
+    token = create_access_token(identity={'user_id': accounts['admin'], 'role': 'ADMIN', 'status': 'ACTIVE'})
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    return client
+
+def test_endpoint_does_not_run_full_reconciliation(db, accounts, monkeypatch):
+    client = _client(accounts, monkeypatch)
+    
+    response = client.post('/api/admin/reconciliation', json={'mode': 'FULL'})
+    assert response.status_code == 400
+    assert 'reconcile_wallets.py --full' in response.get_json()['error']
+    
+    # With no completed run to continue from, an incremental run would be a full one
+    response = client.post('/api/admin/reconciliation', json={})
+    assert response.status_code == 400
+    assert ReconciliationRun.query.count() == 0
+
+def test_endpoint_runs_incremental_reconciliation(db, accounts, monkeypatch):
+    client = _client(accounts, monkeypatch)
+    ReconciliationService.run(ReconciliationMode.FULL, workers=1)
+    
+    response = client.post('/api/admin/reconciliation', json={})
+    assert response.status_code == 200
+    assert response.get_json()['run']['mode'] == ReconciliationMode.INCREMENTAL
@@ -0,0 +1,49 @@
+import sqlite3
+from decimal import Decimal
+import pytest
+from sqlalchemy.exc import OperationalError
+from models.wallet import Wallet
+from services.wallet_service import WalletService
+from utils.transactions import run_in_transaction
+
+def _balance(user_id):
+    return Wallet.query.filter_by(user_id=user_id).first().balance
+
+@pytest.mark.parametrize('amount', [float('nan'), float('inf'), float('-inf')])
+def test_non_finite_amounts_are_rejected(db, accounts, amount):
+    expected = (False, "Amount must be a finite number")
+    assert WalletService.add_funds(accounts['user'], amount) == expected
+    assert WalletService.transfer_funds(accounts['user'], accounts['other'], amount) == expected
+    assert WalletService.adjust_balance(accounts['user'], amount) == expected
+    assert _balance(accounts['user']) == Decimal('1000')
+
+def test_transfer_with_insufficient_funds_changes_nothing(db, accounts):
+    success, message = WalletService.transfer_funds(accounts['user'], accounts['other'], 1000.01)
+    
+    assert not success
+    assert message == "Insufficient funds in source wallet"
+    assert _balance(accounts['user']) == Decimal('1000')
+    assert _balance(accounts['other']) == Decimal('1000')
+
+def test_run_in_transaction_retries_a_locked_database(db):
+    calls = []
+    
+    def work():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OperationalError("UPDATE wallets", {}, sqlite3.OperationalError("database is locked"))
+        return True, "done"
+    
+    assert run_in_transaction(work, attempts=3, base_delay=0.001) == (True, "done")
+    assert len(calls) == 2
+
+def test_run_in_transaction_does_not_retry_other_errors(db):
+    calls = []
+    
+    def work():
+        calls.append(1)
+        raise OperationalError("UPDATE wallets", {}, sqlite3.OperationalError("no such table: wallets"))
+    
+    with pytest.raises(OperationalError):
+        run_in_transaction(work, attempts=3, base_delay=0.001)
+    assert len(calls) == 1
@@ -1,9 +1,119 @@
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
 from app import app, db
+from utils.search_index import install_search_index, rebuild_search_index
+from repositories.car_pool_repository import CarPoolRepository
+from repositories.gym_repository import GymRepository
+from repositories.rating_repository import RatingRepository
+from repositories.ledger_repository import LedgerRepository
+from repositories.statement_repository import StatementRepository
+from models.feedback import Feedback, RatingAggregate
+
+def add_missing_columns(connection):
+    """
+    Add columns declared on the models but missing from existing tables
+    
+    create_all only creates whole tables, so columns added to a model
+    later have to be added here. New columns are added as nullable unless
+    they have a server default, since existing rows have no value yet.
+    
+    Returns:
+        List of "table.column" names that were added
+    """
+    inspector = inspect(connection)
+    added = []
+    
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            
+            column_ddl = CreateColumn(column).compile(dialect=connection.dialect)
+            column_ddl = str(column_ddl)
+            if not column.nullable and column.server_default is None:
+                column_ddl = column_ddl.replace(' NOT NULL', '')
+            
+            connection.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column_ddl}')
+            added.append(f'{table.name}.{column.name}')
+    
+    return added
+
+def create_missing_indexes(connection):
+    """
+    Create indexes declared on the models but missing from existing tables
+    
+    Returns:
+        List of index names that were created
+    """
+    inspector = inspect(connection)
+    created = []
+    
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(connection)
+                created.append(index.name)
+    
+    return created
+
+# Indexes replaced by a differently defined index under a new name
+OBSOLETE_INDEXES = {
+    'waitlist_entries': ['ix_waitlist_queue']  # Replaced by ix_waitlist_queue_head (priority DESC)
+}
+
+def drop_obsolete_indexes(connection):
+    """
+    Drop indexes that a model no longer declares
+    
+    Returns:
+        List of index names that were dropped
+    """
+    inspector = inspect(connection)
+    dropped = []
+    
+    for table_name, index_names in OBSOLETE_INDEXES.items():
+        if not inspector.has_table(table_name):
+            continue
+        
+        existing = {index['name'] for index in inspector.get_indexes(table_name)}
+        for index_name in index_names:
+            if index_name in existing:
+                connection.exec_driver_sql(f'DROP INDEX {index_name}')
+                dropped.append(index_name)
+    
+    return dropped
 
 def update_schema():
     with app.app_context():
         print("Updating database schema...")
         db.create_all()
+        with db.engine.begin() as connection:
+            for column in add_missing_columns(connection):
+                print(f"  Added column {column}")
+            for index in create_missing_indexes(connection):
+                print(f"  Created index {index}")
+            for index in drop_obsolete_indexes(connection):
+                print(f"  Dropped index {index}")
+            if install_search_index(connection):
+                rebuild_search_index(connection)
+        CarPoolRepository().rebuild_place_keys()
+        GymRepository().rebuild_facility_index()
+        if Feedback.query.first() and not RatingAggregate.query.first():
+            RatingRepository().rebuild()
+        opened = LedgerRepository().open_missing_balances()
+        if opened:
+            print(f"  Opened {opened} ledger accounts")
+        filled = StatementRepository().backfill_running_balances()
+        if filled:
+            print(f"  Filled in running balances for {filled} wallet postings")
         print("Database schema updated!")
 
 if __name__ == "__main__":
@@ -0,0 +1,140 @@
+"""
+Streaming CSV and NDJSON responses for large exports
+
+Rows are read from an iterator (a yield_per query) and written to the
+client in small chunks as they arrive, so memory use does not grow with
+the size of the export.
+
+Once streaming has started an error can no longer change the status code,
+so a failed export ends with a marker instead: a final CSV row whose only
+cell starts with EXPORT_FAILED_MARKER, or a final NDJSON line holding an
+"error" key. Clients should treat a download ending in one as incomplete.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from flask import Response, current_app, request, stream_with_context
+
+# Export formats and their content types
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+# Rows written to the buffer before it is sent as one chunk
+CHUNK_ROWS = 200
+
+# Start of the last CSV row of an export that failed part way through
+EXPORT_FAILED_MARKER = '#EXPORT FAILED'
+EXPORT_FAILED_MESSAGE = 'The export failed part way through and is incomplete'
+
+def get_export_format():
+    """
+    Read the export format from the query string (defaults to csv)
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    return export_format
+
+def _to_text(value):
+    """Render a value for a CSV cell"""
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _to_json(value):
+    """Serialize the non-JSON values found in exported rows"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot export {type(value).__name__}")
+
+def _generate_csv(fields, rows):
+    """Yield a header line, then the rows in chunks of CSV text"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+
+    try:
+        for count, row in enumerate(rows, 1):
+            writer.writerow([_to_text(value) for value in row])
+            if count % CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    except Exception:
+        # Send the rows already written before the error reaches export_response
+        yield buffer.getvalue()
+        raise
+    yield buffer.getvalue()
+
+def _generate_ndjson(fields, rows):
+    """Yield the rows as one JSON object per line, in chunks"""
+    lines = []
+    try:
+        for row in rows:
+            lines.append(json.dumps(dict(zip(fields, row)), default=_to_json))
+            if len(lines) >= CHUNK_ROWS:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+    except Exception:
+        # Send the rows already written before the error reaches export_response
+        if lines:
+            yield '\n'.join(lines) + '\n'
+        raise
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+def _failure_marker(export_format):
+    """The last chunk of an export that failed part way through"""
+    if export_format == 'csv':
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow([f"{EXPORT_FAILED_MARKER}: {EXPORT_FAILED_MESSAGE}"])
+        return buffer.getvalue()
+    return json.dumps({"error": EXPORT_FAILED_MESSAGE}) + '\n'
+
+def export_response(fields, rows, export_format, filename):
+    """
+    Build a streaming download response
+
+    The rows are consumed while the response is sent, inside the request
+    context, so the query's cursor stays open until the last chunk. An
+    error part way through can no longer change the status code, so it is
+    logged and the download ends with the failure marker.
+
+    Args:
+        fields: Column names, in the same order as the values in each row
+        rows: Iterator of row tuples
+        export_format: 'csv' or 'ndjson'
+        filename: Download name without the extension
+
+    Returns:
+        Flask Response
+    """
+    generate = _generate_csv if export_format == 'csv' else _generate_ndjson
+
+    def stream():
+        try:
+            yield from generate(fields, rows)
+        except Exception as e:
+            current_app.logger.error(f"Export {filename}.{export_format} failed: {str(e)}")
+            yield _failure_marker(export_format)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}.{export_format}"',
+            # Stop proxies from buffering the whole export before sending it
+            'X-Accel-Buffering': 'no'
+        }
+    )
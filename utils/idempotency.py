@@ -0,0 +1,189 @@
+"""
+Idempotency-Key support for endpoints that move money
+
+A client sends the same Idempotency-Key header when it retries a request.
+The first request runs normally and its response is stored; retries get
+the stored response back without the operation running again. Completed
+responses are also kept in a small in-process cache so most retries are
+answered without a database round trip.
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, jsonify, make_response, request, session
+from flask_jwt_extended import get_jwt_identity
+from repositories.idempotency_repository import IdempotencyRepository
+from app import db
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+# Response headers saved with the body and sent again on replay
+REPLAYED_RESPONSE_HEADERS = ('Location', 'Retry-After')
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+class _StoredResponse:
+    """A completed response as kept in the in-process cache"""
+    def __init__(self, request_hash, status_code, body, mimetype, headers, expires_at):
+        self.request_hash = request_hash
+        self.status_code = status_code
+        self.body = body
+        self.mimetype = mimetype
+        self.headers = headers or {}
+        self.expires_at = expires_at
+
+def _cache_get(cache_key):
+    with _cache_lock:
+        stored = _cache.get(cache_key)
+        if stored is None:
+            return None
+        if stored.expires_at <= datetime.utcnow():
+            del _cache[cache_key]
+            return None
+        _cache.move_to_end(cache_key)
+        return stored
+
+def _cache_put(cache_key, stored):
+    max_size = current_app.config.get('IDEMPOTENCY_CACHE_SIZE', 1024)
+    with _cache_lock:
+        _cache[cache_key] = stored
+        _cache.move_to_end(cache_key)
+        while len(_cache) > max_size:
+            _cache.popitem(last=False)
+
+def _get_caller():
+    """Identify the caller from the web session or the JWT, or None if anonymous"""
+    if session.get('user_id'):
+        return f"user:{session['user_id']}"
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        # No JWT was verified for this request
+        return None
+    if isinstance(identity, dict):
+        identity = identity.get('user_id')
+    return f"user:{identity}" if identity is not None else None
+
+def _replay(stored):
+    response = make_response(stored.body, stored.status_code)
+    response.mimetype = stored.mimetype or 'application/json'
+    response.headers.update(stored.headers)
+    response.headers[REPLAYED_HEADER] = 'true'
+    return response
+
+def _request_hash():
+    """Hash the query string and body, so e.g. ?async=true is a different request"""
+    digest = hashlib.sha256(request.query_string)
+    digest.update(b'\n')
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+def _saved_headers(response):
+    return {name: response.headers[name] for name in REPLAYED_RESPONSE_HEADERS if name in response.headers}
+
+def _store(repository, scope, key, response, body, headers):
+    """
+    Save a finished response for its claimed key
+    
+    A failed save is retried once on a clean session. If that fails too,
+    the claim is released rather than left unfinished, which would answer
+    every retry with a 409 until the key expired.
+    
+    Returns:
+        True if the response was saved
+    """
+    for attempt in range(2):
+        try:
+            repository.complete(scope, key, response.status_code, body, response.mimetype, headers)
+            return True
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error storing idempotent response (attempt {attempt + 1}): {str(e)}")
+    
+    try:
+        repository.release(scope, key)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error releasing idempotency key: {str(e)}")
+    return False
+
+def _mismatch():
+    return jsonify({"error": f"{IDEMPOTENCY_HEADER} was already used for a different request"}), 422
+
+def idempotent(f):
+    """
+    Decorator that makes a POST endpoint safe to retry
+    
+    Requests without an Idempotency-Key header, or from anonymous callers,
+    run as before. Keys are scoped to the caller and the endpoint path;
+    reusing a key with a different body or query string is rejected with
+    a 422. Replays carry the original Location and Retry-After headers.
+    Responses with a 5xx status are not stored, so the client can retry
+    after a server error.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        caller = _get_caller() if key else None
+        if not key or not caller:
+            return f(*args, **kwargs)
+        
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({"error": f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters"}), 400
+        
+        scope = f"{caller}:{request.method}:{request.path}"
+        request_hash = _request_hash()
+        cache_key = (scope, key)
+        
+        stored = _cache_get(cache_key)
+        if stored:
+            return _replay(stored) if stored.request_hash == request_hash else _mismatch()
+        
+        repository = IdempotencyRepository()
+        ttl_seconds = current_app.config.get('IDEMPOTENCY_KEY_TTL', 86400)
+        claimed, record = repository.claim(scope, key, request_hash, ttl_seconds)
+        
+        if not claimed:
+            if record is None:
+                # The record expired and was purged between our insert and read
+                return jsonify({"error": "Please retry the request"}), 409
+            if record.request_hash != request_hash:
+                return _mismatch()
+            if not record.is_complete:
+                return jsonify({"error": "A request with this Idempotency-Key is still being processed"}), 409
+            stored = _StoredResponse(record.request_hash, record.status_code, record.response_body,
+                                     record.mimetype, record.headers, record.expires_at)
+            _cache_put(cache_key, stored)
+            return _replay(stored)
+        
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            repository.release(scope, key)
+            raise
+        
+        if response.status_code >= 500:
+            db.session.rollback()
+            repository.release(scope, key)
+            return response
+        
+        body = response.get_data(as_text=True)
+        headers = _saved_headers(response)
+        if not _store(repository, scope, key, response, body, headers):
+            return response
+        
+        expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+        _cache_put(cache_key, _StoredResponse(request_hash, response.status_code, body,
+                                              response.mimetype, headers, expires_at))
+        return response
+    
+    return decorated_function
@@ -0,0 +1,200 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from flask import request
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+class Page:
+    """
+    One bounded slice of a keyset-paginated query
+
+    Iterating a page yields its items, so callers that only need the rows
+    can treat it like the list the repositories used to return.
+    """
+    def __init__(self, items, next_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def to_dict(self, key, serializer=None):
+        """
+        Build the JSON envelope for a list endpoint
+
+        Args:
+            key: Name of the list in the response (e.g. 'bookings')
+            serializer: Function applied to each item (defaults to item.to_dict())
+
+        Returns:
+            Dictionary with the serialized items and the next cursor
+        """
+        serializer = serializer or (lambda item: item.to_dict())
+        return {
+            key: [serializer(item) for item in self.items],
+            'next_cursor': self.next_cursor
+        }
+
+def encode_cursor(sort_value, row_id):
+    """
+    Encode the position of the last row of a page as an opaque token
+
+    Args:
+        sort_value: Value of the sort column for the last row
+        row_id: Primary key of the last row
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = {'id': row_id}
+    if isinstance(sort_value, datetime):
+        payload['dt'] = sort_value.isoformat()
+    else:
+        payload['v'] = sort_value
+
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Cursor string from the client
+
+    Returns:
+        Tuple (sort_value, row_id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        row_id = int(payload['id'])
+        if 'dt' in payload:
+            return datetime.fromisoformat(payload['dt']), row_id
+        return payload['v'], row_id
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+
+def get_page_size(limit=None):
+    """Clamp a requested page size to the allowed range"""
+    if not limit or limit <= 0:
+        return DEFAULT_PAGE_SIZE
+    return min(int(limit), MAX_PAGE_SIZE)
+
+def get_page_args():
+    """
+    Read pagination parameters from the current request's query string
+
+    Returns:
+        Tuple (cursor, limit)
+    """
+    return request.args.get('cursor'), request.args.get('limit', type=int)
+
+def paginate(query, sort_column, id_column, cursor=None, limit=None, descending=True, row_key=None):
+    """
+    Apply keyset pagination to a query
+
+    Rows are ordered by (sort_column, id_column) and the cursor marks the last
+    row already returned, so each page is an index range scan rather than an
+    OFFSET over everything before it. The sort column must not be NULL.
+
+    Args:
+        query: SQLAlchemy query to paginate
+        sort_column: Column to order by (e.g. Booking.created_at)
+        id_column: Primary key column used as the tie-breaker
+        cursor: Cursor returned with the previous page (optional)
+        limit: Requested page size (optional, clamped to MAX_PAGE_SIZE)
+        descending: Whether to return newest rows first
+        row_key: Function returning (sort_value, id) for a result row, for
+            queries that select more than one entity (optional)
+
+    Returns:
+        Page object
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    page_size = get_page_size(limit)
+
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        if descending:
+            query = query.filter(or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, id_column < last_id)
+            ))
+        else:
+            query = query.filter(or_(
+                sort_column > sort_value,
+                and_(sort_column == sort_value, id_column > last_id)
+            ))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.limit(page_size + 1).all()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        if row_key:
+            next_cursor = encode_cursor(*row_key(rows[-1]))
+        else:
+            last = rows[-1]
+            next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+    return Page(rows, next_cursor)
+
+def paginate_with_archive(build_query, model, archive_model, archived_before, cursor=None, limit=None):
+    """
+    Apply keyset pagination, newest first, across a live table and its archive
+
+    Every archived row was created before archived_before, so when the live
+    table fills the page with newer rows the archive is not queried at all.
+    Otherwise the next page is read from both tables and merged. Archived
+    rows keep their IDs, so the same cursor works for both.
+
+    Args:
+        build_query: Function taking the model to query and returning the
+            filtered query (the live and archive models share column names)
+        model: Live model (e.g. Booking)
+        archive_model: Archive model (e.g. BookingArchive)
+        archived_before: Archive cutoff, or None if nothing is archived
+        cursor: Cursor returned with the previous page (optional)
+        limit: Requested page size (optional, clamped to MAX_PAGE_SIZE)
+
+    Returns:
+        Page object
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    page = paginate(build_query(model), model.created_at, model.id, cursor, limit)
+    if archived_before is None or (page.next_cursor and page.items[-1].created_at >= archived_before):
+        return page
+
+    archived = paginate(build_query(archive_model), archive_model.created_at, archive_model.id, cursor, limit)
+    if not archived.items:
+        return page
+
+    # Each page holds the first rows of its table, so the merged first rows are the page
+    page_size = get_page_size(limit)
+    rows = sorted(page.items + archived.items, key=lambda row: (row.created_at, row.id), reverse=True)
+    more = len(rows) > page_size or page.next_cursor or archived.next_cursor
+    rows = rows[:page_size]
+    next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if more else None
+
+    return Page(rows, next_cursor)
@@ -0,0 +1,119 @@
+"""
+Full-text search index for services
+
+SQLite keeps an external-content FTS5 table in sync with the services table
+through triggers. PostgreSQL uses a generated tsvector column with a GIN
+index, so the database maintains it on every insert and update.
+"""
+import logging
+import re
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'services_fts'
+TS_CONFIG = 'english'
+
+_SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description,
+        content='services', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS services_fts_ai AFTER INSERT ON services BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS services_fts_ad AFTER DELETE ON services BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS services_fts_au AFTER UPDATE OF name, description ON services BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """
+]
+
+_POSTGRES_DDL = [
+    f"""
+    ALTER TABLE services ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{TS_CONFIG}', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('{TS_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_services_search_vector ON services USING GIN (search_vector)"
+]
+
+def get_search_backend(bind):
+    """
+    Get the full-text backend for a database connection or engine
+
+    Returns:
+        'sqlite', 'postgresql', or None when the dialect has no index support
+    """
+    name = bind.dialect.name
+    return name if name in ('sqlite', 'postgresql') else None
+
+def install_search_index(connection):
+    """
+    Create the search index if it does not exist yet
+
+    Safe to call on every start-up. When the SQLite FTS table is created for
+    an existing database, it is populated from the current services.
+
+    Args:
+        connection: SQLAlchemy connection (committed by the caller)
+
+    Returns:
+        True if an index is available, False otherwise
+    """
+    backend = get_search_backend(connection)
+
+    if backend == 'sqlite':
+        is_new = not inspect(connection).has_table(FTS_TABLE)
+        try:
+            for statement in _SQLITE_DDL:
+                connection.execute(text(statement))
+        except Exception as e:
+            # SQLite builds without FTS5 fall back to LIKE search
+            logger.warning(f"FTS5 search index unavailable: {str(e)}")
+            return False
+        if is_new:
+            rebuild_search_index(connection)
+        return True
+
+    if backend == 'postgresql':
+        for statement in _POSTGRES_DDL:
+            connection.execute(text(statement))
+        return True
+
+    return False
+
+def rebuild_search_index(connection):
+    """Repopulate the search index from the services table"""
+    if get_search_backend(connection) == 'sqlite':
+        connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    # The PostgreSQL column is generated, so it never needs rebuilding
+
+def search_terms(search_term):
+    """Split user input into word tokens that are safe to put in a query"""
+    return re.findall(r'\w+', search_term or '')
+
+def sqlite_match_query(terms):
+    """Build an FTS5 MATCH expression requiring every term as a prefix"""
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def postgres_tsquery(terms):
+    """Build a to_tsquery expression requiring every term as a prefix"""
+    return ' & '.join(f'{term}:*' for term in terms)
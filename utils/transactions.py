@@ -0,0 +1,64 @@
+"""
+Retry helper for short write transactions
+
+Conditional UPDATEs do not need application-level locks, but the database
+can still abort a transaction under contention (a serialization failure or
+deadlock on PostgreSQL, a busy database on SQLite). Such transactions are
+safe to run again from the start.
+"""
+import random
+import time
+from flask import current_app
+from sqlalchemy.exc import DBAPIError
+from app import db
+
+# SQLSTATE codes for serialization_failure and deadlock_detected
+RETRYABLE_SQLSTATES = ('40001', '40P01')
+
+def is_retryable(error):
+    """Check whether a database error only means the transaction lost a race"""
+    original = getattr(error, 'orig', None)
+    sqlstate = getattr(original, 'pgcode', None) or getattr(original, 'sqlstate', None)
+    if sqlstate in RETRYABLE_SQLSTATES:
+        return True
+    return 'database is locked' in str(original)
+
+def run_in_transaction(work, attempts=None, base_delay=None):
+    """
+    Run a unit of work and commit it, retrying transient conflicts
+
+    The work function writes to the session without committing and returns
+    a tuple (success, result). Successful work is committed and failed work
+    is rolled back. If the database aborts the transaction with a retryable
+    error, it is rolled back and the work runs again after a random delay
+    that grows with each attempt (full jitter), so competing requests do not
+    retry in lockstep.
+
+    Args:
+        work: Function taking no arguments and returning (success, result)
+        attempts: Maximum number of attempts (defaults to TRANSACTION_RETRIES)
+        base_delay: Delay scale in seconds (defaults to TRANSACTION_RETRY_DELAY)
+
+    Returns:
+        The (success, result) tuple returned by the last attempt
+
+    Raises:
+        DBAPIError: If the error is not retryable or attempts run out
+    """
+    attempts = attempts or current_app.config.get('TRANSACTION_RETRIES', 3)
+    base_delay = base_delay or current_app.config.get('TRANSACTION_RETRY_DELAY', 0.05)
+
+    for attempt in range(attempts):
+        try:
+            success, result = work()
+            if success:
+                db.session.commit()
+            else:
+                db.session.rollback()
+            return success, result
+        except DBAPIError as e:
+            db.session.rollback()
+            if attempt + 1 >= attempts or not is_retryable(e):
+                raise
+            current_app.logger.warning(f"Retrying transaction after conflict (attempt {attempt + 1}): {str(e.orig)}")
+            time.sleep(random.uniform(0, base_delay * 2 ** attempt))
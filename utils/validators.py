@@ -1,4 +1,5 @@
 import re
+from datetime import datetime, timedelta
 from flask import request, jsonify
 from functools import wraps
 
@@ -108,3 +109,28 @@ def validate_json():
             return f(*args, **kwargs)
         return decorated_function
     return decorator
+
+def get_date_range_args():
+    """
+    Read a start/end date range (YYYY-MM-DD, both inclusive) from the query string
+    
+    Defaults to the current month up to today.
+    
+    Returns:
+        Tuple (start, end) of datetimes, with end exclusive (midnight after the end date)
+        
+    Raises:
+        ValueError: If a date is malformed or the range is reversed
+    """
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    try:
+        start = request.args.get('start')
+        start = datetime.strptime(start, '%Y-%m-%d') if start else today.replace(day=1)
+        end = request.args.get('end')
+        end = datetime.strptime(end, '%Y-%m-%d') if end else today
+    except ValueError:
+        raise ValueError("Dates must be in YYYY-MM-DD format")
+    
+    if end < start:
+        raise ValueError("end must not be before start")
+    return start, end + timedelta(days=1)